@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from app.core.security import CurrentPrincipal
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """Bounded, process-local LRU map whose entries expire after a TTL.
+
+    Not thread-safe; intended to be used from the event loop only.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._data: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl_seconds > 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> Optional[V]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._data[key]
+            self.evictions += 1
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl_seconds: float | None = None) -> None:
+        if not self.enabled:
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if ttl <= 0:
+            return
+        self._data[key] = (self._clock() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: K) -> Optional[V]:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return None
+        self.invalidations += 1
+        return entry[1]
+
+    def evict_where(self, predicate: Callable[[K, V], bool]) -> int:
+        doomed = [k for k, (_, v) in self._data.items() if predicate(k, v)]
+        for k in doomed:
+            del self._data[k]
+        self.invalidations += len(doomed)
+        return len(doomed)
+
+    def clear(self) -> None:
+        self.invalidations += len(self._data)
+        self._data.clear()
+
+    def reset_stats(self) -> None:
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+# Resolved CurrentPrincipal per user id (see app.core.security.get_current_user)
+principal_cache: TTLCache[str, CurrentPrincipal] = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_principal(user_id: str) -> None:
+    principal_cache.pop(str(user_id))
+
+
+def invalidate_principals_with_role(role_id: str) -> None:
+    role_id = str(role_id)
+    principal_cache.evict_where(lambda _, p: role_id in (getattr(p.user, "role_ids", None) or []))
+
+
+# Decoded JWT payloads keyed by a digest of the raw token (see app.core.security.decode_token).
+# Entries live until the token's exp, capped at TOKEN_CACHE_MAX_TTL_SECONDS.
+token_cache: TTLCache[bytes, Dict[str, Any]] = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.TOKEN_CACHE_MAX_TTL_SECONDS,
+)
+
+
+# GET /releases/summary aggregation results keyed by the query filters. Short TTL, no invalidation.
+portfolio_cache: TTLCache[Tuple[Any, ...], Dict[str, Any]] = TTLCache(
+    maxsize=settings.PORTFOLIO_SUMMARY_MAX_ENTRIES,
+    ttl_seconds=settings.PORTFOLIO_SUMMARY_TTL_SECONDS,
+)
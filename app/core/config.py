@@ -31,6 +31,45 @@ class Settings(BaseSettings):
     # New: toggle to actually enforce role permission flags. Disabled now so all endpoints work for any role.
     RBAC_ENFORCEMENT_ENABLED: bool = False
 
+    # Stateless mode: access tokens embed role names + permission bitmask and are authorized
+    # without touching the users/roles collections.
+    AUTH_PERMISSIONS_IN_TOKEN: bool = False
+
+    # Process-local cache of resolved principals (user + roles). 0 disables it.
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 1024
+
+    # Token revocation: each worker mirrors the revoked_tokens collection in memory
+    REVOCATION_SYNC_INTERVAL_SECONDS: int = 5
+    # revoked_at is stamped by the revoking worker's clock; each sync re-reads this far back
+    REVOCATION_SYNC_OVERLAP_SECONDS: int = 60
+    REVOCATION_BLOOM_BITS: int = 1 << 20
+    REVOCATION_BLOOM_HASHES: int = 5
+
+    # /auth/login token buckets (per username and per client IP). Backend: "memory" or "mongo".
+    LOGIN_RATE_LIMIT_ENABLED: bool = True
+    LOGIN_RATE_LIMIT_BACKEND: str = "memory"
+    LOGIN_RATE_LIMIT_USER_BURST: int = 5
+    LOGIN_RATE_LIMIT_USER_PER_MINUTE: int = 5
+    LOGIN_RATE_LIMIT_IP_BURST: int = 20
+    LOGIN_RATE_LIMIT_IP_PER_MINUTE: int = 30
+
+    # LRU of decoded JWT payloads so repeat requests skip signature verification. 0 disables it.
+    TOKEN_CACHE_MAX_ENTRIES: int = 4096
+    TOKEN_CACHE_MAX_TTL_SECONDS: int = 1800
+
+    # bcrypt cost factor; calibrate per deployment with scripts/calibrate_bcrypt.py.
+    # Stored hashes with a different cost are transparently rehashed on next login.
+    BCRYPT_ROUNDS: int = 12
+
+    # bcrypt runs on a bounded thread pool; jobs beyond pool + queue are rejected with 503
+    PASSWORD_HASH_POOL_SIZE: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+
+    # GET /releases/summary results are cached per filter set for this long. 0 disables it.
+    PORTFOLIO_SUMMARY_TTL_SECONDS: int = 15
+    PORTFOLIO_SUMMARY_MAX_ENTRIES: int = 128
+
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=False, env_file_encoding="utf-8")
 
     @field_validator("CORS_ORIGINS", mode="before")
@@ -11,6 +11,8 @@ class ErrorCodes:
     FORBIDDEN = "FORBIDDEN"
     VALIDATION_ERROR = "VALIDATION_ERROR"
     CONFLICT = "CONFLICT"
+    RATE_LIMITED = "RATE_LIMITED"
+    SERVICE_UNAVAILABLE = "SERVICE_UNAVAILABLE"
     SERVER_ERROR = "SERVER_ERROR"
 
 
@@ -37,6 +39,10 @@ async def http_exception_handler(_: Request, exc: HTTPException) -> JSONResponse
         code = ErrorCodes.CONFLICT
     elif exc.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY:
         code = ErrorCodes.VALIDATION_ERROR
+    elif exc.status_code == status.HTTP_429_TOO_MANY_REQUESTS:
+        code = ErrorCodes.RATE_LIMITED
+    elif exc.status_code == status.HTTP_503_SERVICE_UNAVAILABLE:
+        code = ErrorCodes.SERVICE_UNAVAILABLE
     env = ErrorEnvelope(code=code, message=str(exc.detail) if exc.detail else "Error", details=None)
     headers = getattr(exc, "headers", None)
     return JSONResponse(status_code=exc.status_code, headers=headers, content={"error": env.model_dump()})
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from hashlib import blake2b
+from typing import Iterable, Optional
+
+from fastapi import Response, status
+
+
+def make_etag(resource_id: str, version: int, variant: Optional[Iterable[str]] = None) -> str:
+    """Strong ETag for one representation of a versioned document.
+
+    ``variant`` distinguishes representations of the same version (e.g. a sparse fieldset).
+    """
+    tag = f"{resource_id}-{version}"
+    if variant is not None:
+        tag += "-" + blake2b(",".join(sorted(variant)).encode(), digest_size=4).hexdigest()
+    return f'"{tag}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
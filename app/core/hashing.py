@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Deque, Dict, Optional, TypeVar
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.security import pwd_context
+
+R = TypeVar("R")
+
+
+class PasswordHasher:
+    """Runs bcrypt work on a bounded thread pool so it never blocks the event loop.
+
+    bcrypt releases the GIL while hashing, so threads give real parallelism.
+    Callers beyond ``pool_size + max_queue`` in-flight jobs are rejected with 503
+    instead of queueing unboundedly behind a login burst.
+    """
+
+    def __init__(self, pool_size: int, max_queue: int, sample_size: int = 512) -> None:
+        self.pool_size = max(1, pool_size)
+        self.max_queue = max(0, max_queue)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight = 0
+        self._samples: Deque[float] = deque(maxlen=sample_size)
+        self.completed = 0
+        self.rejected = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="pwd-hash")
+        return self._executor
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def run(self, fn: Callable[..., R], *args: Any) -> R:
+        if self._in_flight >= self.pool_size + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Password hashing capacity exhausted, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), partial(fn, *args))
+        finally:
+            self._in_flight -= 1
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.completed += 1
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+            self._samples.append(elapsed_ms)
+
+    def _percentile(self, pct: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return round(ordered[idx], 2)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pool_size": self.pool_size,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "latency_ms": {
+                "avg": round(self.total_ms / self.completed, 2) if self.completed else 0.0,
+                "p50": self._percentile(50),
+                "p95": self._percentile(95),
+                "max": round(self.max_ms, 2),
+            },
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    pool_size=settings.PASSWORD_HASH_POOL_SIZE,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+
+def calibrate_bcrypt_rounds(target_ms: float, min_rounds: int = 10, max_rounds: int = 16, samples: int = 3) -> tuple[int, Dict[int, float]]:
+    """Return the highest bcrypt cost whose median hash time stays within ``target_ms``.
+
+    Each extra round doubles the work, so measuring stops at the first cost over target.
+    The cost never drops below ``min_rounds`` even on slow hardware.
+    """
+    timings: Dict[int, float] = {}
+    chosen = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        handler = pwd_context.copy(bcrypt__rounds=rounds)
+        runs = []
+        for _ in range(samples):
+            started = time.perf_counter()
+            handler.hash("calibration-password")
+            runs.append((time.perf_counter() - started) * 1000)
+        timings[rounds] = sorted(runs)[len(runs) // 2]
+        if timings[rounds] > target_ms:
+            break
+        chosen = rounds
+    return chosen, timings
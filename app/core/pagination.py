@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 from base64 import urlsafe_b64decode, urlsafe_b64encode
-from typing import Generic, Iterable, List, Optional, Sequence, Tuple, TypeVar
+from typing import Any, Dict, Generic, Iterable, List, Optional, Sequence, Tuple, TypeVar
 
-from bson import ObjectId
+from bson import ObjectId, json_util
 from pydantic import BaseModel, Field
 
 T = TypeVar("T")
@@ -31,3 +31,41 @@ def try_decode_cursor(cursor: Optional[str]) -> Optional[ObjectId]:
         return ObjectId(raw)
     except Exception:
         return None
+
+
+def encode_keyset(*values: Any) -> str:
+    """Opaque cursor for a compound sort key, e.g. ``(rank, _id)``; BSON types survive the round trip."""
+    return urlsafe_b64encode(json_util.dumps(list(values)).encode()).decode()
+
+
+def try_decode_keyset(cursor: Optional[str], size: int) -> Optional[Tuple[Any, ...]]:
+    if not cursor:
+        return None
+    try:
+        values = json_util.loads(urlsafe_b64decode(cursor.encode()).decode())
+    except Exception:
+        return None
+    if not isinstance(values, list) or len(values) != size:
+        return None
+    return tuple(values)
+
+
+def keyset_after(sort: Sequence[Tuple[str, int]], values: Sequence[Any]) -> Dict[str, Any]:
+    """Range predicate matching documents strictly after ``values`` in ``sort`` order.
+
+    ``[("release_date", -1), ("_id", -1)]`` gives
+    ``{"$or": [{"release_date": {"$lt": d}}, {"release_date": d, "_id": {"$lt": oid}}]}``,
+    which an index on the same keys answers as a range scan.
+    """
+    clauses: List[Dict[str, Any]] = []
+    for i, (field, direction) in enumerate(sort):
+        clause: Dict[str, Any] = {prev: values[j] for j, (prev, _) in enumerate(sort[:i])}
+        if values[i] is None:
+            # null sorts first and $gt/$lt never match across types
+            if direction < 0:
+                continue
+            clause[field] = {"$ne": None}
+        else:
+            clause[field] = {"$lt" if direction < 0 else "$gt": values[i]}
+        clauses.append(clause)
+    return {"$or": clauses} if len(clauses) > 1 else clauses[0]
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Type
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel, create_model
+
+
+@lru_cache(maxsize=256)
+def partial_model(model: Type[BaseModel], names: FrozenSet[str]) -> Type[BaseModel]:
+    """Copy of ``model`` restricted to the given top-level fields, built once per field set."""
+    fields: Dict[str, Any] = {n: (f.annotation, f) for n, f in model.model_fields.items() if n in names}
+    return create_model(f"{model.__name__}Partial", __config__=model.model_config, **fields)
+
+
+class FieldSet:
+    """A validated ``fields=`` / ``exclude=`` selection: Mongo projection plus matching response model."""
+
+    def __init__(self, model: Type[BaseModel], names: FrozenSet[str], projection: Dict[str, int]) -> None:
+        self.names = names
+        self.projection = projection
+        self.model = partial_model(model, names)
+
+
+def _split(raw: str) -> List[str]:
+    return [p.strip() for p in raw.split(",") if p.strip()]
+
+
+def sparse_fields(model: Type[BaseModel]) -> Callable[..., Optional[FieldSet]]:
+    """Dependency factory parsing ``fields``/``exclude`` against ``model``'s top-level fields.
+
+    Returns None when neither parameter is given so handlers keep their full response model.
+    """
+    known = set(model.model_fields)
+    mongo_key = {n: (f.alias or n) for n, f in model.model_fields.items()}
+
+    def _dependency(
+        fields: Optional[str] = Query(default=None, description="Comma-separated top-level fields to return (id is always included)"),
+        exclude: Optional[str] = Query(default=None, description="Comma-separated top-level fields to omit"),
+    ) -> Optional[FieldSet]:
+        if not fields and not exclude:
+            return None
+        if fields and exclude:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Use either fields or exclude, not both")
+        requested = {"id" if n == "_id" else n for n in _split(fields or exclude or "")}
+        unknown = sorted(requested - known)
+        if unknown:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Unknown fields: {', '.join(unknown)}")
+        if fields:
+            names = requested | {"id"}
+            return FieldSet(model, frozenset(names), {mongo_key[n]: 1 for n in names})
+        requested.discard("id")
+        return FieldSet(model, frozenset(known - requested), {mongo_key[n]: 0 for n in requested})
+
+    return _dependency
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import math
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Protocol, Tuple
+
+from fastapi import HTTPException, status
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+
+from app.core.config import settings
+
+
+class BucketStore(Protocol):
+    async def take(self, key: str, capacity: float, rate_per_sec: float, now: float) -> Tuple[bool, float]:
+        """Consume one token from ``key``; return (allowed, tokens_left)."""
+        ...
+
+
+class MemoryBucketStore:
+    """Process-local buckets. Bounded so a spray of random usernames cannot grow it forever."""
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, capacity: float, rate_per_sec: float, now: float) -> Tuple[bool, float]:
+        tokens, ts = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - ts) * rate_per_sec)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return allowed, tokens
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+
+class MongoBucketStore:
+    """Buckets shared by every worker, refilled and consumed in one atomic pipeline update."""
+
+    def __init__(self, get_db: Callable[[], AsyncIOMotorDatabase[Dict[str, Any]]], idle_ttl_seconds: int = 3600) -> None:
+        self._get_db = get_db
+        self.idle_ttl_seconds = idle_ttl_seconds
+
+    async def take(self, key: str, capacity: float, rate_per_sec: float, now: float) -> Tuple[bool, float]:
+        refilled = {
+            "$min": [
+                capacity,
+                {"$add": [{"$ifNull": ["$tokens", capacity]}, {"$multiply": [{"$subtract": [now, {"$ifNull": ["$ts", now]}]}, rate_per_sec]}]},
+            ]
+        }
+        expires_at = datetime.fromtimestamp(now, tz=timezone.utc) + timedelta(seconds=self.idle_ttl_seconds)
+        pipeline: List[Dict[str, Any]] = [
+            {"$set": {"tokens": refilled, "ts": now}},
+            {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+            {"$set": {"tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]}, "expires_at": expires_at}},
+        ]
+        doc = await self._get_db().rate_limits.find_one_and_update(
+            {"_id": key}, pipeline, upsert=True, return_document=ReturnDocument.AFTER
+        )
+        return bool(doc["allowed"]), float(doc["tokens"])
+
+
+class LoginRateLimiter:
+    """Token buckets keyed by username and by client IP, checked before any password hashing."""
+
+    def __init__(self, store: BucketStore, clock: Callable[[], float] = time.time) -> None:
+        self.store = store
+        self._clock = clock
+        self.allowed = 0
+        self.rejected_username = 0
+        self.rejected_ip = 0
+
+    async def _take(self, key: str, burst: int, per_minute: int) -> float | None:
+        rate = per_minute / 60.0
+        allowed, tokens = await self.store.take(key, float(burst), rate, self._clock())
+        if allowed:
+            return None
+        return (1 - tokens) / rate if rate > 0 else 60.0
+
+    async def check(self, username: str, client_ip: str | None) -> None:
+        if not settings.LOGIN_RATE_LIMIT_ENABLED:
+            return
+        if client_ip:
+            retry = await self._take(f"login:ip:{client_ip}", settings.LOGIN_RATE_LIMIT_IP_BURST, settings.LOGIN_RATE_LIMIT_IP_PER_MINUTE)
+            if retry is not None:
+                self.rejected_ip += 1
+                self._reject(retry)
+        retry = await self._take(f"login:user:{username.lower()}", settings.LOGIN_RATE_LIMIT_USER_BURST, settings.LOGIN_RATE_LIMIT_USER_PER_MINUTE)
+        if retry is not None:
+            self.rejected_username += 1
+            self._reject(retry)
+        self.allowed += 1
+
+    def _reject(self, retry_after: float) -> None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, retry later",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    def reset(self) -> None:
+        self.allowed = self.rejected_username = self.rejected_ip = 0
+        if isinstance(self.store, MemoryBucketStore):
+            self.store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.store).__name__,
+            "allowed": self.allowed,
+            "rejected_username": self.rejected_username,
+            "rejected_ip": self.rejected_ip,
+        }
+
+
+def _build_store() -> BucketStore:
+    if settings.LOGIN_RATE_LIMIT_BACKEND == "mongo":
+        from app.db.client import get_db
+
+        return MongoBucketStore(get_db)
+    return MemoryBucketStore()
+
+
+login_limiter = LoginRateLimiter(_build_store())
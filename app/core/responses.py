@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import types
+from functools import lru_cache
+from typing import (
+    Annotated,
+    Any,
+    Callable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+    get_args,
+    get_origin,
+)
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+
+# UTC datetimes end in "Z", as pydantic's own JSON output does
+_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+Shape = Callable[[Any], Any]
+_MISSING = object()
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json", by_alias=True)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=_OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered by orjson; ObjectId values render as strings."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _shape_for(annotation: Any) -> Optional[Shape]:
+    """Shape for values of ``annotation``, or None when values pass through unchanged."""
+    origin = get_origin(annotation)
+    if origin is Annotated:
+        return _shape_for(get_args(annotation)[0])
+    if origin in (Union, types.UnionType):
+        arms = [a for a in get_args(annotation) if a is not type(None)]
+        shapes = [_shape_for(a) for a in arms]
+        # Optional[Model] is shaped; wider unions cannot be told apart without validating
+        return shapes[0] if len(arms) == 1 else None
+    if origin in (list, List, tuple, set, frozenset):
+        args = get_args(annotation)
+        inner = _shape_for(args[0]) if args else None
+        if inner is None:
+            return None
+        return lambda v: [inner(x) for x in v] if isinstance(v, (list, tuple)) else v
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return model_shape(annotation)
+    return None
+
+
+@lru_cache(maxsize=None)
+def model_shape(model: Type[BaseModel]) -> Shape:
+    """Turn a trusted document into ``model``'s by-alias output without validating it.
+
+    Like a recursive ``model_construct``: unknown keys are dropped and missing fields take
+    their defaults, but values are not coerced, so only use it on documents the API wrote.
+    """
+    plan: List[Tuple[str, str, Optional[Shape], Any]] = []
+    for name, field in model.model_fields.items():
+        key = field.serialization_alias or field.alias or name
+        if field.default is not PydanticUndefined or field.default_factory is not None:
+            default = lambda f=field: f.get_default(call_default_factory=True)  # noqa: E731
+        else:
+            default = None
+        plan.append((key, name, _shape_for(field.annotation), default))
+    keys = {key for key, _, _, _ in plan}
+    nested = [(key, inner) for key, _, inner, _ in plan if inner is not None]
+
+    def shape(doc: Any) -> Any:
+        if isinstance(doc, BaseModel):
+            return doc.model_dump(by_alias=True)
+        if not isinstance(doc, Mapping):
+            return doc
+        if doc.keys() == keys:
+            # Stored exactly as the model dumps it: only nested models need a look
+            out = dict(doc)
+            for key, nested_shape in nested:
+                if out[key] is not None:
+                    out[key] = nested_shape(out[key])
+            return out
+        out = {}
+        for key, name, inner, default in plan:
+            value = doc.get(key, _MISSING)
+            if value is _MISSING and name != key:
+                value = doc.get(name, _MISSING)
+            if value is _MISSING:
+                if default is None:
+                    continue
+                value = default()
+            out[key] = inner(value) if inner is not None and value is not None else value
+        return out
+
+    return shape
+
+
+def model_response(model: Any, content: Any, **kwargs: Any) -> ORJSONResponse:
+    """Render database output shaped as ``model`` in one pass, bypassing response_model validation.
+
+    ``model`` may be a model class or a generic alias such as ``Paginated[Release]``; keep
+    ``response_model`` on the route so the OpenAPI schema is unchanged.
+    """
+    shape = _shape_for(model)
+    return ORJSONResponse(shape(content) if shape else content, **kwargs)
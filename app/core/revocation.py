@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from hashlib import blake2b
+from typing import Any, Callable, Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.utils.time import utcnow
+
+logger = get_logger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys using double hashing of one blake2b digest."""
+
+    def __init__(self, size_bits: int, num_hashes: int) -> None:
+        self.size_bits = max(8, size_bits)
+        self.num_hashes = max(1, num_hashes)
+        self._bits = bytearray((self.size_bits + 7) // 8)
+
+    def _positions(self, key: str):  # type: ignore[no-untyped-def]
+        digest = blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.size_bits
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class RevocationList:
+    """Per-worker view of the ``revoked_tokens`` collection.
+
+    Lookups never touch Mongo: a Bloom filter rejects the common (not revoked) case and an
+    exact dict of ``jti -> exp`` confirms hits. ``sync`` pulls only revocations recorded since
+    the last one seen, so other workers' logouts arrive within one sync interval.
+    """
+
+    def __init__(self, bloom_bits: int, bloom_hashes: int, sync_overlap_seconds: float = 60) -> None:
+        self._sync_overlap = timedelta(seconds=sync_overlap_seconds)
+        self._bloom_bits = bloom_bits
+        self._bloom_hashes = bloom_hashes
+        self._bloom = BloomFilter(bloom_bits, bloom_hashes)
+        self._revoked: Dict[str, int] = {}
+        self._watermark: Optional[datetime] = None
+        self._task: Optional[asyncio.Task[None]] = None
+        self.checks = 0
+        self.bloom_rejections = 0
+        self.hits = 0
+        self.syncs = 0
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def add(self, jti: str, exp: int) -> None:
+        if jti not in self._revoked:
+            self._bloom.add(jti)
+        self._revoked[jti] = exp
+
+    def is_revoked(self, jti: str) -> bool:
+        self.checks += 1
+        if jti not in self._bloom:
+            self.bloom_rejections += 1
+            return False
+        if jti in self._revoked:
+            self.hits += 1
+            return True
+        return False
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Drop entries whose token has expired anyway and rebuild the filter."""
+        now = time.time() if now is None else now
+        expired = [j for j, exp in self._revoked.items() if exp <= now]
+        if not expired:
+            return 0
+        for j in expired:
+            del self._revoked[j]
+        self._bloom = BloomFilter(self._bloom_bits, self._bloom_hashes)
+        for j in self._revoked:
+            self._bloom.add(j)
+        return len(expired)
+
+    def clear(self) -> None:
+        self._bloom = BloomFilter(self._bloom_bits, self._bloom_hashes)
+        self._revoked.clear()
+        self._watermark = None
+
+    async def revoke(self, db: AsyncIOMotorDatabase[Dict[str, Any]], jti: str, exp: int, user_id: Optional[str] = None) -> None:
+        self.add(jti, exp)
+        doc = {
+            "jti": jti,
+            "user_id": user_id,
+            "expires_at": datetime.fromtimestamp(exp, tz=timezone.utc),
+            "revoked_at": utcnow(),
+        }
+        try:
+            await db.revoked_tokens.insert_one(doc)
+        except DuplicateKeyError:
+            pass
+
+    async def sync(self, db: AsyncIOMotorDatabase[Dict[str, Any]]) -> int:
+        """Pull revocations recorded since the last sync; returns how many were new to this worker.
+
+        ``revoked_at`` comes from the revoking worker's clock, so a revocation can be stored
+        behind the newest one already seen. Each sync re-reads an overlap window below the
+        watermark instead of starting strictly after it; jtis already known are skipped.
+        """
+        crit: Dict[str, Any] = {}
+        if self._watermark is not None:
+            crit["revoked_at"] = {"$gte": self._watermark - self._sync_overlap}
+        cursor = db.revoked_tokens.find(crit, {"jti": 1, "expires_at": 1, "revoked_at": 1}).sort("revoked_at", 1)
+        added = 0
+        async for doc in cursor:
+            if self._watermark is None or doc["revoked_at"] > self._watermark:
+                self._watermark = doc["revoked_at"]
+            if doc["jti"] in self._revoked:
+                continue
+            expires_at = doc["expires_at"]
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+            self.add(doc["jti"], int(expires_at.timestamp()))
+            added += 1
+        self.syncs += 1
+        self.prune()
+        return added
+
+    async def _sync_loop(self, get_db: Callable[[], AsyncIOMotorDatabase[Dict[str, Any]]], interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.sync(get_db())
+            except Exception:  # pragma: no cover
+                logger.exception("revocation list sync failed")
+
+    def start(self, get_db: Callable[[], AsyncIOMotorDatabase[Dict[str, Any]]], interval: float) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._sync_loop(get_db, interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._revoked),
+            "checks": self.checks,
+            "bloom_rejections": self.bloom_rejections,
+            "hits": self.hits,
+            "syncs": self.syncs,
+            "watermark": self._watermark.isoformat() if self._watermark else None,
+        }
+
+
+revocation_list = RevocationList(
+    bloom_bits=settings.REVOCATION_BLOOM_BITS,
+    bloom_hashes=settings.REVOCATION_BLOOM_HASHES,
+    sync_overlap_seconds=settings.REVOCATION_SYNC_OVERLAP_SECONDS,
+)
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from bson import ObjectId
+
+from app.core.pagination import encode_keyset, keyset_after, try_decode_keyset
+
+# Computed by the search pipeline; lower is a better match
+RANK_FIELD = "_rank"
+SEARCH_SORT = [(RANK_FIELD, 1), ("_id", -1)]
+
+
+def normalize_term(value: str) -> str:
+    return value.strip().lower()
+
+
+def search_keys(doc: Mapping[str, Any], fields: Mapping[str, str]) -> Dict[str, str]:
+    """Normalized copies of the searchable fields, e.g. ``{"release_id_lc": "rel-0001"}``.
+
+    ``fields`` maps each source field to the indexed key it is stored under.
+    """
+    return {key: normalize_term(str(doc[src])) for src, key in fields.items() if doc.get(src) is not None}
+
+
+def prefix_match(term: str, keys: Sequence[str]) -> Dict[str, Any]:
+    """Anchored, case-sensitive regex per key so each ``$or`` branch is an index range scan."""
+    pattern = "^" + re.escape(term)
+    return {"$or": [{key: {"$regex": pattern}} for key in keys]}
+
+
+def rank_expression(term: str, keys: Sequence[str]) -> Dict[str, Any]:
+    """Exact matches rank before prefix matches; within a tier, earlier keys win."""
+    exact = [{"case": {"$eq": [f"${key}", term]}, "then": i} for i, key in enumerate(keys)]
+    prefix = [
+        {"case": {"$eq": [{"$indexOfCP": [{"$ifNull": [f"${key}", ""]}, term]}, 0]}, "then": len(keys) + i}
+        for i, key in enumerate(keys)
+    ]
+    return {"$switch": {"branches": exact + prefix, "default": 2 * len(keys)}}
+
+
+def search_pipeline(
+    term: str,
+    keys: Sequence[str],
+    limit: int,
+    after: Optional[Tuple[int, ObjectId]] = None,
+    projection: Optional[Dict[str, Any]] = None,
+    filters: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """Ranked prefix search, paged by the ``(rank, _id)`` keyset of the last item returned.
+
+    ``filters`` are plain equality/range conditions applied alongside the prefix match.
+    ``projection`` is applied before the ``$sort`` so only the requested fields (plus the
+    sort keys) are carried through it, not whole documents.
+    """
+    pipeline: List[Dict[str, Any]] = [
+        {"$match": {**(filters or {}), **prefix_match(term, keys)}},
+        {"$addFields": {RANK_FIELD: rank_expression(term, keys)}},
+    ]
+    if projection:
+        # The sort keys always survive; an exclusion projection keeps them anyway
+        projection = {k: v for k, v in projection.items() if k not in ("_id", RANK_FIELD)}
+        if any(projection.values()):
+            projection = {**projection, "_id": 1, RANK_FIELD: 1}
+        if projection:
+            pipeline.append({"$project": projection})
+    if after is not None:
+        pipeline.append({"$match": keyset_after(SEARCH_SORT, after)})
+    pipeline += [{"$sort": dict(SEARCH_SORT)}, {"$limit": limit}]
+    return pipeline
+
+
+def encode_search_cursor(doc: Mapping[str, Any]) -> str:
+    return encode_keyset(doc[RANK_FIELD], doc["_id"])
+
+
+def try_decode_search_cursor(cursor: Optional[str]) -> Optional[Tuple[int, ObjectId]]:
+    values = try_decode_keyset(cursor, 2)
+    if values is None or not isinstance(values[0], int) or not isinstance(values[1], ObjectId):
+        return None
+    return values[0], values[1]
@@ -1,34 +1,58 @@
+import time
 from datetime import datetime, timedelta, timezone
+from hashlib import blake2b
 from typing import Any, Dict, Optional
+from uuid import uuid4
 
 from fastapi import Depends, Header, HTTPException, status
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
+from app.core.cache import principal_cache, token_cache
 from app.core.config import settings
+from app.core.revocation import revocation_list
+from app.models.rbac import ALL_PERMISSIONS_MASK, PERMISSION_BITS, User, mask_to_permissions, permissions_to_mask
 from app.repositories.rbac_repo import RbacRepository
 from app.db.client import get_db
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 
-def create_token(subject: str, expires_delta: timedelta, token_type: str) -> str:
+# Claims carried by tokens in AUTH_PERMISSIONS_IN_TOKEN mode:
+#   usr: username, roles: role names, pm: permission bitmask, pv: permissions version stamp
+PERMISSION_CLAIMS = ("usr", "roles", "pm", "pv")
+
+
+def create_token(subject: str, expires_delta: timedelta, token_type: str, **claims: Any) -> str:
     now = datetime.now(tz=timezone.utc)
     payload: Dict[str, Any] = {
+        **claims,
         "sub": subject,
         "iat": int(now.timestamp()),
         "exp": int((now + expires_delta).timestamp()),
         "type": token_type,
+        "jti": uuid4().hex,
     }
     return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALG)
 
 
-def create_access_token(subject: str) -> str:
-    return create_token(subject, timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES), token_type="access")
+def create_access_token(subject: str, **claims: Any) -> str:
+    return create_token(subject, timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES), token_type="access", **claims)
 
 
-def create_refresh_token(subject: str) -> str:
-    return create_token(subject, timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES), token_type="refresh")
+def create_refresh_token(subject: str, **claims: Any) -> str:
+    return create_token(subject, timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES), token_type="refresh", **claims)
+
+
+async def build_permission_claims(repo: RbacRepository, user: User, version: int | None = None) -> Dict[str, Any]:
+    """Resolve the stateless-mode claims for ``user`` from the users/roles collections."""
+    roles = await repo.get_roles_by_ids(user.role_ids)
+    mask = 0
+    for r in roles:
+        mask |= r.permission_mask
+    if version is None:
+        version = await repo.get_permissions_version()
+    return {"usr": user.username, "roles": [r.role_name for r in roles], "pm": mask, "pv": version}
 
 
 def verify_password(plain_password: str, password_hash: str) -> bool:
@@ -39,18 +63,66 @@ def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 
-def decode_token(token: str) -> Optional[dict]:
+def password_needs_rehash(password_hash: str) -> bool:
+    """True when the stored hash uses a different scheme or cost than BCRYPT_ROUNDS."""
     try:
-        return jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALG])
-    except JWTError:
+        return bool(pwd_context.needs_update(password_hash))
+    except ValueError:
+        return False
+
+
+def decode_token(token: str) -> Optional[dict]:
+    """Verify and decode ``token``; payloads are cached, so callers must not mutate the result."""
+    key = blake2b(token.encode(), digest_size=16).digest()
+    payload = token_cache.get(key)
+    if payload is None:
+        try:
+            payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALG])
+        except JWTError:
+            return None
+        token_cache.set(key, payload, ttl_seconds=float(payload.get("exp", 0)) - time.time())
+    jti = payload.get("jti")
+    if jti and revocation_list.is_revoked(jti):
+        token_cache.pop(key)
         return None
+    return payload
+
+
+class TokenUser:
+    """Minimal user view rebuilt from token claims; no database round trip."""
+
+    def __init__(self, user_id: str, username: str | None = None) -> None:
+        self.id = user_id
+        self.username = username
+        self.role_ids: list[str] = []
 
 
 class CurrentPrincipal:
-    def __init__(self, user, role_names: list[str], permissions: dict[str, bool]) -> None:  # type: ignore[no-untyped-def]
+    def __init__(self, user, role_names: list[str], permissions: dict[str, bool] | None = None, permission_mask: int | None = None) -> None:  # type: ignore[no-untyped-def]
         self.user = user
         self.role_names = role_names
-        self.permissions = permissions
+        if permission_mask is None:
+            permission_mask = permissions_to_mask(permissions or {})
+        self.permission_mask = permission_mask
+        self.permissions = permissions if permissions is not None else mask_to_permissions(permission_mask)
+
+
+def _effective_mask(mask: int) -> int:
+    # Grant everything in permissive phase
+    return mask if settings.RBAC_ENFORCEMENT_ENABLED else ALL_PERMISSIONS_MASK
+
+
+def principal_from_claims(payload: Dict[str, Any]) -> CurrentPrincipal:
+    user = TokenUser(str(payload["sub"]), payload.get("usr"))
+    mask = _effective_mask(int(payload.get("pm") or 0))
+    return CurrentPrincipal(user=user, role_names=list(payload.get("roles") or []), permission_mask=mask)
+
+
+async def resolve_user(principal: CurrentPrincipal) -> Optional[User]:
+    """Return the full user document behind ``principal``, loading it if the principal is token-only."""
+    if not isinstance(principal.user, TokenUser):
+        return principal.user
+    return await RbacRepository(get_db()).find_user_by_id(principal.user.id)
 
 
 async def get_current_user(authorization: str | None = Header(default=None)) -> CurrentPrincipal:
@@ -65,6 +137,13 @@ async def get_current_user(authorization: str | None = Header(default=None)) ->
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token subject")
 
+    if settings.AUTH_PERMISSIONS_IN_TOKEN and "pm" in payload:
+        return principal_from_claims(payload)
+
+    cached = principal_cache.get(user_id)
+    if cached is not None:
+        return cached
+
     repo = RbacRepository(get_db())
     user = await repo.find_user_by_id(user_id)
     if not user:
@@ -74,37 +153,40 @@ async def get_current_user(authorization: str | None = Header(default=None)) ->
     role_names = [r.role_name for r in roles]
 
     # Aggregate permissions across roles (OR)
-    flags = [
-        "is_approval_manager",
-        "can_create_release",
-        "can_edit_release_description",
-        "can_define_fixed_versions",
-        "can_manage_runbooks",
-        "can_manage_quality_gates",
-        "can_upload_attachments",
-        "can_manage_roles",
-        "can_invite_users",
-        "can_view_all",
-    ]
-    if not settings.RBAC_ENFORCEMENT_ENABLED:
-        # Grant everything in permissive phase
-        perms: dict[str, bool] = {f: True for f in flags}
-    else:
-        perms = {f: False for f in flags}
-        for r in roles:
-            for f in flags:
-                if getattr(r, f, False):
-                    perms[f] = True
-
-    return CurrentPrincipal(user=user, role_names=role_names, permissions=perms)
+    mask = 0
+    for r in roles:
+        mask |= r.permission_mask
+
+    principal = CurrentPrincipal(user=user, role_names=role_names, permission_mask=_effective_mask(mask))
+    principal_cache.set(user_id, principal)
+    return principal
+
+
+def _compile_flags(required_flags: tuple[str, ...]) -> tuple[int, list[str]]:
+    required = 0
+    for f in required_flags:
+        required |= PERMISSION_BITS.get(f, 0)
+    # Flags outside PERMISSION_BITS have no bit; fall back to the permissions map for those
+    unmapped = [f for f in required_flags if f not in PERMISSION_BITS]
+    return required, unmapped
+
+
+def _check(principal: CurrentPrincipal, required: int, unmapped: list[str]) -> None:
+    if settings.RBAC_ENFORCEMENT_ENABLED:
+        if principal.permission_mask & required != required or not all(principal.permissions.get(f, False) for f in unmapped):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden: missing permissions")
 
 
 def require_permissions(*required_flags: str):
+    required, unmapped = _compile_flags(required_flags)
+
     async def _checker(principal: CurrentPrincipal = Depends(get_current_user)) -> CurrentPrincipal:
-        if settings.RBAC_ENFORCEMENT_ENABLED:
-            missing = [f for f in required_flags if not principal.permissions.get(f, False)]
-            if missing:
-                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden: missing permissions")
+        _check(principal, required, unmapped)
         return principal
 
     return _checker
+
+
+def ensure_permissions(principal: CurrentPrincipal, *required_flags: str) -> None:
+    """Inline form of require_permissions for checks that depend on the request body."""
+    _check(principal, *_compile_flags(required_flags))
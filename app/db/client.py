@@ -1,13 +1,16 @@
 from __future__ import annotations
 
-from typing import Optional
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
 
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorClientSession, AsyncIOMotorDatabase
 
 from app.core.config import settings
 
 _client: Optional[AsyncIOMotorClient] = None
 _db: Optional[AsyncIOMotorDatabase] = None
+# Whether each client's deployment supports transactions, keyed by id(client)
+_transactions: Dict[int, bool] = {}
 
 
 async def connect_to_mongo() -> None:
@@ -20,6 +23,7 @@ async def connect_to_mongo() -> None:
 async def close_mongo_connection() -> None:
     global _client, _db
     if _client is not None:
+        _transactions.pop(id(_client), None)
         _client.close()
         _client = None
         _db = None
@@ -28,3 +32,28 @@ async def close_mongo_connection() -> None:
 def get_db() -> AsyncIOMotorDatabase:
     assert _db is not None, "Database is not initialized. Call connect_to_mongo() first."
     return _db
+
+
+async def _supports_transactions(client: Any) -> bool:
+    if id(client) not in _transactions:
+        hello = await client.admin.command("hello")
+        # Replica set members and mongos routers; a standalone server has neither
+        _transactions[id(client)] = "setName" in hello or hello.get("msg") == "isdbgrid"
+    return _transactions[id(client)]
+
+
+@asynccontextmanager
+async def transaction(db: Any) -> AsyncIterator[Optional[AsyncIOMotorClientSession]]:
+    """Run the block in a multi-document transaction when the deployment supports one.
+
+    Yields the session to pass to every read and write of the block; the transaction commits
+    when the block exits and aborts when it raises. Yields None on a standalone server (the
+    docker-compose setup) and for test doubles, so callers must not rely on rollback alone.
+    """
+    client = getattr(db, "client", None)
+    if client is None or not await _supports_transactions(client):
+        yield None
+        return
+    async with await client.start_session() as session:
+        async with session.start_transaction():
+            yield session
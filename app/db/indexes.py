@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import Any
 
 from app.db.client import get_db
+from app.repositories.milestone_repo import TOMBSTONE_TTL_SECONDS
 
 
 async def create_indexes() -> None:
@@ -20,5 +21,36 @@ async def create_indexes() -> None:
     await db.jiraboards.create_index("board_id", unique=True)
 
     await db.releases.create_index("release_id", unique=True)
+    # Anchored prefix search (?q=) over lowercased copies; see app.core.search
+    await db.releases.create_index("release_id_lc")
+    await db.releases.create_index("release_name_lc")
+    # GET /releases sort + keyset cursor (app.routers.release.LIST_SORT)
+    await db.releases.create_index([("release_date", -1), ("_id", -1)])
+    # GET /releases filters: equality key first, then the sort/range keys (ESR).
+    # Array fields are multikey; at most one of them per index.
+    for key in ("release_type", "scope_application_ids", "squad_ids", "products.product_id"):
+        await db.releases.create_index([(key, 1), ("release_date", -1), ("_id", -1)])
+
+    # Runbooks and their tasks live outside the release document (app.repositories.runbook_repo)
+    await db.runbooks.create_index([("release_oid", 1), ("runbook_id", 1)], unique=True)
+    await db.runbook_tasks.create_index([("release_oid", 1), ("runbook_id", 1), ("task_name", 1)], unique=True)
+    # GET /releases/{id}/runbooks/{runbook_id}/tasks pages in _id (list) order
+    await db.runbook_tasks.create_index([("release_oid", 1), ("runbook_id", 1), ("_id", 1)])
+
+    # Milestone index (app.repositories.milestone_repo): equality keys, then start_date/_id for sort + cursor
+    await db.milestones.create_index("release_oid")
+    await db.milestones.create_index("removed_at", expireAfterSeconds=TOMBSTONE_TTL_SECONDS)
+    await db.milestones.create_index([("start_date", 1), ("_id", 1)])
+    for keys in (["environment"], ["environment", "status"], ["status"], ["owner_id"], ["owner_id", "status"]):
+        await db.milestones.create_index([(k, 1) for k in keys] + [("start_date", 1), ("_id", 1)])
 
     await db.attachments.create_index("sha256", unique=True)
+    await db.attachments.create_index("file_name_lc")
+
+    await db.revoked_tokens.create_index("jti", unique=True)
+    await db.revoked_tokens.create_index("revoked_at")
+    # Mongo drops revocations once the token would have expired anyway
+    await db.revoked_tokens.create_index("expires_at", expireAfterSeconds=0)
+
+    # Shared login throttling buckets (LOGIN_RATE_LIMIT_BACKEND=mongo); idle buckets expire
+    await db.rate_limits.create_index("expires_at", expireAfterSeconds=0)
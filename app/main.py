@@ -1,18 +1,23 @@
 from fastapi import FastAPI
+from fastapi.datastructures import Default
 from fastapi.middleware.cors import CORSMiddleware
 import os
 from fastapi.openapi.utils import get_openapi
 
 from app.core.config import settings
 from app.core.logging import configure_logging
+from app.core.responses import ORJSONResponse
 from app.core.errors import error_handler, http_exception_handler, validation_exception_handler
-from app.db.client import connect_to_mongo, close_mongo_connection
+from app.core.hashing import password_hasher
+from app.core.revocation import revocation_list
+from app.db.client import connect_to_mongo, close_mongo_connection, get_db
 from app.db.indexes import create_indexes
 from app.routers.health import router as health_router
 from app.routers.auth import router as auth_router
 from app.routers.catalog import router as catalog_router
 from app.routers.release import router as release_router
 from app.routers.attachments import router as attachments_router
+from app.routers.milestones import router as milestones_router
 from app.routers.rbac import router as rbac_router
 
 
@@ -22,6 +27,7 @@ TAGS_METADATA = [
     {"name": "RBAC", "description": "Role-based access control: roles & users."},
     {"name": "Catalog", "description": "Applications, squads, JIRA boards registry."},
     {"name": "Releases", "description": "Release entities, quality gates, milestones, runbooks."},
+    {"name": "Milestones", "description": "Cross-release milestone queries (denormalized index)."},
     {"name": "Attachments", "description": "Attachment metadata & association to releases."},
     {"name": "Health", "description": "Service health & diagnostics."},
 ]
@@ -52,6 +58,8 @@ def create_app() -> FastAPI:
         redoc_url="/redoc",
         openapi_url="/openapi.json",
         openapi_tags=TAGS_METADATA,
+        # Kept as a Default so routes with a response_model still get pydantic's direct JSON dump
+        default_response_class=Default(ORJSONResponse),
         swagger_ui_parameters={
             # Keep entered bearer token so user does not re-enter for every refresh
             "persistAuthorization": True,
@@ -84,6 +92,7 @@ def create_app() -> FastAPI:
     app.include_router(rbac_router, prefix="", tags=["RBAC"])  # /rbac
     app.include_router(catalog_router, prefix="/catalog", tags=["Catalog"])
     app.include_router(release_router, prefix="", tags=["Releases"])  # paths already include /releases
+    app.include_router(milestones_router, prefix="", tags=["Milestones"])  # /milestones
     app.include_router(attachments_router, prefix="", tags=["Attachments"])  # /attachments
 
     skip_db = os.getenv("SKIP_DB") == "1" or os.getenv("PYTEST_CURRENT_TEST") is not None
@@ -93,10 +102,14 @@ def create_app() -> FastAPI:
         if not skip_db:
             await connect_to_mongo()
             await create_indexes()
+            await revocation_list.sync(get_db())
+            revocation_list.start(get_db, settings.REVOCATION_SYNC_INTERVAL_SECONDS)
 
     @app.on_event("shutdown")
     async def on_shutdown() -> None:
+        password_hasher.shutdown()
         if not skip_db:
+            await revocation_list.stop()
             await close_mongo_connection()
 
     # Custom OpenAPI generation to inject security scheme & apply to secured endpoints
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field, field_validator
+from pydantic.config import ConfigDict
+
+
+class MilestoneEntry(BaseModel):
+    """One row of the ``milestones`` index collection (a copy of a release milestone)."""
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: str = Field(alias="_id")
+    release_oid: str
+    release_id: Optional[str] = None
+    release_name: Optional[str] = None
+    product_id: str
+    gate_name: str
+    milestone_key: str
+    milestone_name: Optional[str] = None
+    environment: Optional[str] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    status: Optional[str] = None
+    owner_id: Optional[str] = None
+    approval_status: Optional[str] = None
+
+    @field_validator("release_oid", mode="before")
+    @classmethod
+    def _oid_to_str(cls, v):  # type: ignore[no-untyped-def]
+        return str(v)
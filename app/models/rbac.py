@@ -1,10 +1,10 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import List, Mapping, Optional, Dict
 
 from bson import ObjectId
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, model_validator
 from pydantic.config import ConfigDict
 
 
@@ -22,6 +22,27 @@ PERMISSION_DESCRIPTORS: Dict[str, str] = {
     "can_view_all": "Override scoping – view all entities.",
 }
 
+# Bit position of each flag; order follows PERMISSION_DESCRIPTORS and must stay append-only
+PERMISSION_BITS: Dict[str, int] = {flag: 1 << i for i, flag in enumerate(PERMISSION_DESCRIPTORS)}
+ALL_PERMISSIONS_MASK: int = (1 << len(PERMISSION_BITS)) - 1
+
+
+def permissions_to_mask(flags: Mapping[str, object]) -> int:
+    mask = 0
+    for flag, bit in PERMISSION_BITS.items():
+        if flags.get(flag):
+            mask |= bit
+    return mask
+
+
+def mask_to_permissions(mask: int) -> Dict[str, bool]:
+    return {flag: bool(mask & bit) for flag, bit in PERMISSION_BITS.items()}
+
+
+def permission_mask_expression() -> Dict[str, object]:
+    """Aggregation expression computing ``permission_mask`` from a role document's flags."""
+    return {"$add": [{"$cond": [{"$eq": [f"${flag}", True]}, bit, 0]} for flag, bit in PERMISSION_BITS.items()]}
+
 
 class Role(BaseModel):
     model_config = ConfigDict(populate_by_name=True, json_encoders={ObjectId: str})
@@ -39,9 +60,16 @@ class Role(BaseModel):
     can_manage_roles: bool = False
     can_invite_users: bool = False
     can_view_all: bool = False
+    # Bitwise OR of PERMISSION_BITS for the flags above; always derived from them
+    permission_mask: int = 0
     created_by: Optional[str] = None
     created_at: datetime
 
+    @model_validator(mode="after")
+    def _derive_permission_mask(self) -> "Role":
+        self.permission_mask = permissions_to_mask(self.__dict__)
+        return self
+
 
 class User(BaseModel):
     model_config = ConfigDict(populate_by_name=True, json_encoders={ObjectId: str})
@@ -74,6 +102,31 @@ class UserCreate(BaseModel):
     role_ids: List[str] = []
 
 
+class BulkUserResult(BaseModel):
+    index: int
+    status: str  # created | conflict | invalid | error
+    id: Optional[str] = None
+    username: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BulkUserReport(BaseModel):
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "created": 1,
+            "failed": 1,
+            "results": [
+                {"index": 0, "status": "created", "id": "64f9b8c1f1e4a9fd1a2b3c4d", "username": "jdoe"},
+                {"index": 1, "status": "conflict", "username": "admin", "error": "duplicate username: admin"}
+            ]
+        }
+    })
+
+    created: int = 0
+    failed: int = 0
+    results: List[BulkUserResult] = []
+
+
 class UserLogin(BaseModel):
     model_config = ConfigDict(json_schema_extra={
         "example": {"username": "admin", "password": "admin123"}
@@ -156,6 +209,14 @@ class UserUpdate(BaseModel):
     })
 
 
+class LogoutRequest(BaseModel):
+    model_config = ConfigDict(json_schema_extra={
+        "example": {"refresh_token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9..."}
+    })
+
+    refresh_token: Optional[str] = None
+
+
 class PasswordChange(BaseModel):
     old_password: str
     new_password: str
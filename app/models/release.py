@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import List, Optional
+from typing import Annotated, ClassVar, List, Literal, Optional, Union
 
 from bson import ObjectId
 from pydantic import BaseModel, Field
@@ -156,6 +156,8 @@ class Release(BaseModel):
     attachment_refs: List[AttachmentRef] = []
     created_by: Optional[str] = None
     created_at: datetime
+    # Bumped by every mutation; drives the ETag on release reads
+    version: int = 0
 
 
 # Request payloads
@@ -216,3 +218,240 @@ class UpdateRunbookTask(BaseModel):
     scheduled_start: Optional[datetime] = None
     scheduled_end: Optional[datetime] = None
     status: Optional[str] = None
+
+
+class UpdateProduct(BaseModel):
+    product_name: Optional[str] = None
+    fixed_version: Optional[ReleaseFixedVersion] = None
+    version_boards: Optional[List[VersionBoard]] = None
+    participating_squad_ids: Optional[List[str]] = None
+
+
+# Batched operations (POST /releases/{id}/operations). Each op names the permission it needs.
+class _ReleaseOp(BaseModel):
+    permission: ClassVar[str] = "can_manage_quality_gates"
+
+
+class AddProductOp(_ReleaseOp):
+    op: Literal["add_product"]
+    product: ReleaseProduct
+
+
+class UpdateProductOp(_ReleaseOp):
+    op: Literal["update_product"]
+    product_id: str
+    patch: UpdateProduct
+
+
+class DeleteProductOp(_ReleaseOp):
+    op: Literal["delete_product"]
+    product_id: str
+
+
+class AddGateOp(_ReleaseOp):
+    op: Literal["add_gate"]
+    product_id: str
+    gate: ReleaseProductQualityGate
+
+
+class UpdateGateOp(_ReleaseOp):
+    op: Literal["update_gate"]
+    product_id: str
+    gate_name: str
+    patch: UpdateQualityGate
+
+
+class DeleteGateOp(_ReleaseOp):
+    op: Literal["delete_gate"]
+    product_id: str
+    gate_name: str
+
+
+class AddMilestoneOp(_ReleaseOp):
+    op: Literal["add_milestone"]
+    product_id: str
+    gate_name: str
+    milestone: ReleaseMilestone
+
+
+class UpdateMilestoneOp(_ReleaseOp):
+    op: Literal["update_milestone"]
+    product_id: str
+    gate_name: str
+    milestone_key: str
+    patch: UpdateMilestone
+
+
+class DeleteMilestoneOp(_ReleaseOp):
+    op: Literal["delete_milestone"]
+    product_id: str
+    gate_name: str
+    milestone_key: str
+
+
+class AddRunbookOp(_ReleaseOp):
+    permission: ClassVar[str] = "can_manage_runbooks"
+    op: Literal["add_runbook"]
+    runbook: ReleaseRunbook
+
+
+class DeleteRunbookOp(_ReleaseOp):
+    permission: ClassVar[str] = "can_manage_runbooks"
+    op: Literal["delete_runbook"]
+    runbook_id: str
+
+
+class AddTaskOp(_ReleaseOp):
+    permission: ClassVar[str] = "can_manage_runbooks"
+    op: Literal["add_task"]
+    runbook_id: str
+    task: ReleaseRunbookTask
+
+
+class UpdateTaskOp(_ReleaseOp):
+    permission: ClassVar[str] = "can_manage_runbooks"
+    op: Literal["update_task"]
+    runbook_id: str
+    task_name: str
+    patch: UpdateRunbookTask
+
+
+class DeleteTaskOp(_ReleaseOp):
+    permission: ClassVar[str] = "can_manage_runbooks"
+    op: Literal["delete_task"]
+    runbook_id: str
+    task_name: str
+
+
+class AddAttachmentOp(_ReleaseOp):
+    permission: ClassVar[str] = "can_upload_attachments"
+    op: Literal["add_attachment"]
+    attachment: AttachmentRef
+
+
+class DeleteAttachmentOp(_ReleaseOp):
+    permission: ClassVar[str] = "can_upload_attachments"
+    op: Literal["delete_attachment"]
+    attachment_id: str
+
+
+ReleaseOperation = Annotated[
+    Union[
+        AddProductOp,
+        UpdateProductOp,
+        DeleteProductOp,
+        AddGateOp,
+        UpdateGateOp,
+        DeleteGateOp,
+        AddMilestoneOp,
+        UpdateMilestoneOp,
+        DeleteMilestoneOp,
+        AddRunbookOp,
+        DeleteRunbookOp,
+        AddTaskOp,
+        UpdateTaskOp,
+        DeleteTaskOp,
+        AddAttachmentOp,
+        DeleteAttachmentOp,
+    ],
+    Field(discriminator="op"),
+]
+
+
+class ReleaseOperationsRequest(BaseModel):
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "expected_version": 3,
+                "operations": [
+                    {"op": "add_product", "product": {"application_id": "APP1", "product_id": "PROD1"}},
+                    {"op": "add_gate", "product_id": "PROD1", "gate": {"gate_name": "QA Signoff"}},
+                    {
+                        "op": "add_milestone",
+                        "product_id": "PROD1",
+                        "gate_name": "QA Signoff",
+                        "milestone": {"milestone_key": "QA-UAT", "milestone_name": "UAT Completed"},
+                    },
+                    {"op": "update_gate", "product_id": "PROD1", "gate_name": "QA Signoff", "patch": {"gate_status": "IN_PROGRESS"}},
+                ],
+            }
+        }
+    )
+
+    operations: List[ReleaseOperation] = Field(min_length=1, max_length=500)
+    # Optional optimistic-concurrency guard; defaults to the version loaded by the server
+    expected_version: Optional[int] = None
+
+    def required_permissions(self) -> List[str]:
+        return sorted({op.permission for op in self.operations})
+
+
+class ReleaseImportError(BaseModel):
+    line: int
+    release_id: Optional[str] = None
+    error: str
+
+
+class ReleaseImportReport(BaseModel):
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "received": 3,
+                "inserted": 2,
+                "failed": 1,
+                "errors": [{"line": 2, "release_id": "REL-0001", "error": "duplicate release_id: REL-0001"}],
+            }
+        }
+    )
+
+    received: int = 0
+    inserted: int = 0
+    failed: int = 0
+    errors: List[ReleaseImportError] = []
+
+    def add_error(self, line: int, error: str, release_id: Optional[str] = None) -> None:
+        self.failed += 1
+        self.errors.append(ReleaseImportError(line=line, release_id=release_id, error=error))
+
+
+class ReleaseReadinessFlags(BaseModel):
+    all_required_gates_passed: bool
+    has_blockers: bool
+    is_ready_for_approval: bool
+
+
+class ReleaseReadiness(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: str = Field(alias="_id")
+    release_id: str
+    release_name: str
+    release_date: datetime
+    release_type: Optional[str] = None
+    gate_status_counts: dict[str, int] = {}
+    flags: ReleaseReadinessFlags
+
+
+class ReleaseListItem(BaseModel):
+    """Row of GET /releases; ``?expand=full`` returns whole releases instead."""
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: str = Field(alias="_id")
+    release_id: str
+    release_name: str
+    release_date: datetime
+    release_type: Optional[str] = None
+    product_count: int = 0
+    flags: Optional[ReleaseReadinessFlags] = None  # None until the release has a stored summary
+
+
+class PortfolioTotals(BaseModel):
+    releases: int = 0
+    ready_for_approval: int = 0
+    with_blockers: int = 0
+
+
+class PortfolioSummary(BaseModel):
+    totals: PortfolioTotals = PortfolioTotals()
+    items: List[ReleaseReadiness] = []
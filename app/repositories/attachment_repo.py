@@ -1,12 +1,21 @@
 from __future__ import annotations
 
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from app.core.search import prefix_match, search_keys, search_pipeline
 from app.models.attachment import Attachment
 
+# file_name is searched through a lowercased copy; sha256 hex digests are already lowercase
+SEARCH_KEYS = {"file_name": "file_name_lc"}
+SEARCH_FIELDS = ["sha256", "file_name_lc"]
+
+
+def with_search_keys(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {**data, **search_keys(data, SEARCH_KEYS)}
+
 
 class AttachmentRepository:
     def __init__(self, db: AsyncIOMotorDatabase) -> None:
@@ -25,14 +34,14 @@ class AttachmentRepository:
         if existing:
             existing = self._normalize(existing)  # type: ignore[assignment]
             return Attachment.model_validate(existing)
-        res = await self.db.attachments.insert_one(payload)
+        res = await self.db.attachments.insert_one(with_search_keys(payload))
         payload["_id"] = str(res.inserted_id)
         return Attachment.model_validate(payload)
 
     async def list_paginated(self, limit: int, last_id: ObjectId | None = None, q: str | None = None) -> Tuple[List[Attachment], ObjectId | None]:
         filters: dict = {}
         if q:
-            filters = {"$or": [{"file_name": {"$regex": q, "$options": "i"}}, {"sha256": {"$regex": q, "$options": "i"}}]}
+            filters = prefix_match(q.strip().lower(), SEARCH_FIELDS)
         if last_id:
             filters.update({"_id": {"$lt": last_id}})
         cursor = self.db.attachments.find(filters).sort("_id", -1).limit(limit)
@@ -49,6 +58,10 @@ class AttachmentRepository:
                 last = None
         return items, last
 
+    async def search(self, term: str, limit: int, after: Tuple[int, ObjectId] | None = None) -> List[Dict[str, Any]]:
+        pipeline = search_pipeline(term, SEARCH_FIELDS, limit, after)
+        return await self.db.attachments.aggregate(pipeline).to_list(length=limit)
+
     async def get_by_id(self, att_id: str) -> Attachment | None:
         try:
             doc = await self.db.attachments.find_one({"_id": ObjectId(att_id)})
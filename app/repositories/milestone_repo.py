@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReplaceOne, UpdateMany
+from pymongo.errors import BulkWriteError
+
+from app.core.pagination import keyset_after
+from app.utils.time import utcnow
+
+# GET /milestones order; the cursor carries the last item's values (indexes in app.db.indexes)
+MILESTONE_SORT = [("start_date", 1), ("_id", 1)]
+
+_MILESTONE_FIELDS = ("milestone_key", "milestone_name", "environment", "start_date", "end_date", "status", "owner_id")
+_ENTRY_FIELDS = (*_MILESTONE_FIELDS, "release_id", "release_name", "approval_status")
+
+# Tombstones of removed milestones outlive any sync still in flight, then expire (TTL index on removed_at)
+TOMBSTONE_TTL_SECONDS = 24 * 3600
+
+
+def milestone_entry_id(release_oid: ObjectId, product_id: str, gate_name: str, milestone_key: str) -> str:
+    # Unit separator: cannot appear in ids typed by users, so keys never collide
+    return "\x1f".join((str(release_oid), product_id, gate_name, milestone_key))
+
+
+def milestone_entries(
+    release: Dict[str, Any], product_id: Optional[str] = None, gate_name: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Flat index documents for the milestones of ``release``, optionally limited to one product/gate."""
+    entries: List[Dict[str, Any]] = []
+    for p in release.get("products") or []:
+        if product_id is not None and p.get("product_id") != product_id:
+            continue
+        for g in p.get("quality_gates") or []:
+            if gate_name is not None and g.get("gate_name") != gate_name:
+                continue
+            for m in g.get("milestones") or []:
+                entry = {f: m.get(f) for f in _MILESTONE_FIELDS}
+                entry.update(
+                    _id=milestone_entry_id(release["_id"], p["product_id"], g["gate_name"], m["milestone_key"]),
+                    release_oid=release["_id"],
+                    release_id=release.get("release_id"),
+                    release_name=release.get("release_name"),
+                    product_id=p["product_id"],
+                    gate_name=g["gate_name"],
+                    approval_status=(m.get("approval") or {}).get("status"),
+                    version=int(release.get("version") or 0),
+                )
+                entries.append(entry)
+    return entries
+
+
+def _scope(release_oid: ObjectId, product_id: Optional[str], gate_name: Optional[str]) -> Dict[str, Any]:
+    scope: Dict[str, Any] = {"release_oid": release_oid}
+    if product_id is not None:
+        scope["product_id"] = product_id
+        if gate_name is not None:
+            scope["gate_name"] = gate_name
+    return scope
+
+
+def _older_than(version: int) -> Dict[str, Any]:
+    # Also matches entries written before versions were stored
+    return {"$not": {"$gte": version}}
+
+
+class MilestoneRepository:
+    """Denormalized copy of every release milestone in the ``milestones`` collection.
+
+    Release writes re-sync the narrowest scope they touched (whole release, one product or
+    one gate) so cross-release milestone queries never read release documents. Each entry
+    carries the release ``version`` it was copied from and is only replaced by a newer one,
+    so syncs of concurrent writes can land in any order. Removed milestones leave a
+    versioned tombstone (``removed_at``) for the same reason.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase[Dict[str, Any]]) -> None:
+        self.db = db
+
+    async def sync(self, release: Dict[str, Any], product_id: Optional[str] = None, gate_name: Optional[str] = None) -> None:
+        await self.sync_many([(release, product_id, gate_name)])
+
+    async def sync_many(self, scopes: Iterable[Tuple[Dict[str, Any], Optional[str], Optional[str]]]) -> None:
+        """Bring each ``(release, product_id, gate_name)`` scope up to that release's version in one bulk write."""
+        requests: List[Any] = []
+        now = utcnow()
+        for release, product_id, gate_name in scopes:
+            version = int(release.get("version") or 0)
+            entries = milestone_entries(release, product_id, gate_name)
+            stale = {**_scope(release["_id"], product_id, gate_name), "_id": {"$nin": [e["_id"] for e in entries]}}
+            requests.append(UpdateMany(
+                {**stale, "version": _older_than(version), "removed_at": {"$exists": False}},
+                {"$set": {"version": version, "removed_at": now}, "$unset": {f: "" for f in _ENTRY_FIELDS}},
+            ))
+            # An entry at this version or newer fails the filter, and the upsert then hits its _id: newer write won
+            requests.extend(ReplaceOne({"_id": e["_id"], "version": _older_than(version)}, e, upsert=True) for e in entries)
+        if not requests:
+            return
+        try:
+            await self.db.milestones.bulk_write(requests, ordered=False)
+        except BulkWriteError as exc:
+            if any(err.get("code") != 11000 for err in exc.details.get("writeErrors", [])) or exc.details.get("writeConcernErrors"):
+                raise
+
+    async def query(
+        self, filters: Dict[str, Any], limit: int, after: Optional[Tuple[Any, ...]] = None
+    ) -> List[Dict[str, Any]]:
+        filters = {**filters, "removed_at": {"$exists": False}}
+        if after is not None:
+            filters = {"$and": [filters, keyset_after(MILESTONE_SORT, after)]}
+        cursor = self.db.milestones.find(filters).sort(MILESTONE_SORT).limit(limit)
+        return [doc async for doc in cursor]
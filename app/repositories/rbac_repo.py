@@ -4,10 +4,14 @@ from typing import Optional, List, Any, Dict, Tuple
 
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import BulkWriteError
 
-from app.models.rbac import Role, User, RoleUpdate, UserUpdate
+from app.core.cache import invalidate_principal, invalidate_principals_with_role
+from app.models.rbac import Role, User, RoleUpdate, UserUpdate, permission_mask_expression
 from app.utils.time import utcnow
 
+PERMISSIONS_VERSION_KEY = "permissions_version"
+
 
 class RbacRepository:
     def __init__(self, db: AsyncIOMotorDatabase):
@@ -45,6 +49,18 @@ class RbacRepository:
         payload["_id"] = str(res.inserted_id)
         return self._to_user_model(payload)
 
+    async def insert_users_unordered(self, users: List[User]) -> Tuple[List[Optional[str]], Dict[int, Dict[str, Any]]]:
+        """Insert with one unordered insert_many; return (ids by position, write errors by position)."""
+        payloads = [u.model_dump(by_alias=True, exclude={"id"}) for u in users]
+        errors: Dict[int, Dict[str, Any]] = {}
+        try:
+            await self.db.users.insert_many(payloads, ordered=False)
+        except BulkWriteError as exc:
+            for err in exc.details.get("writeErrors", []):
+                errors[err["index"]] = err
+        ids = [None if i in errors else self._oid_to_str(p.get("_id")) for i, p in enumerate(payloads)]
+        return ids, errors
+
     async def find_user_by_username(self, username: str) -> Optional[User]:
         doc = await self.db.users.find_one({"username": username})
         return self._to_user_model(doc) if doc else None
@@ -59,13 +75,22 @@ class RbacRepository:
             doc = await self.db.users.find_one({"_id": ObjectId(user_id)})
             return self._to_user_model(doc) if doc else None
         res = await self.db.users.update_one({"_id": ObjectId(user_id)}, {"$set": sets})
+        invalidate_principal(user_id)
+        if "role_ids" in sets:
+            await self.bump_permissions_version()
         if res.matched_count == 0:
             return None
         doc = await self.db.users.find_one({"_id": ObjectId(user_id)})
         return self._to_user_model(doc) if doc else None
 
+    async def update_password_hash(self, user_id: str, password_hash: str) -> bool:
+        res = await self.db.users.update_one({"_id": ObjectId(user_id)}, {"$set": {"password_hash": password_hash}})
+        invalidate_principal(user_id)
+        return res.matched_count > 0
+
     async def delete_user(self, user_id: str) -> int:
         res = await self.db.users.delete_one({"_id": ObjectId(user_id)})
+        invalidate_principal(user_id)
         return res.deleted_count
 
     async def list_users(self, skip: int = 0, limit: int = 50) -> List[User]:
@@ -103,6 +128,9 @@ class RbacRepository:
 
     async def delete_role(self, role_id: str) -> int:
         res = await self.db.roles.delete_one({"_id": ObjectId(role_id)})
+        invalidate_principals_with_role(role_id)
+        if res.deleted_count:
+            await self.bump_permissions_version()
         return res.deleted_count
 
     async def update_role(self, role_id: str, patch: RoleUpdate) -> Role | None:
@@ -110,7 +138,15 @@ class RbacRepository:
         if not sets:
             doc = await self.db.roles.find_one({"_id": ObjectId(role_id)})
             return self._to_role_model(doc) if doc else None
-        res = await self.db.roles.update_one({"_id": ObjectId(role_id)}, {"$set": sets})
+        # Pipeline update so permission_mask is recomputed from the new flags in the same write
+        pipeline = [
+            {"$set": {k: {"$literal": v} for k, v in sets.items()}},
+            {"$set": {"permission_mask": permission_mask_expression()}},
+        ]
+        res = await self.db.roles.update_one({"_id": ObjectId(role_id)}, pipeline)
+        invalidate_principals_with_role(role_id)
+        if res.modified_count:
+            await self.bump_permissions_version()
         if res.matched_count == 0:
             return None
         doc = await self.db.roles.find_one({"_id": ObjectId(role_id)})
@@ -119,3 +155,11 @@ class RbacRepository:
     async def get_role_by_id(self, role_id: str) -> Optional[Role]:
         doc = await self.db.roles.find_one({"_id": ObjectId(role_id)})
         return self._to_role_model(doc) if doc else None
+
+    # --- permissions version stamp (stateless token mode) ---
+    async def get_permissions_version(self) -> int:
+        doc = await self.db.meta.find_one({"_id": PERMISSIONS_VERSION_KEY})
+        return int(doc.get("value", 0)) if doc else 0
+
+    async def bump_permissions_version(self) -> None:
+        await self.db.meta.update_one({"_id": PERMISSIONS_VERSION_KEY}, {"$inc": {"value": 1}}, upsert=True)
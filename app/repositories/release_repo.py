@@ -1,18 +1,146 @@
 from __future__ import annotations
 
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+
+from app.core.search import search_keys, search_pipeline
+
+# Lowercased copies of release_id / release_name, indexed for prefix search
+SEARCH_KEYS = {"release_id": "release_id_lc", "release_name": "release_name_lc"}
+
+
+def _window(array: Any, skip: int, limit: int) -> dict[str, Any]:
+    # Aggregation $slice: only these items of the array leave the server, plus its length
+    items = {"$ifNull": [array, []]}
+    return {"_id": 0, "items": {"$slice": [items, skip, limit]}, "total": {"$size": items}}
+
+
+def with_version_bump(update: dict[str, Any]) -> dict[str, Any]:
+    """Add ``$inc: {version: 1}`` so the write and the version bump are one atomic update."""
+    return {**update, "$inc": {**update.get("$inc", {}), "version": 1}}
+
+
+def with_search_keys(data: dict[str, Any]) -> dict[str, Any]:
+    """Return ``data`` plus the normalized search keys; call on every insert."""
+    return {**data, **search_keys(data, SEARCH_KEYS)}
 
 
 class ReleaseRepository:
-    def __init__(self, db: AsyncIOMotorDatabase) -> None:
+    def __init__(self, db: AsyncIOMotorDatabase[Dict[str, Any]]) -> None:
         self.db = db
 
-    async def get_by_id(self, id: str) -> Optional[dict]:
+    async def get_by_id(self, id: str) -> Optional[dict[str, Any]]:
         return await self.db.releases.find_one({"_id": ObjectId(id)})
 
     async def update(self, id: str, update: dict[str, Any]) -> int:
-        res = await self.db.releases.update_one({"_id": ObjectId(id)}, update)
+        res = await self.db.releases.update_one({"_id": ObjectId(id)}, with_version_bump(update))
         return res.modified_count
+
+    async def update_and_fetch(
+        self,
+        id: str | ObjectId,
+        update: dict[str, Any],
+        array_filters: Optional[List[dict[str, Any]]] = None,
+        expected_version: Optional[int] = None,
+        match: Optional[dict[str, Any]] = None,
+        session: Any = None,
+        projection: Optional[dict[str, Any]] = None,
+        return_document: bool = ReturnDocument.AFTER,
+    ) -> Optional[dict[str, Any]]:
+        """Apply ``update`` and return the post-update document in one round trip.
+
+        Returns None when no release has this id, when ``expected_version`` is given and
+        the stored version differs, or when the extra ``match`` criteria do not hold.
+        Pass ``session`` to run inside a transaction (see app.db.client.transaction), and
+        ``return_document=ReturnDocument.BEFORE`` (usually with a ``projection``) for the
+        pre-update document instead.
+        """
+        query: dict[str, Any] = {"_id": ObjectId(id), **(match or {})}
+        if expected_version is not None:
+            # Documents written before versioning have no field; treat them as version 0
+            query["version"] = expected_version if expected_version else {"$in": [0, None]}
+        kwargs: dict[str, Any] = {"return_document": return_document}
+        if array_filters:
+            kwargs["array_filters"] = array_filters
+        if session is not None:
+            kwargs["session"] = session
+        if projection is not None:
+            kwargs["projection"] = projection
+        doc: Optional[dict[str, Any]] = await self.db.releases.find_one_and_update(query, with_version_bump(update), **kwargs)
+        return doc
+
+    async def touch_runbooks(self, release_oid: ObjectId, session: Any = None) -> Optional[dict[str, Any]]:
+        """Count a write to the release's runbooks in ``runbooks_rev`` and return the release after it.
+
+        Runbooks live in their own collections and leave ``version`` alone; this counter is what
+        moves the release ETag when they change, so a conditional GET stays one indexed read.
+        """
+        kwargs: dict[str, Any] = {"return_document": ReturnDocument.AFTER}
+        if session is not None:
+            kwargs["session"] = session
+        doc: Optional[dict[str, Any]] = await self.db.releases.find_one_and_update(
+            {"_id": release_oid}, {"$inc": {"runbooks_rev": 1}}, **kwargs
+        )
+        return doc
+
+    async def get_version(self, query: dict[str, Any]) -> Optional[int]:
+        """Projection-only lookup used to answer conditional GETs; None when the release is missing."""
+        doc = await self.db.releases.find_one(query, {"version": 1})
+        return int(doc.get("version") or 0) if doc else None
+
+    async def insert_many_unordered(self, docs: List[dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+        """Insert ``docs`` in one unordered batch; return write errors keyed by position."""
+        errors: Dict[int, Dict[str, Any]] = {}
+        try:
+            await self.db.releases.insert_many(docs, ordered=False)
+        except BulkWriteError as exc:
+            for err in exc.details.get("writeErrors", []):
+                errors[err["index"]] = err
+        return errors
+
+    async def portfolio_summary(self, pipeline: List[dict[str, Any]]) -> dict[str, Any]:
+        docs = await self.db.releases.aggregate(pipeline).to_list(length=1)
+        return docs[0] if docs else {"items": [], "totals": []}
+
+    async def products_page(self, release_oid: ObjectId, skip: int, limit: int) -> Optional[dict[str, Any]]:
+        """``{"items", "total"}`` for one window of ``products``; None when the release is missing."""
+        return await self._first([{"$match": {"_id": release_oid}}, {"$project": _window("$products", skip, limit)}])
+
+    async def gates_page(self, release_oid: ObjectId, product_id: str, skip: int, limit: int) -> Optional[dict[str, Any]]:
+        """Window of one product's ``quality_gates``; None when the release or product is missing."""
+        product = {"$filter": {"input": "$products", "cond": {"$eq": ["$$this.product_id", {"$literal": product_id}]}}}
+        return await self._first([
+            {"$match": {"_id": release_oid, "products.product_id": product_id}},
+            {"$project": {"product": {"$arrayElemAt": [product, 0]}}},
+            {"$project": _window("$product.quality_gates", skip, limit)},
+        ])
+
+    async def inline_tasks_page(self, release_oid: ObjectId, runbook_id: str, skip: int, limit: int) -> Optional[dict[str, Any]]:
+        """Window of the tasks of a runbook still embedded in the release (not yet migrated to
+        ``RunbookRepository``); None when the release or runbook is missing."""
+        runbook = {"$filter": {"input": "$runbooks", "cond": {"$eq": ["$$this.runbook_id", {"$literal": runbook_id}]}}}
+        return await self._first([
+            {"$match": {"_id": release_oid, "runbooks.runbook_id": runbook_id}},
+            {"$project": {"runbook": {"$arrayElemAt": [runbook, 0]}}},
+            {"$project": _window("$runbook.tasks", skip, limit)},
+        ])
+
+    async def _first(self, pipeline: List[dict[str, Any]]) -> Optional[dict[str, Any]]:
+        docs = await self.db.releases.aggregate(pipeline).to_list(length=1)
+        return docs[0] if docs else None
+
+    async def search(
+        self,
+        term: str,
+        limit: int,
+        after: Optional[Tuple[int, ObjectId]] = None,
+        projection: Optional[dict[str, Any]] = None,
+        filters: Optional[dict[str, Any]] = None,
+    ) -> List[dict[str, Any]]:
+        pipeline = search_pipeline(term, list(SEARCH_KEYS.values()), limit, after, projection, filters)
+        # A short prefix can match most of the collection, and the rank is not indexed
+        return await self.db.releases.aggregate(pipeline, allowDiskUse=True).to_list(length=limit)
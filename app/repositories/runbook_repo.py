@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import random
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import DeleteMany, DeleteOne, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+# Revs of a release's runbook headers ``(runbook_id,)`` and tasks ``(runbook_id, task_name)``
+Revs = Dict[Tuple[str, ...], int]
+
+
+class RunbookConflict(Exception):
+    """A guarded runbook write found its runbook or task changed since it was loaded."""
+
+
+def runbook_id_of(op: Any) -> str:
+    """The runbook a runbook operation (see ReleaseService.apply_operations) writes to."""
+    runbook_id: str = op.runbook.runbook_id if op.op == "add_runbook" else op.runbook_id
+    return runbook_id
+
+
+def split_runbook(release_oid: ObjectId, runbook: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Turn an embedded runbook into its header document and one document per task.
+
+    ``rev`` is re-drawn on every write and guards concurrent ones (see ``RunbookRepository.claim``).
+    """
+    header = {k: v for k, v in runbook.items() if k != "tasks"}
+    header.update(release_oid=release_oid, rev=new_rev())
+    tasks = [
+        {**task, "release_oid": release_oid, "runbook_id": runbook["runbook_id"], "rev": new_rev()}
+        for task in runbook.get("tasks") or []
+    ]
+    return header, tasks
+
+
+def key_conflict(runbooks: Iterable[Dict[str, Any]]) -> Optional[str]:
+    """Describe the first runbook_id / task_name repeated within ``runbooks``, if any."""
+    seen: set[str] = set()
+    for rb in runbooks:
+        if rb["runbook_id"] in seen:
+            return f"duplicate runbook_id: {rb['runbook_id']}"
+        seen.add(rb["runbook_id"])
+        names = [t["task_name"] for t in rb.get("tasks") or []]
+        dup = next((n for i, n in enumerate(names) if n in names[:i]), None)
+        if dup is not None:
+            return f"duplicate task_name in runbook {rb['runbook_id']}: {dup}"
+    return None
+
+
+def merge_runbooks(inline: Optional[List[Dict[str, Any]]], stored: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Runbooks of a release that may still embed some (not yet migrated, see scripts/migrate_runbooks.py).
+
+    A runbook found in the collections wins over the embedded copy with the same runbook_id,
+    so a release caught between the two writes of its migration lists each runbook once.
+    """
+    ids = {rb["runbook_id"] for rb in stored}
+    return [rb for rb in inline or [] if rb.get("runbook_id") not in ids] + stored
+
+
+def new_rev() -> int:
+    return random.getrandbits(31)
+
+
+def _insert_only(doc: Dict[str, Any], *keys: str) -> UpdateOne:
+    # Upsert that never overwrites: a copy already in the collection keeps any write made to it since
+    return UpdateOne({k: doc[k] for k in ("release_oid", "runbook_id", *keys)}, {"$setOnInsert": doc}, upsert=True)
+
+
+def _strip(doc: Dict[str, Any], *keys: str) -> Dict[str, Any]:
+    return {k: v for k, v in doc.items() if k not in ("_id", "release_oid", "rev", *keys)}
+
+
+class RunbookRepository:
+    """Runbooks live outside the release document: headers in ``runbooks`` and tasks in
+    ``runbook_tasks``, keyed by ``(release_oid, runbook_id[, task_name])``. Task writes touch
+    one small document; callers then count them in the release's ``runbooks_rev`` (see
+    ``ReleaseRepository.touch_runbooks``). Insertion order (``_id``) is list order.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase[Dict[str, Any]]) -> None:
+        self.db = db
+
+    async def for_releases(self, release_oids: Iterable[ObjectId]) -> Dict[ObjectId, List[Dict[str, Any]]]:
+        """Runbooks of each release in the embedded shape (header fields plus ``tasks``)."""
+        composed, _ = await self._load(list(release_oids))
+        return composed
+
+    async def snapshot(self, release_oid: ObjectId) -> Tuple[List[Dict[str, Any]], Revs]:
+        """Runbooks of one release plus the rev of each header ``(runbook_id,)`` and task
+        ``(runbook_id, task_name)``, for the guarded writes of ``claim`` and ``apply``."""
+        composed, revs = await self._load([release_oid])
+        return composed[release_oid], {key[1:]: rev for key, rev in revs.items()}
+
+    async def _load(self, oids: List[ObjectId]) -> Tuple[Dict[ObjectId, List[Dict[str, Any]]], Dict[Tuple[Any, ...], int]]:
+        query = {"release_oid": {"$in": oids}}
+        composed: Dict[ObjectId, List[Dict[str, Any]]] = {oid: [] for oid in oids}
+        by_key: Dict[Tuple[ObjectId, str], Dict[str, Any]] = {}
+        rev_by_key: Dict[Tuple[Any, ...], int] = {}
+        async for header in self.db.runbooks.find(query).sort("_id", 1):
+            rb = {**_strip(header), "tasks": []}
+            by_key[(header["release_oid"], header["runbook_id"])] = rb
+            composed[header["release_oid"]].append(rb)
+            rev_by_key[(header["release_oid"], header["runbook_id"])] = header.get("rev")
+        async for task in self.db.runbook_tasks.find(query).sort("_id", 1):
+            rev_by_key[(task["release_oid"], task["runbook_id"], task["task_name"])] = task.get("rev")
+            owner = by_key.get((task["release_oid"], task["runbook_id"]))
+            if owner is not None:
+                owner["tasks"].append(_strip(task, "runbook_id"))
+        return composed, rev_by_key
+
+    async def tasks_page(
+        self, release_oid: ObjectId, runbook_id: str, limit: int, after: Optional[ObjectId] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Raw task documents of one runbook in list order after ``after``; None when the runbook is missing."""
+        key = {"release_oid": release_oid, "runbook_id": runbook_id}
+        if not await self.db.runbooks.find_one(key, {"_id": 1}):
+            return None
+        if after is not None:
+            key["_id"] = {"$gt": after}
+        return [task async for task in self.db.runbook_tasks.find(key).sort("_id", 1).limit(limit)]
+
+    async def add(self, release_oid: ObjectId, runbook: Dict[str, Any]) -> None:
+        """Insert a runbook with its tasks; raises DuplicateKeyError if the runbook_id exists."""
+        await self.insert([(release_oid, runbook)])
+
+    async def insert(self, entries: Iterable[Tuple[ObjectId, Dict[str, Any]]]) -> None:
+        """Insert embedded-shape runbooks for any number of releases in two round trips."""
+        headers: List[Dict[str, Any]] = []
+        tasks: List[Dict[str, Any]] = []
+        for release_oid, runbook in entries:
+            header, rb_tasks = split_runbook(release_oid, runbook)
+            headers.append(header)
+            tasks.extend(rb_tasks)
+        if headers:
+            await self.db.runbooks.insert_many(headers)
+        if tasks:
+            await self.db.runbook_tasks.insert_many(tasks)
+
+    async def migrate_release(self, release_oid: ObjectId) -> bool:
+        """``migrate_inline`` for a release only read by id; False when it embeds no runbooks."""
+        doc = await self.db.releases.find_one({"_id": release_oid, "runbooks.0": {"$exists": True}}, {"runbooks": 1})
+        if not doc or not doc.get("runbooks"):
+            return False
+        await self.migrate_inline(release_oid, doc["runbooks"])
+        return True
+
+    async def migrate_inline(self, release_oid: ObjectId, inline: List[Dict[str, Any]]) -> None:
+        """Move the runbooks still embedded in a release (``inline``) into the collections.
+
+        Runbook writes do this first on a release not migrated yet (see scripts/migrate_runbooks.py),
+        so they only ever write the collections. Copies are insert-only and go tasks first: readers
+        only compose tasks under a header and prefer a stored runbook (``merge_runbooks``), and a
+        runbook that already reached the collections keeps any write made to it since. The embedded
+        array is removed last; repeating or racing a migration is harmless.
+        """
+        headers: List[UpdateOne] = []
+        tasks: List[UpdateOne] = []
+        for rb in inline:
+            header, rb_tasks = split_runbook(release_oid, rb)
+            headers.append(_insert_only(header))
+            tasks.extend(_insert_only(t, "task_name") for t in rb_tasks)
+        for col, ops in ((self.db.runbook_tasks, tasks), (self.db.runbooks, headers)):
+            if not ops:
+                continue
+            try:
+                await col.bulk_write(ops, ordered=False)
+            except BulkWriteError as exc:
+                # A concurrent migration upserting the same key first is the only expected error
+                if any(err.get("code") != 11000 for err in exc.details.get("writeErrors", [])):
+                    raise
+        await self.db.releases.update_one({"_id": release_oid}, {"$unset": {"runbooks": ""}})
+
+    async def delete(self, release_oid: ObjectId, runbook_id: str) -> bool:
+        res = await self.db.runbooks.delete_one({"release_oid": release_oid, "runbook_id": runbook_id})
+        await self.db.runbook_tasks.delete_many({"release_oid": release_oid, "runbook_id": runbook_id})
+        return res.deleted_count > 0
+
+    async def update_task(self, release_oid: ObjectId, runbook_id: str, task_name: str, sets: Dict[str, Any]) -> bool:
+        """Write one task document; its new rev is what a concurrent ``claim`` or ``apply`` checks."""
+        query = {"release_oid": release_oid, "runbook_id": runbook_id, "task_name": task_name}
+        res = await self.db.runbook_tasks.update_one(query, {"$set": {**sets, "rev": new_rev()}})
+        return res.matched_count > 0
+
+    async def claim(self, release_oid: ObjectId, revs: Revs, ops: List[Any], session: Any = None) -> bool:
+        """Check that the runbooks and tasks ``ops`` write are still at their ``revs`` values, and
+        re-draw the rev of each touched runbook header so concurrent batches on it exclude each other.
+
+        Runbooks missing from ``revs`` must still be free. Returns False when any touched runbook,
+        or any loaded task that ``ops`` updates or deletes, was written, added or removed since
+        ``revs`` was loaded; otherwise records the claimed revs in ``revs``. Claims that went
+        through before a failing one are harmless: nothing reads header revs but these guards.
+        """
+        ids = sorted({runbook_id_of(op) for op in ops})
+        loaded = [rb for rb in ids if (rb,) in revs]
+        fresh = [rb for rb in ids if (rb,) not in revs]
+        if fresh and await self.db.runbooks.find_one(
+            {"release_oid": release_oid, "runbook_id": {"$in": fresh}}, {"_id": 1}, session=session
+        ):
+            return False
+        # Task writes leave the header alone, so the tasks this batch rewrites are checked directly
+        tasks = {(op.runbook_id, op.task_name) for op in ops if op.op in ("update_task", "delete_task")} & revs.keys()
+        if tasks:
+            query = {
+                "release_oid": release_oid,
+                "runbook_id": {"$in": sorted({rb for rb, _ in tasks})},
+                "task_name": {"$in": sorted({name for _, name in tasks})},
+            }
+            cursor = self.db.runbook_tasks.find(query, {"runbook_id": 1, "task_name": 1, "rev": 1}, session=session)
+            current = {(t["runbook_id"], t["task_name"]): t.get("rev") async for t in cursor}
+            if any(current.get(key) != revs[key] for key in tasks):
+                return False
+        if not loaded:
+            return True
+        claimed = {rb: new_rev() for rb in loaded}
+        res = await self.db.runbooks.bulk_write(
+            [
+                UpdateOne({"release_oid": release_oid, "runbook_id": rb, "rev": revs[(rb,)]}, {"$set": {"rev": rev}})
+                for rb, rev in claimed.items()
+            ],
+            ordered=False,
+            session=session,
+        )
+        revs.update(((rb,), rev) for rb, rev in claimed.items())
+        return res.matched_count == len(loaded)
+
+    async def apply(self, release_oid: ObjectId, ops: List[Any], revs: Revs, session: Any = None) -> None:
+        """Write already-validated runbook operations (see ReleaseService.apply_operations) in order.
+
+        ``revs`` comes from ``snapshot`` (and ``claim``): every delete or update of an existing
+        header or task matches its rev, and RunbookConflict is raised when any of them missed.
+        """
+        revs = dict(revs)
+        live: Dict[str, set[str]] = {rev_key[0]: set() for rev_key in revs if len(rev_key) == 1}
+        for rev_key in revs:
+            if len(rev_key) == 2:
+                live.setdefault(rev_key[0], set()).add(rev_key[1])
+        headers: List[Any] = []
+        tasks: List[Any] = []
+        # Documents the guarded writes must hit: headers deleted, tasks updated, tasks deleted
+        expected = [0, 0, 0]
+        for op in ops:
+            rb_id = runbook_id_of(op)
+            key = {"release_oid": release_oid, "runbook_id": rb_id}
+            if op.op == "add_runbook":
+                header, rb_tasks = split_runbook(release_oid, op.runbook.model_dump(by_alias=True))
+                headers.append(InsertOne(header))
+                tasks.extend(InsertOne(t) for t in rb_tasks)
+                revs[(rb_id,)] = header["rev"]
+                revs.update(((rb_id, t["task_name"]), t["rev"]) for t in rb_tasks)
+                live[rb_id] = {t["task_name"] for t in rb_tasks}
+            elif op.op == "delete_runbook":
+                headers.append(DeleteOne({**key, "rev": revs.pop((rb_id,))}))
+                tasks.append(DeleteMany(key))
+                names = live.pop(rb_id, set())
+                for name in names:
+                    revs.pop((rb_id, name), None)
+                expected[0] += 1
+                expected[2] += len(names)
+            elif op.op == "add_task":
+                task = {**op.task.model_dump(by_alias=True), **key, "rev": new_rev()}
+                tasks.append(InsertOne(task))
+                revs[(rb_id, task["task_name"])] = task["rev"]
+                live.setdefault(rb_id, set()).add(task["task_name"])
+            elif op.op == "update_task":
+                sets = {**op.patch.model_dump(exclude_unset=True), "rev": new_rev()}
+                tasks.append(UpdateOne({**key, "task_name": op.task_name, "rev": revs[(rb_id, op.task_name)]}, {"$set": sets}))
+                revs[(rb_id, op.task_name)] = sets["rev"]
+                expected[1] += 1
+            else:
+                tasks.append(DeleteOne({**key, "task_name": op.task_name, "rev": revs.pop((rb_id, op.task_name))}))
+                live[rb_id].discard(op.task_name)
+                expected[2] += 1
+        written = [0, 0, 0]
+        if headers:
+            res = await self.db.runbooks.bulk_write(headers, ordered=True, session=session)
+            written[0] = res.deleted_count
+        if tasks:
+            res = await self.db.runbook_tasks.bulk_write(tasks, ordered=True, session=session)
+            written[1:] = [res.matched_count, res.deleted_count]
+        if written != expected:
+            raise RunbookConflict(f"runbooks of release {release_oid} changed since they were loaded")
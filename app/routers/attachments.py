@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
 from app.core.pagination import PageQuery, Paginated, encode_cursor, try_decode_cursor
+from app.core.search import encode_search_cursor, normalize_term, try_decode_search_cursor
 from app.core.security import require_permissions
 from app.db.client import get_db
 from app.models.attachment import Attachment
-from app.repositories.attachment_repo import AttachmentRepository
+from app.repositories.attachment_repo import AttachmentRepository, with_search_keys
 
 router = APIRouter()
 
@@ -24,18 +25,26 @@ async def create_attachment(payload: Attachment, principal=Depends(require_permi
         exists["_id"] = str(exists.get("_id"))
         return Attachment.model_validate(exists)
     data = payload.model_dump(by_alias=True)
-    res = await db.attachments.insert_one(data)
+    res = await db.attachments.insert_one(with_search_keys(data))
     data["_id"] = str(res.inserted_id)
     return Attachment.model_validate(data)
 
 
 @router.get("/attachments", response_model=Paginated[Attachment], summary="List attachments (paginated)")
-async def list_attachments(q: str | None = None, page: PageQuery = Depends()):
+async def list_attachments(
+    q: str | None = Query(default=None, description="Case-insensitive prefix of file_name or sha256; results are ranked"),
+    page: PageQuery = Depends(),
+):
     db = get_db()
-    filters = {}
-    if q:
-        filters = {"$or": [{"file_name": {"$regex": q, "$options": "i"}}, {"sha256": {"$regex": q, "$options": "i"}}]}
+    term = normalize_term(q) if q else ""
+    if term:
+        docs = await repo().search(term, page.limit, try_decode_search_cursor(page.cursor))
+        next_cursor = encode_search_cursor(docs[-1]) if docs else None
+        for doc in docs:
+            doc["_id"] = str(doc["_id"])
+        return Paginated[Attachment](items=[Attachment.model_validate(d) for d in docs], next_cursor=next_cursor)
 
+    filters = {}
     last_id = try_decode_cursor(page.cursor)
     if last_id:
         filters.update({"_id": {"$lt": last_id}})
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, Header, HTTPException, status
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
 
 from app.core.config import settings
 from app.core.errors import ErrorCodes, error_response
-from app.core.security import decode_token, create_access_token, create_refresh_token, get_current_user, hash_password, verify_password
-from app.models.rbac import TokenPair, UserCreate, UserLogin, User, UserPublic, PasswordChange, PasswordReset
+from app.core.hashing import password_hasher
+from app.core.rate_limit import login_limiter
+from app.core.revocation import revocation_list
+from app.core.security import PERMISSION_CLAIMS, build_permission_claims, decode_token, create_access_token, create_refresh_token, get_current_user, hash_password, resolve_user, verify_password
+from app.models.rbac import LogoutRequest, TokenPair, UserCreate, UserLogin, User, UserPublic, PasswordChange, PasswordReset
 from app.services.rbac_service import AuthService
 from app.repositories.rbac_repo import RbacRepository
 from app.db.client import get_db
@@ -31,12 +36,15 @@ async def register_user(payload: UserCreate, svc: AuthService = Depends(get_auth
 
 
 @router.post("/login", response_model=TokenPair, summary="Login and get tokens")
-async def login(payload: UserLogin, svc: AuthService = Depends(get_auth_service)):
+async def login(payload: UserLogin, request: Request, svc: AuthService = Depends(get_auth_service)):
     username = payload.username
     password = payload.password
     if not username or not password:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="username and password required")
 
+    # Throttle before any bcrypt work so a stuffing burst cannot pin the CPU
+    await login_limiter.check(username, request.client.host if request.client else None)
+
     tokens = await svc.authenticate(username, password)
     if not tokens:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
@@ -54,22 +62,51 @@ async def refresh(authorization: str | None = Header(default=None)):
     user_id = payload.get("sub")
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token subject")
-    return TokenPair(access_token=create_access_token(user_id), refresh_token=create_refresh_token(user_id))
-
-
-@router.post("/logout", summary="Logout (stateless placeholder)")
-async def logout():
-    # With stateless JWT, logout is client-side (discard tokens). Placeholder for future blacklist.
-    return {"message": "Logged out (client should discard tokens)."}
+    claims: Dict[str, Any] = {}
+    if settings.AUTH_PERMISSIONS_IN_TOKEN:
+        rbac = repo()
+        version = await rbac.get_permissions_version()
+        if "pm" in payload and payload.get("pv") == version:
+            # Nothing changed since issue: carry the claims forward without touching users/roles
+            claims = {k: payload[k] for k in PERMISSION_CLAIMS if k in payload}
+        else:
+            user = await rbac.find_user_by_id(user_id)
+            if not user:
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+            claims = await build_permission_claims(rbac, user, version)
+    return TokenPair(access_token=create_access_token(user_id, **claims), refresh_token=create_refresh_token(user_id, **claims))
+
+
+@router.post("/logout", summary="Logout (revoke presented tokens)")
+async def logout(payload: LogoutRequest | None = None, authorization: str | None = Header(default=None)):
+    if not authorization or not authorization.lower().startswith("bearer "):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing token")
+    claims = decode_token(authorization.split(" ", 1)[1])
+    if not claims:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    revoke = [claims]
+    if payload and payload.refresh_token:
+        refresh_claims = decode_token(payload.refresh_token)
+        if refresh_claims and refresh_claims.get("sub") == claims.get("sub"):
+            revoke.append(refresh_claims)
+    db = get_db()
+    revoked = 0
+    for c in revoke:
+        if c.get("jti"):
+            await revocation_list.revoke(db, c["jti"], int(c["exp"]), user_id=c.get("sub"))
+            revoked += 1
+    return {"message": "Logged out", "revoked": revoked}
 
 
 @router.post("/change-password", summary="Change password for current user")
 async def change_password(payload: PasswordChange, principal = Depends(get_current_user)):
-    user = principal.user
-    if not verify_password(payload.old_password, user.password_hash):
+    user = await resolve_user(principal)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    if not await password_hasher.run(verify_password, payload.old_password, user.password_hash):
         raise HTTPException(status_code=400, detail="Old password incorrect")
-    new_hash = hash_password(payload.new_password)
-    await repo().update_user(str(user.id), type("Patch", (), {"model_dump": lambda self, **_: {"password_hash": new_hash}})())  # minimal patch injection
+    new_hash = await password_hasher.run(hash_password, payload.new_password)
+    await repo().update_password_hash(str(user.id), new_hash)
     return {"message": "Password changed"}
 
 
@@ -78,8 +115,8 @@ async def reset_password(user_id: str, payload: PasswordReset, principal = Depen
     # Basic permission gate: require manage roles
     if not principal.permissions.get("can_manage_roles"):
         raise HTTPException(status_code=403, detail="Forbidden")
-    new_hash = hash_password(payload.new_password)
-    updated = await repo().update_user(user_id, type("Patch", (), {"model_dump": lambda self, **_: {"password_hash": new_hash}})())
+    new_hash = await password_hasher.run(hash_password, payload.new_password)
+    updated = await repo().update_password_hash(user_id, new_hash)
     if not updated:
         raise HTTPException(status_code=404, detail="Not found")
     return {"message": "Password reset"}
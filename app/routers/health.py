@@ -1,6 +1,12 @@
+from typing import Any, Dict
+
 from fastapi import APIRouter
 
+from app.core.cache import portfolio_cache, principal_cache, token_cache
 from app.core.config import settings
+from app.core.hashing import password_hasher
+from app.core.rate_limit import login_limiter
+from app.core.revocation import revocation_list
 from app.utils.time import utcnow
 from app.db.client import get_db
 
@@ -35,6 +41,7 @@ async def health_details():
             "jiraboards",
             "releases",
             "attachments",
+            "revoked_tokens",
         ]:
             try:
                 info = await db[coll].index_information()
@@ -51,3 +58,16 @@ async def health_details():
         "env": settings.APP_ENV,
         "time": utcnow().isoformat().replace("+00:00", "Z"),
     }
+
+
+@router.get("/health/metrics", summary="In-process cache and limiter counters")
+async def health_metrics() -> Dict[str, Any]:
+    return {
+        "principal_cache": principal_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "portfolio_cache": portfolio_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "revocation_list": revocation_list.stats(),
+        "login_limiter": login_limiter.stats(),
+        "time": utcnow().isoformat().replace("+00:00", "Z"),
+    }
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.core.pagination import PageQuery, Paginated, encode_keyset, try_decode_keyset
+from app.db.client import get_db
+from app.models.milestone import MilestoneEntry
+from app.repositories.milestone_repo import MILESTONE_SORT, MilestoneRepository
+from app.utils.time import as_utc
+
+router = APIRouter()
+
+
+@router.get("/milestones", response_model=Paginated[MilestoneEntry], summary="Query milestones across releases")
+async def list_milestones(
+    environment: str | None = Query(default=None, min_length=1, max_length=64),
+    milestone_status: str | None = Query(default=None, alias="status", min_length=1, max_length=64),
+    owner_id: str | None = Query(default=None, min_length=1, max_length=128),
+    start_from: datetime | None = Query(default=None, description="start_date >= start_from"),
+    start_to: datetime | None = Query(default=None, description="start_date < start_to"),
+    page: PageQuery = Depends(),
+) -> Paginated[MilestoneEntry]:
+    """Served entirely from the ``milestones`` index collection, ordered by ``start_date``."""
+    # Same rule as the release date filters: naive bounds are UTC
+    start_from = as_utc(start_from) if start_from else None
+    start_to = as_utc(start_to) if start_to else None
+    if start_from and start_to and start_from >= start_to:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="start_from must be before start_to")
+    filters: dict[str, Any] = {}
+    for key, value in (("environment", environment), ("status", milestone_status), ("owner_id", owner_id)):
+        if value is not None:
+            filters[key] = value
+    if start_from or start_to:
+        filters["start_date"] = {k: v for k, v in (("$gte", start_from), ("$lt", start_to)) if v is not None}
+
+    after = try_decode_keyset(page.cursor, len(MILESTONE_SORT))
+    docs = await MilestoneRepository(get_db()).query(filters, page.limit, after)
+    next_cursor = encode_keyset(*(docs[-1].get(k) for k, _ in MILESTONE_SORT)) if docs else None
+    return Paginated[MilestoneEntry](items=[MilestoneEntry.model_validate(d) for d in docs], next_cursor=next_cursor)
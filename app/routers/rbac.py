@@ -1,11 +1,27 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+from typing import Any, Dict, List, Tuple
 
-from app.core.security import get_current_user, require_permissions
-from app.models.rbac import Role, User, UserCreate, RoleUpdate, UserUpdate, UserPublic, PERMISSION_DESCRIPTORS
-from app.repositories.rbac_repo import RbacRepository
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from pydantic import ValidationError
+
+from app.core.security import CurrentPrincipal, get_current_user, require_permissions, resolve_user
 from app.db.client import get_db
+from app.models.rbac import (
+    ALL_PERMISSIONS_MASK,
+    PERMISSION_BITS,
+    PERMISSION_DESCRIPTORS,
+    BulkUserReport,
+    BulkUserResult,
+    Role,
+    RoleUpdate,
+    User,
+    UserCreate,
+    UserPublic,
+    UserUpdate,
+)
+from app.repositories.rbac_repo import RbacRepository
 from app.services.rbac_service import AuthService
 
 router = APIRouter()
@@ -60,6 +76,49 @@ async def create_user(payload: UserCreate, _ = Depends(require_permissions("can_
     return user
 
 
+BULK_USERS_MAX_ROWS = 1000
+
+_BULK_USERS_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": {"type": "array", "items": {"$ref": "#/components/schemas/UserCreate"}}},
+            "application/x-ndjson": {"schema": {"type": "string", "description": "One UserCreate JSON object per line"}},
+        },
+    }
+}
+
+
+def _parse_bulk_rows(raw: bytes, content_type: str) -> List[Any]:
+    try:
+        if "ndjson" in content_type:
+            return [json.loads(line) for line in raw.decode().splitlines() if line.strip()]
+        rows = json.loads(raw or b"[]")
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Body must be a JSON array or NDJSON") from exc
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Body must be a JSON array or NDJSON")
+    return rows
+
+
+@router.post("/rbac/users/bulk", response_model=BulkUserReport, summary="Bulk create users (JSON array or NDJSON)", openapi_extra=_BULK_USERS_BODY)
+async def bulk_create_users(
+    request: Request, _: CurrentPrincipal = Depends(require_permissions("can_manage_roles")), svc: AuthService = Depends(auth_service)
+) -> BulkUserReport:
+    rows = _parse_bulk_rows(await request.body(), request.headers.get("content-type", ""))
+    if len(rows) > BULK_USERS_MAX_ROWS:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"At most {BULK_USERS_MAX_ROWS} users per request")
+    valid: List[Tuple[int, UserCreate]] = []
+    invalid: List[BulkUserResult] = []
+    for i, row in enumerate(rows):
+        try:
+            valid.append((i, UserCreate.model_validate(row)))
+        except ValidationError as exc:
+            username = row.get("username") if isinstance(row, dict) else None
+            invalid.append(BulkUserResult(index=i, status="invalid", username=username, error=exc.errors()[0]["msg"]))
+    return await svc.register_users_bulk(valid, invalid)
+
+
 @router.get("/rbac/users", response_model=list[User], summary="List users (limited)")
 async def list_users(skip: int = 0, limit: int = 50, _=Depends(require_permissions("can_manage_roles"))):
     users = await repo().list_users(skip=skip, limit=limit)
@@ -95,6 +154,15 @@ async def permissions_matrix(_=Depends(require_permissions("can_manage_roles")))
     return PERMISSION_DESCRIPTORS
 
 
+@router.get("/rbac/permissions-matrix/bits", summary="List permission flags with their bit in permission_mask")
+async def permissions_matrix_bits(_: CurrentPrincipal = Depends(require_permissions("can_manage_roles"))) -> Dict[str, Any]:
+    return {
+        "descriptors": PERMISSION_DESCRIPTORS,
+        "bits": PERMISSION_BITS,
+        "all_mask": ALL_PERMISSIONS_MASK,
+    }
+
+
 @router.post("/rbac/users/{user_id}/roles/{role_id}", summary="Assign role to user")
 async def assign_role(user_id: str, role_id: str, _=Depends(require_permissions("can_manage_roles"))):
     user = await repo().find_user_by_id(user_id)
@@ -119,7 +187,9 @@ async def remove_role(user_id: str, role_id: str, _=Depends(require_permissions(
 
 @router.get("/rbac/me", response_model=UserPublic, summary="Current user profile")
 async def me(principal = Depends(get_current_user)):
-    user = principal.user
+    user = await resolve_user(principal)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return UserPublic(
         id=str(user.id),
         username=user.username,
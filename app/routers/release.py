@@ -1,32 +1,100 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any
+from typing import Any, Literal
 
 from bson import ObjectId
-from fastapi import APIRouter, Depends, HTTPException, status
-
-from app.core.pagination import PageQuery, Paginated, encode_cursor, try_decode_cursor
-from app.core.security import get_current_user, require_permissions
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pymongo.errors import DuplicateKeyError
+
+from app.core.cache import portfolio_cache
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.core.pagination import (
+    PageQuery,
+    Paginated,
+    encode_cursor,
+    encode_keyset,
+    keyset_after,
+    try_decode_cursor,
+    try_decode_keyset,
+)
+from app.core.projection import FieldSet, sparse_fields
+from app.core.responses import ORJSONResponse, model_response
+from app.core.search import encode_search_cursor, normalize_term, try_decode_search_cursor
+from app.core.security import ensure_permissions, get_current_user, require_permissions
 from app.db.client import get_db
 from app.models.common import AttachmentRef
 from app.models.release import (
+    AddGateOp,
+    AddMilestoneOp,
+    AddProductOp,
     ApproveMilestoneRequest,
+    DeleteGateOp,
+    DeleteMilestoneOp,
+    DeleteProductOp,
+    PortfolioSummary,
+    PortfolioTotals,
     Release,
     ReleaseChange,
     ReleaseDescriptionUpdate,
+    ReleaseImportReport,
+    ReleaseListItem,
     ReleaseMilestone,
+    ReleaseOperationsRequest,
     ReleaseProduct,
     ReleaseProductQualityGate,
     ReleaseRunbook,
+    ReleaseRunbookTask,
+    UpdateGateOp,
     UpdateMilestone,
+    UpdateMilestoneOp,
     UpdateQualityGate,
     UpdateRunbookTask,
 )
-from app.utils.time import utcnow
+from app.repositories.milestone_repo import MilestoneRepository
+from app.repositories.release_repo import ReleaseRepository, with_search_keys
+from app.repositories.runbook_repo import RunbookRepository, key_conflict, merge_runbooks
+from app.services.release_export import (
+    EXPORT_BATCH_SIZE,
+    EXPORT_PROJECTION,
+    csv_chunks,
+    gzip_chunks,
+    ndjson_chunks,
+)
+from app.services.release_service import ReleaseService
+from app.services.release_summary import (
+    FLAG_COUNTERS,
+    compute_summary,
+    portfolio_pipeline,
+    summary_flags,
+    summary_view,
+)
+from app.utils.ndjson import iter_ndjson
+from app.utils.time import as_utc, utcnow
 
 router = APIRouter()
 
+# Patch fields that feed the stored release summary; other patches skip the summary bookkeeping
+SUMMARY_GATE_FIELDS = {"gate_status", "required"}
+SUMMARY_MILESTONE_FIELDS = {"status", "start_date"}
+
+# ?fields= / ?exclude= on release reads
+release_fields = sparse_fields(Release)
+
+# GET /releases order; the cursor carries the last item's values for every key (index in app.db.indexes)
+LIST_SORT = [("release_date", -1), ("_id", -1)]
+
+# ReleaseListItem columns: the summary counters behind its flags, never products or runbooks
+LIST_ITEM_PROJECTION = {
+    "release_id": 1,
+    "release_name": 1,
+    "release_date": 1,
+    "release_type": 1,
+    "product_count": {"$size": {"$ifNull": ["$products", []]}},
+    **{f"summary.{key}": 1 for key in FLAG_COUNTERS},
+}
+
 
 @router.post("/releases", response_model=Release, summary="Create release")
 async def create_release(payload: Release, principal=Depends(require_permissions("can_create_release"))):  # noqa: ARG001
@@ -34,172 +102,380 @@ async def create_release(payload: Release, principal=Depends(require_permissions
     if await db.releases.find_one({"release_id": payload.release_id}):
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="release_id exists")
     data = payload.model_dump(by_alias=True)
-    res = await db.releases.insert_one(data)
-    data["_id"] = str(res.inserted_id)
-    return Release.model_validate(data)
+    conflict = key_conflict(data["runbooks"])
+    if conflict:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=conflict)
+    runbooks = data.pop("runbooks")  # stored in their own collections (RunbookRepository)
+    data["version"] = 0  # server-owned; bumped by every mutation
+    data["summary"] = compute_summary(data)
+    res = await db.releases.insert_one(with_search_keys(data))
+    await RunbookRepository(db).insert((res.inserted_id, rb) for rb in runbooks)
+    await MilestoneRepository(db).sync({**data, "_id": res.inserted_id})
+    data["_id"] = res.inserted_id
+    data["runbooks"] = runbooks
+    return model_response(Release, data)
+
+
+@router.post(
+    "/releases/import",
+    response_model=ReleaseImportReport,
+    summary="Bulk import releases (streamed NDJSON)",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/x-ndjson": {"schema": {"type": "string", "description": "One Release JSON object per line"}}},
+        }
+    },
+)
+async def import_releases(request: Request, _=Depends(require_permissions("can_create_release"))):
+    return await ReleaseService(get_db()).import_releases(iter_ndjson(request.stream()))
 
 
-@router.get("/releases", response_model=Paginated[Release], summary="List releases (paginated)")
-async def list_releases(q: str | None = None, page: PageQuery = Depends()):
-    db = get_db()
-    filters: dict[str, Any] = {}
-    if q:
-        filters = {"$or": [{"release_id": {"$regex": q, "$options": "i"}}, {"release_name": {"$regex": q, "$options": "i"}}]}
+def _wants_runbooks(fs: FieldSet | None) -> bool:
+    return fs is None or "runbooks" in fs.names
 
-    last_id = try_decode_cursor(page.cursor)
-    if last_id:
-        filters.update({"_id": {"$lt": last_id}})
 
-    cursor = db.releases.find(filters).sort("release_date", -1).limit(page.limit)
-    items: list[Release] = []
-    last = None
-    async for doc in cursor:
-        last = doc["_id"]
-        doc["_id"] = str(doc["_id"])
-        items.append(Release.model_validate(doc))
+async def _attach_runbooks(db: Any, docs: list[dict]) -> None:
+    # Runbooks live in their own collections; only releases not yet migrated still embed some
+    by_release = await RunbookRepository(db).for_releases(d["_id"] for d in docs)
+    for doc in docs:
+        doc["runbooks"] = merge_runbooks(doc.get("runbooks"), by_release.get(doc["_id"], []))
 
-    next_cursor = encode_cursor(last) if last else None
-    return Paginated[Release](items=items, next_cursor=next_cursor)
+
+def _projection_including(fs: FieldSet | None, *keys: str) -> dict[str, int] | None:
+    # Keys the handler itself needs (ETag version, cursor sort keys) even when the caller did not select them
+    if fs is None:
+        return None
+    if any(fs.projection.values()):
+        return {**fs.projection, **{k: 1 for k in keys}}
+    return {k: v for k, v in fs.projection.items() if k not in keys} or None
+
+
+def _date_range(date_from: datetime | None, date_to: datetime | None) -> dict[str, Any]:
+    # Query strings may mix naive and offset-qualified bounds; compare and query in UTC
+    date_from = as_utc(date_from) if date_from else None
+    date_to = as_utc(date_to) if date_to else None
+    if date_from and date_to and date_from >= date_to:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="'from' must be before 'to'")
+    if not (date_from or date_to):
+        return {}
+    return {"release_date": {k: v for k, v in (("$gte", date_from), ("$lt", date_to)) if v is not None}}
+
+
+def release_filters(
+    release_type: str | None = Query(default=None, min_length=1, max_length=64),
+    date_from: datetime | None = Query(default=None, alias="from", description="release_date >= from"),
+    date_to: datetime | None = Query(default=None, alias="to", description="release_date < to"),
+    application_id: str | None = Query(default=None, min_length=1, max_length=128, description="Release scope includes this application"),
+    squad_id: str | None = Query(default=None, min_length=1, max_length=128, description="Release includes this squad"),
+    product_id: str | None = Query(default=None, min_length=1, max_length=128, description="Release contains this product"),
+) -> dict[str, Any]:
+    """Equality/range filters for GET /releases; each has a (field, release_date, _id) index."""
+    filters = _date_range(date_from, date_to)
+    for key, value in (
+        ("release_type", release_type),
+        ("scope_application_ids", application_id),
+        ("squad_ids", squad_id),
+        ("products.product_id", product_id),
+    ):
+        if value is not None:
+            filters[key] = value
+    return filters
+
+
+@router.get(
+    "/releases",
+    response_model=Paginated[ReleaseListItem] | Paginated[Release],
+    summary="List releases (paginated)",
+    description="List items by default; `expand=full` (or `fields`/`exclude`, which select from the full release) returns releases.",
+)
+async def list_releases(
+    q: str | None = Query(default=None, description="Case-insensitive prefix of release_id or release_name; results are ranked"),
+    expand: Literal["full"] | None = Query(default=None, description="full: whole releases instead of list items"),
+    page: PageQuery = Depends(),
+    fs: FieldSet | None = Depends(release_fields),
+    filters: dict[str, Any] = Depends(release_filters),
+):
+    db = get_db()
+    full = expand == "full" or fs is not None
+    term = normalize_term(q) if q else ""
+    if term:
+        return await _search_releases(db, term, page, fs, filters, full)
+
+    after = try_decode_keyset(page.cursor, len(LIST_SORT))
+    if after:
+        filters.update(keyset_after(LIST_SORT, after))
+
+    projection = _projection_including(fs, *(key for key, _ in LIST_SORT)) if full else LIST_ITEM_PROJECTION
+    docs = [doc async for doc in db.releases.find(filters, projection).sort(LIST_SORT).limit(page.limit)]
+    if full and docs and _wants_runbooks(fs):
+        await _attach_runbooks(db, docs)
+    next_cursor = encode_keyset(*(docs[-1].get(key) for key, _ in LIST_SORT)) if docs else None
+    return _release_page(docs, next_cursor, fs, full)
+
+
+def _release_page(docs: list[dict], next_cursor: str | None, fs: FieldSet | None, full: bool) -> ORJSONResponse:
+    if not full:
+        for doc in docs:
+            summary = doc.get("summary")
+            doc["flags"] = summary_flags(summary) if summary else None
+        return model_response(Paginated[ReleaseListItem], {"items": docs, "next_cursor": next_cursor})
+    return model_response(Paginated[fs.model if fs else Release], {"items": docs, "next_cursor": next_cursor})
+
+
+async def _search_releases(
+    db: Any, term: str, page: PageQuery, fs: FieldSet | None, filters: dict[str, Any], full: bool
+) -> ORJSONResponse:
+    projection = (fs.projection if fs else None) if full else LIST_ITEM_PROJECTION
+    docs = await ReleaseRepository(db).search(term, page.limit, try_decode_search_cursor(page.cursor), projection, filters)
+    next_cursor = encode_search_cursor(docs[-1]) if docs else None
+    if full and docs and _wants_runbooks(fs):
+        await _attach_runbooks(db, docs)
+    return _release_page(docs, next_cursor, fs, full)
+
+
+@router.get("/releases/summary", response_model=PortfolioSummary, summary="Readiness across releases (one aggregation)")
+async def portfolio_summary(
+    date_from: datetime | None = Query(default=None, alias="from", description="release_date >= from"),
+    date_to: datetime | None = Query(default=None, alias="to", description="release_date < to"),
+    release_type: str | None = None,
+    limit: int = Query(default=200, ge=1, le=1000),
+):
+    key = (date_from, date_to, release_type, limit)
+    cached = portfolio_cache.get(key)
+    if cached is not None:
+        return cached
+    match = _date_range(date_from, date_to)
+    if release_type:
+        match["release_type"] = release_type
+    raw = await ReleaseRepository(get_db()).portfolio_summary(portfolio_pipeline(match, limit))
+    for item in raw["items"]:
+        item["_id"] = str(item["_id"])
+    totals = raw["totals"][0] if raw["totals"] else {}
+    result = PortfolioSummary(totals=PortfolioTotals(**{k: v for k, v in totals.items() if k != "_id"}), items=raw["items"])
+    portfolio_cache.set(key, result)
+    return result
+
+
+@router.get(
+    "/releases/export",
+    summary="Stream releases as NDJSON or CSV (one row per milestone)",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}, "text/csv": {}}}},
+)
+async def export_releases(
+    fmt: Literal["ndjson", "csv"] = Query(default="ndjson", alias="format"),
+    gzip: bool = Query(default=False, description="Compress the stream (Content-Encoding: gzip)"),
+    filters: dict[str, Any] = Depends(release_filters),
+):
+    cursor = get_db().releases.find(filters, EXPORT_PROJECTION, batch_size=EXPORT_BATCH_SIZE).sort(LIST_SORT)
+    chunks = csv_chunks(cursor) if fmt == "csv" else ndjson_chunks(cursor)
+    headers = {"Content-Disposition": f'attachment; filename="releases.{fmt}"'}
+    if gzip:
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+
+def _release_query(id_or_key: str) -> dict[str, Any]:
+    if ObjectId.is_valid(id_or_key):
+        return {"_id": ObjectId(id_or_key)}
+    return {"release_id": id_or_key}
+
+
+def _release_etag(id_or_key: str, fs: FieldSet | None, doc: dict) -> str:
+    variant = list(fs.names) if fs else []
+    if _wants_runbooks(fs):
+        # Runbook writes leave the release version alone and count in runbooks_rev instead
+        variant.append(f"runbooks-{int(doc.get('runbooks_rev') or 0)}")
+    return make_etag(id_or_key, int(doc.get("version") or 0), variant or None)
 
 
 @router.get("/releases/{id_or_key}", response_model=Release, summary="Get release by id or key")
-async def get_release(id_or_key: str):
+async def get_release(
+    id_or_key: str,
+    fs: FieldSet | None = Depends(release_fields),
+    if_none_match: str | None = Header(default=None),
+):
     db = get_db()
-    doc = None
-    try:
-        doc = await db.releases.find_one({"_id": ObjectId(id_or_key)})
-    except Exception:
-        doc = await db.releases.find_one({"release_id": id_or_key})
+    query = _release_query(id_or_key)
+    with_runbooks = _wants_runbooks(fs)
+    if if_none_match:
+        head = await db.releases.find_one(query, {"version": 1, "runbooks_rev": 1})
+        if head is not None:
+            etag = _release_etag(id_or_key, fs, head)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+    keys = ("version", "runbooks_rev") if with_runbooks else ("version",)
+    doc = await db.releases.find_one(query, _projection_including(fs, *keys))
     if not doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
-    doc["_id"] = str(doc["_id"])
-    return Release.model_validate(doc)
+    if with_runbooks:
+        await _attach_runbooks(db, [doc])
+    return model_response(fs.model if fs else Release, doc, headers={"ETag": _release_etag(id_or_key, fs, doc)})
 
 
-@router.patch("/releases/{id}/description", response_model=Release, summary="Update release description")
-async def update_release_description(id: str, payload: ReleaseDescriptionUpdate, _=Depends(require_permissions("can_edit_release_description"))):
-    db = get_db()
-    oid = ObjectId(id)
-    await db.releases.update_one({"_id": oid}, {"$set": {"description": payload.description}})
-    doc = await db.releases.find_one({"_id": oid})
+async def _to_release(doc: dict | None, detail: str = "Not found") -> ORJSONResponse:
+    if not doc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+    doc = dict(doc)
+    await _attach_runbooks(get_db(), [doc])
+    return model_response(Release, doc)
+
+
+async def _synced(doc: dict | None, product_id: str | None = None, gate_name: str | None = None) -> dict | None:
+    # Every write that can change milestones refreshes the milestone index for the scope it touched
+    if doc:
+        await MilestoneRepository(get_db()).sync(doc, product_id, gate_name)
+    return doc
+
+
+async def _writable_runbooks(db: Any, oid: ObjectId) -> RunbookRepository:
+    # Runbook writes only go to the collections: a release not migrated yet moves its embedded runbooks first
+    doc = await db.releases.find_one({"_id": oid}, {"runbooks": 1})
     if not doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
-    doc["_id"] = str(doc["_id"])
-    return Release.model_validate(doc)
+    runbooks = RunbookRepository(db)
+    if doc.get("runbooks"):
+        await runbooks.migrate_inline(oid, doc["runbooks"])
+    return runbooks
+
+
+@router.patch("/releases/{id}/description", response_model=Release, summary="Update release description")
+async def update_release_description(id: str, payload: ReleaseDescriptionUpdate, _=Depends(require_permissions("can_edit_release_description"))):
+    doc = await ReleaseRepository(get_db()).update_and_fetch(id, {"$set": {"description": payload.description}})
+    return await _to_release(doc)
 
 
 @router.post("/releases/{id}/products", response_model=Release, summary="Add product to release")
 async def add_product(id: str, payload: ReleaseProduct, _=Depends(require_permissions("can_manage_quality_gates"))):
-    db = get_db()
-    oid = ObjectId(id)
+    op = AddProductOp(op="add_product", product=payload)
     update = {"$push": {"products": payload.model_dump(by_alias=True)}}
-    res = await db.releases.update_one({"_id": oid}, update)
-    if res.matched_count == 0:
+    doc = await ReleaseService(get_db()).apply_tracked(id, op, update, addition_match={})
+    return await _to_release(await _synced(doc, payload.product_id))
+
+
+def _offset(cursor: str | None) -> int:
+    # Nested arrays page by position; a bad cursor restarts at the first item, as keyset cursors do
+    after = try_decode_keyset(cursor, 1)
+    return after[0] if after and isinstance(after[0], int) and after[0] >= 0 else 0
+
+
+def _window_page(model: Any, window: dict, skip: int) -> ORJSONResponse:
+    end = skip + len(window["items"])
+    next_cursor = encode_keyset(end) if end < window["total"] else None
+    return model_response(Paginated[model], {"items": window["items"], "next_cursor": next_cursor})
+
+
+@router.get("/releases/{id}/products", response_model=Paginated[ReleaseProduct], summary="List release products (paginated)")
+async def list_products(id: str, page: PageQuery = Depends()):
+    skip = _offset(page.cursor)
+    window = await ReleaseRepository(get_db()).products_page(ObjectId(id), skip, page.limit)
+    if window is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
-    doc = await db.releases.find_one({"_id": oid})
-    doc["_id"] = str(doc["_id"])
-    return Release.model_validate(doc)
+    return _window_page(ReleaseProduct, window, skip)
+
+
+@router.get(
+    "/releases/{id}/products/{product_id}/gates",
+    response_model=Paginated[ReleaseProductQualityGate],
+    summary="List quality gates of a product (paginated)",
+)
+async def list_quality_gates(id: str, product_id: str, page: PageQuery = Depends()):
+    skip = _offset(page.cursor)
+    window = await ReleaseRepository(get_db()).gates_page(ObjectId(id), product_id, skip, page.limit)
+    if window is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Release or product not found")
+    return _window_page(ReleaseProductQualityGate, window, skip)
 
 
 @router.delete("/releases/{id}/products/{product_id}", response_model=Release, summary="Delete product")
 async def delete_product(id: str, product_id: str, _=Depends(require_permissions("can_manage_quality_gates"))):
-    db = get_db()
-    oid = ObjectId(id)
-    await db.releases.update_one({"_id": oid}, {"$pull": {"products": {"product_id": product_id}}})
-    doc = await db.releases.find_one({"_id": oid})
-    if not doc:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
-    doc["_id"] = str(doc["_id"])
-    return Release.model_validate(doc)
+    op = DeleteProductOp(op="delete_product", product_id=product_id)
+    doc = await ReleaseService(get_db()).apply_tracked(id, op, {"$pull": {"products": {"product_id": product_id}}})
+    return await _to_release(await _synced(doc, product_id))
 
 
 @router.post("/releases/{id}/products/{product_id}/gates", response_model=Release, summary="Add quality gate")
 async def add_quality_gate(id: str, product_id: str, payload: ReleaseProductQualityGate, _=Depends(require_permissions("can_manage_quality_gates"))):
-    db = get_db()
-    oid = ObjectId(id)
+    op = AddGateOp(op="add_gate", product_id=product_id, gate=payload)
     update = {"$push": {"products.$[p].quality_gates": payload.model_dump(by_alias=True)}}
-    res = await db.releases.update_one({"_id": oid}, update, array_filters=[{"p.product_id": product_id}])
-    if res.matched_count == 0:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Release or product not found")
-    doc = await db.releases.find_one({"_id": oid})
-    doc["_id"] = str(doc["_id"])
-    return Release.model_validate(doc)
+    doc = await ReleaseService(get_db()).apply_tracked(
+        id, op, update, array_filters=[{"p.product_id": product_id}], addition_match={"products.product_id": product_id}
+    )
+    return await _to_release(await _synced(doc, product_id, payload.gate_name), "Release or product not found")
 
 
 @router.delete("/releases/{id}/products/{product_id}/gates/{gate_name}", response_model=Release, summary="Delete quality gate")
 async def delete_quality_gate(id: str, product_id: str, gate_name: str, _=Depends(require_permissions("can_manage_quality_gates"))):
-    db = get_db()
-    oid = ObjectId(id)
     # Pull the gate from product
-    await db.releases.update_one({"_id": oid, "products.product_id": product_id}, {"$pull": {"products.$.quality_gates": {"gate_name": gate_name}}})
-    doc = await db.releases.find_one({"_id": oid})
-    if not doc:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
-    doc["_id"] = str(doc["_id"])
-    return Release.model_validate(doc)
+    op = DeleteGateOp(op="delete_gate", product_id=product_id, gate_name=gate_name)
+    doc = await ReleaseService(get_db()).apply_tracked(
+        id,
+        op,
+        {"$pull": {"products.$[p].quality_gates": {"gate_name": gate_name}}},
+        array_filters=[{"p.product_id": product_id}],
+    )
+    return await _to_release(await _synced(doc, product_id, gate_name))
 
 
 @router.patch("/releases/{id}/products/{product_id}/gates/{gate_name}", response_model=Release, summary="Update quality gate")
 async def update_quality_gate(id: str, product_id: str, gate_name: str, payload: UpdateQualityGate, _=Depends(require_permissions("can_manage_quality_gates"))):
-    db = get_db()
-    oid = ObjectId(id)
     sets: dict[str, Any] = {}
     for key, value in payload.model_dump(exclude_unset=True).items():
         sets[f"products.$[p].quality_gates.$[g].{key}"] = value
     if not sets:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No fields to update")
-    res = await db.releases.update_one({"_id": oid}, {"$set": sets}, array_filters=[{"p.product_id": product_id}, {"g.gate_name": gate_name}])
-    if res.matched_count == 0:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Release/product/gate not found")
-    doc = await db.releases.find_one({"_id": oid})
-    doc["_id"] = str(doc["_id"])
-    return Release.model_validate(doc)
+    array_filters = [{"p.product_id": product_id}, {"g.gate_name": gate_name}]
+    if SUMMARY_GATE_FIELDS & payload.model_fields_set:
+        op = UpdateGateOp(op="update_gate", product_id=product_id, gate_name=gate_name, patch=payload)
+        doc = await ReleaseService(get_db()).apply_tracked(id, op, {"$set": sets}, array_filters=array_filters)
+    else:
+        doc = await ReleaseRepository(get_db()).update_and_fetch(id, {"$set": sets}, array_filters=array_filters)
+    return await _to_release(doc, "Release/product/gate not found")
 
 
 @router.post("/releases/{id}/products/{product_id}/gates/{gate_name}/milestones", response_model=Release, summary="Add milestone")
 async def add_milestone(id: str, product_id: str, gate_name: str, payload: ReleaseMilestone, _=Depends(require_permissions("can_manage_quality_gates"))):
-    db = get_db()
-    oid = ObjectId(id)
+    op = AddMilestoneOp(op="add_milestone", product_id=product_id, gate_name=gate_name, milestone=payload)
     update = {"$push": {"products.$[p].quality_gates.$[g].milestones": payload.model_dump(by_alias=True)}}
-    res = await db.releases.update_one({"_id": oid}, update, array_filters=[{"p.product_id": product_id}, {"g.gate_name": gate_name}])
-    if res.matched_count == 0:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Release/product/gate not found")
-    doc = await db.releases.find_one({"_id": oid})
-    doc["_id"] = str(doc["_id"])
-    return Release.model_validate(doc)
+    doc = await ReleaseService(get_db()).apply_tracked(
+        id,
+        op,
+        update,
+        array_filters=[{"p.product_id": product_id}, {"g.gate_name": gate_name}],
+        addition_match={"products": {"$elemMatch": {"product_id": product_id, "quality_gates.gate_name": gate_name}}},
+    )
+    return await _to_release(await _synced(doc, product_id, gate_name), "Release/product/gate not found")
 
 
 @router.delete("/releases/{id}/products/{product_id}/gates/{gate_name}/milestones/{milestone_key}", response_model=Release, summary="Delete milestone")
 async def delete_milestone(id: str, product_id: str, gate_name: str, milestone_key: str, _=Depends(require_permissions("can_manage_quality_gates"))):
-    db = get_db()
-    oid = ObjectId(id)
-    await db.releases.update_one({"_id": oid, "products.product_id": product_id}, {"$pull": {"products.$.quality_gates.$[g].milestones": {"milestone_key": milestone_key}}}, array_filters=[{"g.gate_name": gate_name}])
-    doc = await db.releases.find_one({"_id": oid})
-    if not doc:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
-    doc["_id"] = str(doc["_id"])
-    return Release.model_validate(doc)
+    op = DeleteMilestoneOp(op="delete_milestone", product_id=product_id, gate_name=gate_name, milestone_key=milestone_key)
+    doc = await ReleaseService(get_db()).apply_tracked(
+        id,
+        op,
+        {"$pull": {"products.$[p].quality_gates.$[g].milestones": {"milestone_key": milestone_key}}},
+        array_filters=[{"p.product_id": product_id}, {"g.gate_name": gate_name}],
+    )
+    return await _to_release(await _synced(doc, product_id, gate_name))
 
 
 @router.patch("/releases/{id}/products/{product_id}/gates/{gate_name}/milestones/{milestone_key}", response_model=Release, summary="Update milestone")
 async def update_milestone(id: str, product_id: str, gate_name: str, milestone_key: str, payload: UpdateMilestone, _=Depends(require_permissions("can_manage_quality_gates"))):
-    db = get_db()
-    oid = ObjectId(id)
     sets: dict[str, Any] = {}
     for key, value in payload.model_dump(exclude_unset=True).items():
         sets[f"products.$[p].quality_gates.$[g].milestones.$[m].{key}"] = value
     if not sets:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No fields to update")
-    res = await db.releases.update_one(
-        {"_id": oid},
-        {"$set": sets},
-        array_filters=[{"p.product_id": product_id}, {"g.gate_name": gate_name}, {"m.milestone_key": milestone_key}],
-    )
-    if res.matched_count == 0:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Release/product/gate/milestone not found")
-    doc = await db.releases.find_one({"_id": oid})
-    doc["_id"] = str(doc["_id"])
-    return Release.model_validate(doc)
+    array_filters = [{"p.product_id": product_id}, {"g.gate_name": gate_name}, {"m.milestone_key": milestone_key}]
+    if SUMMARY_MILESTONE_FIELDS & payload.model_fields_set:
+        op = UpdateMilestoneOp(op="update_milestone", product_id=product_id, gate_name=gate_name, milestone_key=milestone_key, patch=payload)
+        doc = await ReleaseService(get_db()).apply_tracked(id, op, {"$set": sets}, array_filters=array_filters)
+    else:
+        doc = await ReleaseRepository(get_db()).update_and_fetch(id, {"$set": sets}, array_filters=array_filters)
+    return await _to_release(await _synced(doc, product_id, gate_name), "Release/product/gate/milestone not found")
 
 
 @router.post("/releases/{id}/products/{product_id}/gates/{gate_name}/milestones/{milestone_key}/approve", response_model=Release, summary="Approve milestone")
@@ -243,15 +519,12 @@ async def approve_milestone(id: str, product_id: str, gate_name: str, milestone_
     if comment:
         sets["products.$[p].quality_gates.$[g].milestones.$[m].approval.comment"] = comment
 
-    await db.releases.update_one(
-        {"_id": oid},
+    updated = await ReleaseRepository(db).update_and_fetch(
+        oid,
         {"$set": sets},
         array_filters=[{"p.product_id": product_id}, {"g.gate_name": gate_name}, {"m.milestone_key": milestone_key}],
     )
-
-    updated = await db.releases.find_one({"_id": oid})
-    updated["_id"] = str(updated["_id"])
-    return Release.model_validate(updated)
+    return await _to_release(await _synced(updated, product_id, gate_name))
 
 
 @router.post("/releases/{id}/runbooks", response_model=Release, summary="Add runbook")
@@ -259,71 +532,84 @@ async def add_runbook(id: str, payload: ReleaseRunbook, principal=Depends(requir
     db = get_db()
     oid = ObjectId(id)
     rb = payload.model_dump(by_alias=True)
+    conflict = key_conflict([rb])
+    if conflict:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=conflict)
     if not rb.get("created_at"):
         rb["created_at"] = utcnow()
     if principal and getattr(principal, "user", None):
         rb.setdefault("created_by", str(principal.user.id))
-    res = await db.releases.update_one({"_id": oid}, {"$push": {"runbooks": rb}})
-    if res.matched_count == 0:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
-    doc = await db.releases.find_one({"_id": oid})
-    doc["_id"] = str(doc["_id"])
-    return Release.model_validate(doc)
+    runbooks = await _writable_runbooks(db, oid)
+    try:
+        await runbooks.add(oid, rb)
+    except DuplicateKeyError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"runbook_id exists: {payload.runbook_id}") from exc
+    return await _to_release(await ReleaseRepository(db).touch_runbooks(oid))
 
 
-@router.get("/releases/{id}/runbooks", summary="List runbooks for a release")
+@router.get("/releases/{id}/runbooks", response_model=list[ReleaseRunbook], summary="List runbooks for a release")
 async def list_runbooks(id: str):
     db = get_db()
     oid = ObjectId(id)
     doc = await db.releases.find_one({"_id": oid}, {"runbooks": 1})
     if not doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
-    return doc.get("runbooks", [])
+    await _attach_runbooks(db, [doc])
+    return model_response(list[ReleaseRunbook], doc["runbooks"])
+
+
+@router.get(
+    "/releases/{id}/runbooks/{runbook_id}/tasks",
+    response_model=Paginated[ReleaseRunbookTask],
+    summary="List runbook tasks (paginated)",
+)
+async def list_runbook_tasks(id: str, runbook_id: str, page: PageQuery = Depends()):
+    db = get_db()
+    oid = ObjectId(id)
+    tasks = await RunbookRepository(db).tasks_page(oid, runbook_id, page.limit, try_decode_cursor(page.cursor))
+    if tasks is not None:
+        next_cursor = encode_cursor(tasks[-1]["_id"]) if tasks else None
+        return model_response(Paginated[ReleaseRunbookTask], {"items": tasks, "next_cursor": next_cursor})
+    # Releases not migrated yet (scripts/migrate_runbooks.py) still embed the runbook: page it by position
+    skip = _offset(page.cursor)
+    window = await ReleaseRepository(db).inline_tasks_page(oid, runbook_id, skip, page.limit)
+    if window is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Runbook not found")
+    return _window_page(ReleaseRunbookTask, window, skip)
 
 
 @router.delete("/releases/{id}/runbooks/{runbook_id}", response_model=Release, summary="Delete runbook")
 async def delete_runbook(id: str, runbook_id: str, _=Depends(require_permissions("can_manage_runbooks"))):
     db = get_db()
     oid = ObjectId(id)
-    await db.releases.update_one({"_id": oid}, {"$pull": {"runbooks": {"runbook_id": runbook_id}}})
-    doc = await db.releases.find_one({"_id": oid})
-    if not doc:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
-    doc["_id"] = str(doc["_id"])
-    return Release.model_validate(doc)
+    runbooks = await _writable_runbooks(db, oid)
+    if not await runbooks.delete(oid, runbook_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Runbook not found")
+    return await _to_release(await ReleaseRepository(db).touch_runbooks(oid))
 
 
 @router.patch("/releases/{id}/runbooks/{runbook_id}/tasks/{task_name}", response_model=Release, summary="Update runbook task")
 async def update_runbook_task(id: str, runbook_id: str, task_name: str, payload: UpdateRunbookTask, _=Depends(require_permissions("can_manage_runbooks"))):
-    db = get_db()
-    oid = ObjectId(id)
-    sets: dict[str, Any] = {}
-    for key, value in payload.model_dump(exclude_unset=True).items():
-        sets[f"runbooks.$[rb].tasks.$[t].{key}"] = value
+    sets = payload.model_dump(exclude_unset=True)
     if not sets:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No fields to update")
-    res = await db.releases.update_one(
-        {"_id": oid},
-        {"$set": sets},
-        array_filters=[{"rb.runbook_id": runbook_id}, {"t.task_name": task_name}],
-    )
-    if res.matched_count == 0:
+    db = get_db()
+    oid = ObjectId(id)
+    # One small runbook_tasks document; the release only gets its runbooks_rev counter bumped
+    runbooks = RunbookRepository(db)
+    found = await runbooks.update_task(oid, runbook_id, task_name, sets)
+    if not found and await runbooks.migrate_release(oid):
+        # The task may still be embedded in a release not migrated yet
+        found = await runbooks.update_task(oid, runbook_id, task_name, sets)
+    if not found:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Runbook/task not found")
-    doc = await db.releases.find_one({"_id": oid})
-    doc["_id"] = str(doc["_id"])
-    return Release.model_validate(doc)
+    return await _to_release(await ReleaseRepository(db).touch_runbooks(oid))
 
 
 @router.patch("/releases/{id}/change", response_model=Release, summary="Upsert release change")
 async def upsert_change(id: str, payload: ReleaseChange, _=Depends(require_permissions("can_manage_quality_gates"))):
-    db = get_db()
-    oid = ObjectId(id)
-    res = await db.releases.update_one({"_id": oid}, {"$set": {"chg": payload.model_dump(by_alias=True)}})
-    if res.matched_count == 0:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
-    doc = await db.releases.find_one({"_id": oid})
-    doc["_id"] = str(doc["_id"])
-    return Release.model_validate(doc)
+    doc = await ReleaseRepository(get_db()).update_and_fetch(id, {"$set": {"chg": payload.model_dump(by_alias=True)}})
+    return await _to_release(doc)
 
 
 @router.get("/releases/{id}/change", summary="Get release change section")
@@ -338,71 +624,37 @@ async def get_change(id: str):
 
 @router.post("/releases/{id}/attachments", response_model=Release, summary="Attach attachment to release")
 async def attach_to_release(id: str, payload: AttachmentRef, _=Depends(require_permissions("can_upload_attachments"))):
-    db = get_db()
-    oid = ObjectId(id)
-    res = await db.releases.update_one({"_id": oid}, {"$push": {"attachment_refs": payload.model_dump(by_alias=True)}})
-    if res.matched_count == 0:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
-    doc = await db.releases.find_one({"_id": oid})
-    doc["_id"] = str(doc["_id"])
-    return Release.model_validate(doc)
+    doc = await ReleaseRepository(get_db()).update_and_fetch(id, {"$push": {"attachment_refs": payload.model_dump(by_alias=True)}})
+    return await _to_release(doc)
 
 
 @router.delete("/releases/{id}/attachments/{sha256}", response_model=Release, summary="Remove attachment ref from release")
 async def delete_release_attachment(id: str, sha256: str, _=Depends(require_permissions("can_upload_attachments"))):
-    db = get_db()
-    oid = ObjectId(id)
-    await db.releases.update_one({"_id": oid}, {"$pull": {"attachment_refs": {"sha256": sha256}}})
-    doc = await db.releases.find_one({"_id": oid})
-    if not doc:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
-    doc["_id"] = str(doc["_id"])
-    return Release.model_validate(doc)
+    doc = await ReleaseRepository(get_db()).update_and_fetch(id, {"$pull": {"attachment_refs": {"sha256": sha256}}})
+    return await _to_release(doc)
+
+
+@router.post("/releases/{id}/operations", response_model=Release, summary="Apply a batch of operations atomically")
+async def apply_operations(id: str, payload: ReleaseOperationsRequest, principal=Depends(get_current_user)):
+    ensure_permissions(principal, *payload.required_permissions())
+    doc = await ReleaseService(get_db()).apply_operations(id, payload.operations, payload.expected_version)
+    return await _to_release(await _synced(doc))
 
 
 @router.get("/releases/{id}/summary", summary="Computed release summary")
-async def release_summary(id: str):
+async def release_summary(id: str, response: Response, if_none_match: str | None = Header(default=None)):
     db = get_db()
     oid = ObjectId(id)
-    doc = await db.releases.find_one({"_id": oid})
+    if if_none_match:
+        version = await ReleaseRepository(db).get_version({"_id": oid})
+        if version is not None and etag_matches(if_none_match, make_etag(id, version)):
+            return not_modified(make_etag(id, version))
+    doc = await db.releases.find_one({"_id": oid}, {"summary": 1, "version": 1})
     if not doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
-
-    # Compute summary
-    gates = []
-    milestones = []
-    for p in doc.get("products", []):
-        for g in p.get("quality_gates", []):
-            gates.append(g)
-            for m in g.get("milestones", []):
-                milestones.append(m)
-
-    gate_counts: dict[str, int] = {}
-    for g in gates:
-        status_val = (g.get("gate_status") or "NOT_STARTED").upper()
-        gate_counts[status_val] = gate_counts.get(status_val, 0) + 1
-
-    has_blockers = any((g.get("gate_status") in ["BLOCKED", "FAILED"] for g in gates)) or any(
-        (m.get("status") in ["BLOCKED", "FAILED"] for m in milestones)
-    )
-
-    all_required_passed = True
-    for g in gates:
-        if g.get("required", True) and g.get("gate_status") != "PASSED":
-            all_required_passed = False
-            break
-
-    # Next pending milestones (not DONE), ordered by start_date
-    pending = [m for m in milestones if (m.get("status") not in ["DONE", "APPROVED"])]
-    pending.sort(key=lambda x: x.get("start_date") or datetime.max)
-    next_pending = [m.get("milestone_key") for m in pending[:5]]
-
-    return {
-        "gate_status_counts": gate_counts,
-        "next_pending_milestone_keys": next_pending,
-        "flags": {
-            "all_required_gates_passed": all_required_passed,
-            "has_blockers": has_blockers,
-            "is_ready_for_approval": all_required_passed and not has_blockers,
-        },
-    }
+    response.headers["ETag"] = make_etag(id, int(doc.get("version") or 0))
+    summary = doc.get("summary")
+    if summary is None:
+        # Written before summaries were stored (see scripts/repair_release_summaries.py)
+        summary = compute_summary(await db.releases.find_one({"_id": oid}, {"products": 1}) or {})
+    return summary_view(summary)
@@ -1,13 +1,28 @@
 from __future__ import annotations
 
-from typing import Optional
+import asyncio
+from typing import List, Optional, Tuple
 
-from app.core.security import hash_password, verify_password, create_access_token, create_refresh_token
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.hashing import password_hasher
+from app.core.security import (
+    build_permission_claims,
+    create_access_token,
+    create_refresh_token,
+    hash_password,
+    password_needs_rehash,
+    verify_password,
+)
 from app.db.client import get_db
-from app.models.rbac import TokenPair, User, UserCreate
+from app.models.rbac import BulkUserReport, BulkUserResult, TokenPair, User, UserCreate
 from app.repositories.rbac_repo import RbacRepository
 from app.utils.time import utcnow
 
+# Hashing slots shared by every bulk request: one pool thread always stays free for logins
+_bulk_hash_slots = asyncio.Semaphore(max(1, password_hasher.pool_size - 1))
+
 
 class AuthService:
     def __init__(self) -> None:
@@ -22,19 +37,84 @@ class AuthService:
             username=payload.username,
             full_name=payload.full_name,
             email=payload.email,
-            password_hash=hash_password(payload.password),
+            password_hash=await password_hasher.run(hash_password, payload.password),
             role_ids=payload.role_ids,
             assigned_squad_ids=[],
             created_at=utcnow(),
         )
         return await self._repo().create_user(user)
 
+    async def register_users_bulk(self, rows: List[Tuple[int, UserCreate]], invalid: List[BulkUserResult]) -> BulkUserReport:
+        """Hash passwords concurrently on the hashing pool, then insert all rows in one unordered batch.
+
+        Bulk hashing shares ``pool_size - 1`` slots across all requests. A row whose hash is
+        refused because the pool is saturated (503) is reported as an error for that row only.
+        """
+
+        async def _hash(password: str) -> Optional[str]:
+            async with _bulk_hash_slots:
+                try:
+                    return await password_hasher.run(hash_password, password)
+                except HTTPException as exc:
+                    if exc.status_code != status.HTTP_503_SERVICE_UNAVAILABLE:
+                        raise
+                    return None
+
+        hashes = await asyncio.gather(*(_hash(p.password) for _, p in rows))
+        results = list(invalid)
+        hashed: List[Tuple[int, UserCreate, str]] = []
+        for (index, p), h in zip(rows, hashes, strict=True):
+            if h is None:
+                results.append(BulkUserResult(index=index, status="error", username=p.username, error="Password hashing capacity exhausted, retry"))
+            else:
+                hashed.append((index, p, h))
+        now = utcnow()
+        users = [
+            User(
+                username=p.username,
+                full_name=p.full_name,
+                email=p.email,
+                password_hash=h,
+                role_ids=p.role_ids,
+                assigned_squad_ids=[],
+                created_at=now,
+            )
+            for _, p, h in hashed
+        ]
+        if users:
+            ids, errors = await self._repo().insert_users_unordered(users)
+            for pos, (index, p, _) in enumerate(hashed):
+                err = errors.get(pos)
+                if err is None:
+                    results.append(BulkUserResult(index=index, status="created", id=ids[pos], username=p.username))
+                elif err.get("code") == 11000:
+                    key = next(iter(err.get("keyValue") or {}), "key")
+                    value = (err.get("keyValue") or {}).get(key)
+                    results.append(BulkUserResult(index=index, status="conflict", username=p.username, error=f"duplicate {key}: {value}"))
+                else:
+                    results.append(BulkUserResult(index=index, status="error", username=p.username, error=err.get("errmsg")))
+        results.sort(key=lambda r: r.index)
+        created = sum(1 for r in results if r.status == "created")
+        return BulkUserReport(created=created, failed=len(results) - created, results=results)
+
     async def authenticate(self, username: str, password: str) -> Optional[TokenPair]:
-        user = await self._repo().find_user_by_username(username)
+        repo = self._repo()
+        user = await repo.find_user_by_username(username)
         if not user:
             return None
-        if not verify_password(password, user.password_hash):
+        if not await password_hasher.run(verify_password, password, user.password_hash):
             return None
-        access = create_access_token(str(user.id))
-        refresh = create_refresh_token(str(user.id))
+        if password_needs_rehash(user.password_hash):
+            await self._rehash(repo, str(user.id), password)
+        claims = await build_permission_claims(repo, user) if settings.AUTH_PERMISSIONS_IN_TOKEN else {}
+        access = create_access_token(str(user.id), **claims)
+        refresh = create_refresh_token(str(user.id), **claims)
         return TokenPair(access_token=access, refresh_token=refresh)
+
+    async def _rehash(self, repo: RbacRepository, user_id: str, password: str) -> None:
+        # Upgrade the stored hash to the current BCRYPT_ROUNDS while we hold the plaintext.
+        try:
+            new_hash = await password_hasher.run(hash_password, password)
+        except HTTPException:
+            return  # hashing pool saturated; retry on a later login
+        await repo.update_password_hash(user_id, new_hash)
@@ -0,0 +1,128 @@
+"""Streaming release export (NDJSON or one CSV row per milestone).
+
+Everything here works on async iterators so a response never holds more than one
+Motor batch plus one output chunk in memory, whatever the size of the result.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterator, List
+
+from bson import ObjectId
+
+# Documents per Motor getMore; bounds memory held by the cursor
+EXPORT_BATCH_SIZE = 200
+# Output is flushed to the client in chunks of roughly this size
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+_MILESTONE_FIELDS = ("milestone_key", "milestone_name", "environment", "start_date", "end_date", "status", "owner_id")
+
+EXPORT_PROJECTION: Dict[str, int] = {
+    "release_id": 1,
+    "release_name": 1,
+    "release_date": 1,
+    "release_type": 1,
+    "scope_application_ids": 1,
+    "squad_ids": 1,
+    "products.application_id": 1,
+    "products.product_id": 1,
+    "products.product_name": 1,
+    "products.quality_gates.gate_name": 1,
+    "products.quality_gates.required": 1,
+    "products.quality_gates.gate_status": 1,
+    **{f"products.quality_gates.milestones.{f}": 1 for f in _MILESTONE_FIELDS},
+}
+
+CSV_COLUMNS = [
+    "release_id",
+    "release_name",
+    "release_date",
+    "release_type",
+    "application_id",
+    "product_id",
+    "product_name",
+    "gate_name",
+    "gate_required",
+    "gate_status",
+    *_MILESTONE_FIELDS,
+]
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _cell(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return "" if value is None else value
+
+
+def milestone_rows(doc: Dict[str, Any]) -> Iterator[List[Any]]:
+    """Flatten a release into one row per milestone.
+
+    Products and gates without milestones still get a row (with blank trailing
+    columns) so nothing disappears from the export.
+    """
+    release = [doc.get("release_id"), doc.get("release_name"), doc.get("release_date"), doc.get("release_type")]
+    products = doc.get("products") or []
+    if not products:
+        yield release + [None] * (len(CSV_COLUMNS) - len(release))
+        return
+    for p in products:
+        product = [p.get("application_id"), p.get("product_id"), p.get("product_name")]
+        gates = p.get("quality_gates") or []
+        if not gates:
+            yield release + product + [None] * (len(CSV_COLUMNS) - len(release) - len(product))
+            continue
+        for g in gates:
+            gate = [g.get("gate_name"), g.get("required"), g.get("gate_status")]
+            milestones = g.get("milestones") or [{}]
+            for m in milestones:
+                yield release + product + gate + [m.get(f) for f in _MILESTONE_FIELDS]
+
+
+async def ndjson_chunks(docs: AsyncIterable[Dict[str, Any]], chunk_bytes: int = EXPORT_CHUNK_BYTES) -> AsyncIterator[bytes]:
+    buf = bytearray()
+    async for doc in docs:
+        doc["_id"] = str(doc["_id"])
+        buf += json.dumps(doc, default=_default, separators=(",", ":")).encode()
+        buf += b"\n"
+        if len(buf) >= chunk_bytes:
+            yield bytes(buf)
+            buf.clear()
+    if buf:
+        yield bytes(buf)
+
+
+async def csv_chunks(docs: AsyncIterable[Dict[str, Any]], chunk_bytes: int = EXPORT_CHUNK_BYTES) -> AsyncIterator[bytes]:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(CSV_COLUMNS)
+    async for doc in docs:
+        for row in milestone_rows(doc):
+            writer.writerow([_cell(v) for v in row])
+        if out.tell() >= chunk_bytes:
+            yield out.getvalue().encode()
+            out.seek(0)
+            out.truncate()
+    if out.tell():
+        yield out.getvalue().encode()
+
+
+async def gzip_chunks(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Compress a byte stream into a single gzip member as it is produced."""
+    compressor = zlib.compressobj(wbits=31)  # 16 + MAX_WBITS selects the gzip container
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -1,17 +1,169 @@
 from __future__ import annotations
 
-from typing import Any
+import copy
+from collections import Counter
+from typing import Any, AsyncIterable, Dict, List, Optional, Tuple
 
 from bson import ObjectId
+from fastapi import HTTPException, status
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pydantic import ValidationError
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, PyMongoError
 
-from app.db.client import get_db
+from app.db.client import get_db, transaction
 from app.models.release import (
     Release,
     ReleaseChange,
+    ReleaseImportReport,
     ReleaseMilestone,
+    ReleaseOperation,
     ReleaseProduct,
     ReleaseProductQualityGate,
 )
+from app.repositories.milestone_repo import MilestoneRepository
+from app.repositories.release_repo import ReleaseRepository, with_search_keys, with_version_bump
+from app.repositories.runbook_repo import (
+    RunbookConflict,
+    RunbookRepository,
+    key_conflict,
+)
+from app.services.release_summary import (
+    compute_summary,
+    gate_counters,
+    milestone_counters,
+    pending_entries,
+    pending_update,
+    product_counters,
+    products_counters,
+    summary_inc,
+)
+from app.utils.time import utcnow
+
+IMPORT_BATCH_SIZE = 500
+
+
+class _OperationError(Exception):
+    pass
+
+
+def _find(items: List[Dict[str, Any]], key: str, value: str, what: str) -> Dict[str, Any]:
+    for item in items:
+        if item.get(key) == value:
+            return item
+    raise _OperationError(f"{what} {value!r} not found")
+
+
+def _without(items: List[Dict[str, Any]], key: str, value: str, what: str) -> List[Dict[str, Any]]:
+    kept = [i for i in items if i.get(key) != value]
+    if len(kept) == len(items):
+        raise _OperationError(f"{what} {value!r} not found")
+    return kept
+
+
+def _merge_updates(*updates: Dict[str, Any]) -> Dict[str, Any]:
+    merged: Dict[str, Any] = {}
+    for u in updates:
+        for operator, fields in u.items():
+            if fields:
+                merged.setdefault(operator, {}).update(fields)
+    return merged
+
+
+def _added_counters(op: Any) -> Tuple[Counter[str], List[Dict[str, Any]]]:
+    """Counter delta and pending entries contributed by a pure addition."""
+    if op.op == "add_product":
+        product = op.product.model_dump(by_alias=True)
+        return product_counters(product), pending_entries([product])
+    if op.op == "add_gate":
+        gate = op.gate.model_dump(by_alias=True)
+        return gate_counters(gate), pending_entries([{"product_id": op.product_id, "quality_gates": [gate]}])
+    milestone = op.milestone.model_dump(by_alias=True)
+    gate = {"gate_name": op.gate_name, "milestones": [milestone]}
+    return milestone_counters(milestone), pending_entries([{"product_id": op.product_id, "quality_gates": [gate]}])
+
+
+def _target_match(op: Any) -> Dict[str, Any]:
+    """Criteria proving the product, gate or milestone a non-additive ``op`` changes exists."""
+    if op.op == "delete_product":
+        return {"products.product_id": op.product_id}
+    gate: Dict[str, Any] = {"gate_name": op.gate_name}
+    if op.op in ("update_milestone", "delete_milestone"):
+        gate["milestones.milestone_key"] = op.milestone_key
+    return {"products": {"$elemMatch": {"product_id": op.product_id, "quality_gates": {"$elemMatch": gate}}}}
+
+
+RUNBOOK_OPS = ("add_runbook", "delete_runbook", "add_task", "update_task", "delete_task")
+
+
+def _touches_runbooks(op: Any) -> bool:
+    return op.op in RUNBOOK_OPS
+
+
+def _apply_operation(doc: Dict[str, Any], op: Any) -> str:
+    """Apply one operation to ``doc`` in place; return the top-level field it touched."""
+    kind = op.op
+    if kind in RUNBOOK_OPS:
+        runbooks = doc.setdefault("runbooks", [])
+        if kind == "add_runbook":
+            rb = op.runbook.model_dump(by_alias=True)
+            if not rb.get("created_at"):
+                rb["created_at"] = utcnow()
+            runbooks.append(rb)
+            conflict = key_conflict(runbooks)
+            if conflict:
+                raise _OperationError(conflict)
+        elif kind == "delete_runbook":
+            doc["runbooks"] = _without(runbooks, "runbook_id", op.runbook_id, "runbook")
+        else:
+            rb = _find(runbooks, "runbook_id", op.runbook_id, "runbook")
+            tasks = rb.setdefault("tasks", [])
+            if kind == "add_task":
+                if any(t.get("task_name") == op.task.task_name for t in tasks):
+                    raise _OperationError(f"task {op.task.task_name!r} already exists")
+                tasks.append(op.task.model_dump(by_alias=True))
+            elif kind == "update_task":
+                _find(tasks, "task_name", op.task_name, "task").update(op.patch.model_dump(exclude_unset=True))
+            else:
+                rb["tasks"] = _without(tasks, "task_name", op.task_name, "task")
+        return "runbooks"
+
+    if kind in ("add_attachment", "delete_attachment"):
+        refs = doc.setdefault("attachment_refs", [])
+        if kind == "add_attachment":
+            refs.append(op.attachment.model_dump(by_alias=True))
+        else:
+            doc["attachment_refs"] = _without(refs, "attachment_id", op.attachment_id, "attachment")
+        return "attachment_refs"
+
+    products = doc.setdefault("products", [])
+    if kind == "add_product":
+        products.append(op.product.model_dump(by_alias=True))
+    elif kind == "delete_product":
+        doc["products"] = _without(products, "product_id", op.product_id, "product")
+    else:
+        product = _find(products, "product_id", op.product_id, "product")
+        if kind == "update_product":
+            product.update(op.patch.model_dump(exclude_unset=True))
+            return "products"
+        gates = product.setdefault("quality_gates", [])
+        if kind == "add_gate":
+            gates.append(op.gate.model_dump(by_alias=True))
+        elif kind == "delete_gate":
+            product["quality_gates"] = _without(gates, "gate_name", op.gate_name, "gate")
+        else:
+            gate = _find(gates, "gate_name", op.gate_name, "gate")
+            if kind == "update_gate":
+                gate.update(op.patch.model_dump(exclude_unset=True))
+                return "products"
+            milestones = gate.setdefault("milestones", [])
+            if kind == "add_milestone":
+                milestones.append(op.milestone.model_dump(by_alias=True))
+            elif kind == "update_milestone":
+                _find(milestones, "milestone_key", op.milestone_key, "milestone").update(op.patch.model_dump(exclude_unset=True))
+            else:
+                gate["milestones"] = _without(milestones, "milestone_key", op.milestone_key, "milestone")
+    return "products"
 
 
 class ReleaseService:
@@ -21,21 +173,21 @@ class ReleaseService:
     This service provides a seam for future refactoring and complex workflows.
     """
 
-    def __init__(self) -> None:
-        self.db = get_db()
+    def __init__(self, db: Optional[AsyncIOMotorDatabase[Dict[str, Any]]] = None) -> None:
+        self.db = db if db is not None else get_db()
 
     async def get(self, id: str) -> Release | None:
         doc = await self.db.releases.find_one({"_id": ObjectId(id)})
         return Release.model_validate({**doc, "_id": str(doc["_id"])}) if doc else None
 
     async def add_product(self, id: str, product: ReleaseProduct) -> int:
-        res = await self.db.releases.update_one({"_id": ObjectId(id)}, {"$push": {"products": product.model_dump(by_alias=True)}})
+        res = await self.db.releases.update_one({"_id": ObjectId(id)}, with_version_bump({"$push": {"products": product.model_dump(by_alias=True)}}))
         return res.modified_count
 
     async def add_gate(self, id: str, product_id: str, gate: ReleaseProductQualityGate) -> int:
         res = await self.db.releases.update_one(
             {"_id": ObjectId(id)},
-            {"$push": {"products.$[p].quality_gates": gate.model_dump(by_alias=True)}},
+            with_version_bump({"$push": {"products.$[p].quality_gates": gate.model_dump(by_alias=True)}}),
             array_filters=[{"p.product_id": product_id}],
         )
         return res.modified_count
@@ -43,11 +195,195 @@ class ReleaseService:
     async def add_milestone(self, id: str, product_id: str, gate_name: str, milestone: ReleaseMilestone) -> int:
         res = await self.db.releases.update_one(
             {"_id": ObjectId(id)},
-            {"$push": {"products.$[p].quality_gates.$[g].milestones": milestone.model_dump(by_alias=True)}},
+            with_version_bump({"$push": {"products.$[p].quality_gates.$[g].milestones": milestone.model_dump(by_alias=True)}}),
             array_filters=[{"p.product_id": product_id}, {"g.gate_name": gate_name}],
         )
         return res.modified_count
 
     async def upsert_change(self, id: str, change: ReleaseChange) -> int:
-        res = await self.db.releases.update_one({"_id": ObjectId(id)}, {"$set": {"chg": change.model_dump(by_alias=True)}})
+        res = await self.db.releases.update_one({"_id": ObjectId(id)}, with_version_bump({"$set": {"chg": change.model_dump(by_alias=True)}}))
         return res.modified_count
+
+    async def apply_tracked(
+        self,
+        id: str,
+        op: Any,
+        update: Dict[str, Any],
+        array_filters: Optional[List[Dict[str, Any]]] = None,
+        addition_match: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Run a targeted product/gate/milestone ``update`` and keep ``summary`` in step with it.
+
+        ``op`` is the same change expressed as a batch operation. Pure additions pass
+        ``addition_match`` (criteria proving the parent exists) and go out as one write with
+        their counter ``$inc`` known up front. Other changes go out as one write returning the
+        product they touch as it was before; the counters then move by the difference that
+        ``op`` makes to that one product. Returns None when the release or the targeted
+        element does not exist.
+        """
+        repo = ReleaseRepository(self.db)
+        oid = ObjectId(id)
+        if addition_match is not None:
+            counters, pending = _added_counters(op)
+            extra: Dict[str, Any] = {"$inc": summary_inc(Counter(), counters)}
+            if pending:
+                extra["$push"] = {"summary.pending": {"$each": pending, "$sort": {"sort_date": 1}}}
+            match = {**addition_match, "summary": {"$exists": True}}
+            doc = await repo.update_and_fetch(oid, _merge_updates(update, extra), array_filters, match=match)
+            if doc is not None:
+                return doc
+            # Unknown parent, or a release written before summaries existed: take the slow path
+        else:
+            before = await repo.update_and_fetch(
+                oid,
+                update,
+                array_filters,
+                match={**_target_match(op), "summary": {"$exists": True}},
+                projection={"products": {"$elemMatch": {"product_id": op.product_id}}},
+                return_document=ReturnDocument.BEFORE,
+            )
+            if before is not None:
+                # Concurrent writes each move the counters by their own delta, so no guard is needed
+                products = before.get("products") or []
+                working = {"products": copy.deepcopy(products)}
+                _apply_operation(working, op)
+                pending_change, pending_filters = pending_update(pending_entries(products), pending_entries(working["products"]))
+                extra = {"$inc": summary_inc(products_counters(products), products_counters(working["products"]))}
+                tracked = _merge_updates(extra, pending_change)
+                if not tracked:
+                    return await repo.get_by_id(id)
+                return await repo.update_and_fetch(oid, tracked, pending_filters)
+
+        # Written before summaries existed (or the target is missing): build the summary in full, once
+        current = await self.db.releases.find_one({"_id": oid}, {"products": 1, "summary": 1, "version": 1})
+        if not current or "summary" in current:
+            return None
+        working = {"products": copy.deepcopy(current.get("products") or [])}
+        try:
+            _apply_operation(working, op)
+        except _OperationError:
+            return None
+        extra = {"$set": {"summary": compute_summary(working)}}
+        doc = await repo.update_and_fetch(
+            oid, _merge_updates(update, extra), array_filters, expected_version=int(current.get("version") or 0)
+        )
+        if doc is None:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Release was modified concurrently, retry")
+        return doc
+
+    async def apply_operations(self, id: str, operations: List[ReleaseOperation], expected_version: Optional[int] = None) -> Dict[str, Any]:
+        """Apply ``operations`` in order and return the resulting document (runbooks composed in).
+
+        Operations run against the loaded document and runbooks in memory first, so any failing
+        operation aborts the whole batch (422) before anything is written. The writes then run
+        in one transaction where the deployment supports it: the touched runbooks, and the loaded
+        tasks the batch rewrites, are claimed at the revs they were loaded with, products and attachments go back in a single update
+        guarded by the loaded version, and the runbook operations follow with every write
+        guarded by its loaded rev, then bump ``runbooks_rev``. Any guard that misses is a 409.
+
+        Without transactions (standalone server) the same guards still reject the batch before
+        the release is written whenever a touched runbook or task changed after it was loaded; only a
+        runbook write racing in between the claim and the runbook writes can leave the release
+        updated with a 409.
+        """
+        oid = ObjectId(id)
+        doc = await self.db.releases.find_one({"_id": oid})
+        if not doc:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+        version = int(doc.get("version") or 0)
+        if expected_version is not None and expected_version != version:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Release is at version {version}, expected {expected_version}")
+
+        runbooks = RunbookRepository(self.db)
+        runbook_ops = [op for op in operations if _touches_runbooks(op)]
+        if runbook_ops and doc.get("runbooks"):
+            # Not migrated yet: move the embedded runbooks out so the guarded writes can reach them
+            await runbooks.migrate_inline(oid, doc.pop("runbooks"))
+        touched: set[str] = set()
+        working = {k: copy.deepcopy(doc.get(k) or []) for k in ("products", "attachment_refs")}
+        working["runbooks"], revs = await runbooks.snapshot(oid)
+        for i, op in enumerate(operations):
+            try:
+                touched.add(_apply_operation(working, op))
+            except _OperationError as exc:
+                raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"operations[{i}] ({op.op}): {exc}") from exc
+
+        sets = {k: working[k] for k in sorted(touched - {"runbooks"})}
+        if "products" in touched:
+            sets["summary"] = compute_summary(working)
+        try:
+            async with transaction(self.db) as session:
+                if runbook_ops and not await runbooks.claim(oid, revs, runbook_ops, session=session):
+                    raise RunbookConflict(f"runbooks of release {oid} changed since they were loaded")
+                if sets:
+                    updated = await ReleaseRepository(self.db).update_and_fetch(oid, {"$set": sets}, expected_version=version, session=session)
+                    if updated is None:
+                        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Release was modified concurrently, retry")
+                    doc = updated
+                if runbook_ops:
+                    await runbooks.apply(oid, runbook_ops, revs, session=session)
+                    doc = await ReleaseRepository(self.db).touch_runbooks(oid, session=session) or doc
+        except (RunbookConflict, BulkWriteError) as exc:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Runbooks were modified concurrently, retry") from exc
+        except PyMongoError as exc:
+            if not exc.has_error_label("TransientTransactionError"):
+                raise
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Release was modified concurrently, retry") from exc
+        return doc
+
+    async def import_releases(
+        self,
+        rows: AsyncIterable[Tuple[int, Optional[bytes]]],
+        batch_size: Optional[int] = None,
+    ) -> ReleaseImportReport:
+        """Validate NDJSON rows as they arrive and insert them in unordered batches.
+
+        Duplicates are left to the ``release_id`` unique index rather than pre-checked,
+        so a batch costs one round trip regardless of size.
+        """
+        batch_size = batch_size or IMPORT_BATCH_SIZE
+        report = ReleaseImportReport()
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+        async for line, raw in rows:
+            report.received += 1
+            if raw is None:
+                report.add_error(line, "line exceeds maximum document size")
+                continue
+            try:
+                release = Release.model_validate_json(raw)
+            except ValidationError as exc:
+                err = exc.errors()[0]
+                loc = ".".join(str(p) for p in err["loc"])
+                report.add_error(line, f"{loc}: {err['msg']}" if loc else err["msg"])
+                continue
+            data = release.model_dump(by_alias=True, exclude={"id"})
+            conflict = key_conflict(data["runbooks"])
+            if conflict:
+                report.add_error(line, conflict, release.release_id)
+                continue
+            data["version"] = 0
+            data["summary"] = compute_summary(data)
+            batch.append((line, with_search_keys(data)))
+            if len(batch) >= batch_size:
+                await self._insert_batch(batch, report)
+                batch = []
+        if batch:
+            await self._insert_batch(batch, report)
+        return report
+
+    async def _insert_batch(self, batch: List[Tuple[int, Dict[str, Any]]], report: ReleaseImportReport) -> None:
+        runbooks = [d.pop("runbooks", []) for _, d in batch]
+        docs = [d for _, d in batch]
+        errors = await ReleaseRepository(self.db).insert_many_unordered(docs)
+        report.inserted += len(batch) - len(errors)
+        # insert_many fills in each document's _id, which keys its runbooks
+        await RunbookRepository(self.db).insert(
+            (docs[pos]["_id"], rb) for pos, rbs in enumerate(runbooks) if pos not in errors for rb in rbs
+        )
+        await MilestoneRepository(self.db).sync_many((d, None, None) for pos, d in enumerate(docs) if pos not in errors)
+        for pos, err in sorted(errors.items()):
+            line, data = batch[pos]
+            if err.get("code") == 11000:
+                report.add_error(line, f"duplicate release_id: {data['release_id']}", data["release_id"])
+            else:
+                report.add_error(line, err.get("errmsg") or "write error", data["release_id"])
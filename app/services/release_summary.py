@@ -0,0 +1,235 @@
+"""Counters behind ``GET /releases/{id}/summary``, stored on the release as ``summary``.
+
+Mutations keep the stored counters in step with ``$inc`` deltas computed from the part of
+the document they touch; flags are derived from the counters when the summary is read.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Tuple
+
+BLOCKING_STATUSES = ("BLOCKED", "FAILED")
+DONE_STATUSES = ("DONE", "APPROVED")
+# Milestones without a start date sort after every dated one
+UNSCHEDULED = datetime(9999, 12, 31)
+NEXT_PENDING_LIMIT = 5
+# Identity of a ``summary.pending`` entry, so targeted writes can pull or re-date it
+PENDING_KEY = ("product_id", "gate_name", "milestone_key")
+
+COUNTER_FIELDS = ("gates", "required_gates", "required_gates_passed", "blocked_gates", "milestones", "blocked_milestones")
+FLAG_COUNTERS = ("required_gates", "required_gates_passed", "blocked_gates", "blocked_milestones")
+
+
+def _status_key(gate: Dict[str, Any]) -> str:
+    # Used as a field name under gate_status_counts, so keep it path-safe; see _status_key_expression
+    return (gate.get("gate_status") or "NOT_STARTED").upper().replace(".", "_").replace("$", "_")
+
+
+def _status_key_expression(status: str) -> Dict[str, Any]:
+    """``_status_key`` as an aggregation expression over the ``status`` field path; the two must agree."""
+    key: Dict[str, Any] = {"$toUpper": {"$ifNull": [status, ""]}}
+    key = {"$cond": [{"$eq": [key, ""]}, "NOT_STARTED", key]}
+    for char in (".", "$"):
+        key = {"$replaceAll": {"input": key, "find": {"$literal": char}, "replacement": "_"}}
+    return key
+
+
+def _sort_date(milestone: Dict[str, Any]) -> datetime:
+    value = milestone.get("start_date")
+    if not isinstance(value, datetime):
+        return UNSCHEDULED
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def milestone_counters(milestone: Dict[str, Any]) -> Counter[str]:
+    c: Counter[str] = Counter(milestones=1)
+    if milestone.get("status") in BLOCKING_STATUSES:
+        c["blocked_milestones"] += 1
+    return c
+
+
+def gate_counters(gate: Dict[str, Any]) -> Counter[str]:
+    c: Counter[str] = Counter({"gates": 1, f"gate_status_counts.{_status_key(gate)}": 1})
+    if gate.get("required", True):
+        c["required_gates"] += 1
+        if gate.get("gate_status") == "PASSED":
+            c["required_gates_passed"] += 1
+    if gate.get("gate_status") in BLOCKING_STATUSES:
+        c["blocked_gates"] += 1
+    for m in gate.get("milestones") or []:
+        c.update(milestone_counters(m))
+    return c
+
+
+def product_counters(product: Dict[str, Any]) -> Counter[str]:
+    c: Counter[str] = Counter()
+    for g in product.get("quality_gates") or []:
+        c.update(gate_counters(g))
+    return c
+
+
+def products_counters(products: Iterable[Dict[str, Any]]) -> Counter[str]:
+    c: Counter[str] = Counter()
+    for p in products:
+        c.update(product_counters(p))
+    return c
+
+
+def pending_entries(products: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Not-done milestones of ``products`` by start date, keyed by product, gate and milestone."""
+    entries = [
+        {
+            "product_id": p.get("product_id"),
+            "gate_name": g.get("gate_name"),
+            "milestone_key": m.get("milestone_key"),
+            "sort_date": _sort_date(m),
+        }
+        for p in products
+        for g in p.get("quality_gates") or []
+        for m in g.get("milestones") or []
+        if m.get("status") not in DONE_STATUSES
+    ]
+    entries.sort(key=lambda e: e["sort_date"])
+    return entries
+
+
+def pending_update(before: List[Dict[str, Any]], after: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Update and array filters moving ``summary.pending`` from ``before`` to ``after``.
+
+    Both list the entries of the one product a targeted write changed. Such a write removes
+    entries, or adds, drops or re-dates a single milestone's; one update cannot pull from and
+    push to the same array, so a new date is set in place and readers sort (``summary_view``).
+    """
+    old = {_pending_key(e): e for e in before}
+    new = {_pending_key(e): e for e in after}
+    removed = [dict(zip(PENDING_KEY, k, strict=True)) for k in old if k not in new]
+    added = [e for k, e in new.items() if k not in old]
+    moved = [e for k, e in new.items() if k in old and old[k]["sort_date"] != e["sort_date"]]
+    if removed and (added or moved):
+        raise ValueError("pending entries removed and added in one write")
+    if removed:
+        return {"$pull": {"summary.pending": {"$or": removed}}}, []
+    update: Dict[str, Any] = {}
+    if added:
+        update["$push"] = {"summary.pending": {"$each": added, "$sort": {"sort_date": 1}}}
+    filters = [{f"pe{i}.{k}": e[k] for k in PENDING_KEY} for i, e in enumerate(moved)]
+    if moved:
+        update["$set"] = {f"summary.pending.$[pe{i}].sort_date": e["sort_date"] for i, e in enumerate(moved)}
+    return update, filters
+
+
+def _pending_key(entry: Dict[str, Any]) -> Tuple[Any, ...]:
+    return tuple(entry.get(k) for k in PENDING_KEY)
+
+
+def build_summary(counters: Counter[str], pending: List[Dict[str, Any]]) -> Dict[str, Any]:
+    summary: Dict[str, Any] = {f: counters.get(f, 0) for f in COUNTER_FIELDS}
+    summary["gate_status_counts"] = {
+        k.split(".", 1)[1]: v for k, v in counters.items() if k.startswith("gate_status_counts.") and v
+    }
+    summary["pending"] = pending
+    return summary
+
+
+def compute_summary(doc: Dict[str, Any]) -> Dict[str, Any]:
+    products = doc.get("products") or []
+    return build_summary(products_counters(products), pending_entries(products))
+
+
+def summary_inc(before: Counter[str], after: Counter[str]) -> Dict[str, int]:
+    """``$inc`` document moving the stored counters from ``before`` to ``after``."""
+    delta = {k: after.get(k, 0) - before.get(k, 0) for k in set(before) | set(after)}
+    return {f"summary.{k}": v for k, v in sorted(delta.items()) if v}
+
+
+def summary_flags(summary: Dict[str, Any]) -> Dict[str, bool]:
+    """Readiness flags from the stored counters; only ``FLAG_COUNTERS`` need to be loaded."""
+    all_required_passed = summary.get("required_gates_passed", 0) >= summary.get("required_gates", 0)
+    has_blockers = summary.get("blocked_gates", 0) + summary.get("blocked_milestones", 0) > 0
+    return {
+        "all_required_gates_passed": all_required_passed,
+        "has_blockers": has_blockers,
+        "is_ready_for_approval": all_required_passed and not has_blockers,
+    }
+
+
+def summary_view(summary: Dict[str, Any]) -> Dict[str, Any]:
+    """API shape of the summary endpoint, flags derived from the stored counters."""
+    return {
+        "gate_status_counts": {k: v for k, v in (summary.get("gate_status_counts") or {}).items() if v > 0},
+        "next_pending_milestone_keys": [
+            e["milestone_key"] for e in sorted(summary.get("pending") or [], key=lambda e: e["sort_date"])[:NEXT_PENDING_LIMIT]
+        ],
+        "flags": summary_flags(summary),
+    }
+
+
+def portfolio_pipeline(match: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    """Aggregation computing ``summary_view``'s counts and flags for every matching release.
+
+    Works from ``products`` rather than the stored summary so releases written before
+    summaries existed are covered too. ``$facet`` returns the page of releases and the
+    portfolio totals in the same round trip.
+    """
+    gate = "$products.quality_gates"
+    has_gate = {"$eq": [{"$type": gate}, "object"]}
+    status = f"{gate}.gate_status"
+    is_blocking = {"$in": [status, list(BLOCKING_STATUSES)]}
+    # gate_counters' rule, gate.get("required", True): a missing flag counts as required, null does not
+    required = {"$cond": [{"$eq": [{"$type": f"{gate}.required"}, "missing"]}, True, {"$and": [f"{gate}.required"]}]}
+    required_open = {"$and": [required, {"$ne": [status, "PASSED"]}]}
+    blocked_milestones = {
+        "$size": {
+            "$filter": {
+                "input": {"$ifNull": [f"{gate}.milestones", []]},
+                "as": "m",
+                "cond": {"$in": ["$$m.status", list(BLOCKING_STATUSES)]},
+            }
+        }
+    }
+    return [
+        {"$match": match},
+        {"$project": {
+            "release_id": 1, "release_name": 1, "release_date": 1, "release_type": 1,
+            "products.quality_gates.gate_status": 1,
+            "products.quality_gates.required": 1,
+            "products.quality_gates.milestones.status": 1,
+        }},
+        {"$unwind": {"path": "$products", "preserveNullAndEmptyArrays": True}},
+        {"$unwind": {"path": gate, "preserveNullAndEmptyArrays": True}},
+        {"$group": {
+            "_id": "$_id",
+            "release_id": {"$first": "$release_id"},
+            "release_name": {"$first": "$release_name"},
+            "release_date": {"$first": "$release_date"},
+            "release_type": {"$first": "$release_type"},
+            "statuses": {"$push": {"$cond": [has_gate, _status_key_expression(status), "$$REMOVE"]}},
+            "required_open": {"$sum": {"$cond": [{"$and": [has_gate, required_open]}, 1, 0]}},
+            "blockers": {"$sum": {"$cond": [has_gate, {"$add": [{"$cond": [is_blocking, 1, 0]}, blocked_milestones]}, 0]}},
+        }},
+        {"$project": {
+            "release_id": 1, "release_name": 1, "release_date": 1, "release_type": 1,
+            "gate_status_counts": {"$arrayToObject": {"$map": {
+                "input": {"$setUnion": ["$statuses", []]},
+                "as": "s",
+                "in": {"k": "$$s", "v": {"$size": {"$filter": {"input": "$statuses", "as": "x", "cond": {"$eq": ["$$x", "$$s"]}}}}},
+            }}},
+            "flags": {
+                "all_required_gates_passed": {"$eq": ["$required_open", 0]},
+                "has_blockers": {"$gt": ["$blockers", 0]},
+                "is_ready_for_approval": {"$and": [{"$eq": ["$required_open", 0]}, {"$eq": ["$blockers", 0]}]},
+            },
+        }},
+        {"$facet": {
+            "items": [{"$sort": {"release_date": -1, "_id": -1}}, {"$limit": limit}],
+            "totals": [{"$group": {
+                "_id": None,
+                "releases": {"$sum": 1},
+                "ready_for_approval": {"$sum": {"$cond": ["$flags.is_ready_for_approval", 1, 0]}},
+                "with_blockers": {"$sum": {"$cond": ["$flags.has_blockers", 1, 0]}},
+            }}],
+        }},
+    ]
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from typing import AsyncIterable, AsyncIterator, Optional, Tuple
+
+# Mongo's document limit; a longer line cannot be a valid row anyway
+MAX_LINE_BYTES = 16 * 1024 * 1024
+
+
+async def iter_ndjson(chunks: AsyncIterable[bytes], max_line_bytes: int = MAX_LINE_BYTES) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """Split a byte stream into ``(line_number, line)`` pairs without buffering the whole body.
+
+    Blank lines are skipped. A line longer than ``max_line_bytes`` is yielded once as
+    ``(line_number, None)`` and the rest of it is discarded.
+    """
+    buf = bytearray()
+    line_no = 0
+    oversized = False
+    async for chunk in chunks:
+        buf += chunk
+        while True:
+            nl = buf.find(b"\n")
+            if nl < 0:
+                break
+            line = bytes(buf[:nl]).strip()
+            del buf[: nl + 1]
+            line_no += 1
+            if oversized:
+                oversized = False
+                yield line_no, None
+            elif line:
+                yield line_no, line
+        if len(buf) > max_line_bytes:
+            oversized = True
+            buf.clear()
+    line = bytes(buf).strip()
+    if oversized:
+        yield line_no + 1, None
+    elif line:
+        yield line_no + 1, line
@@ -5,3 +5,8 @@ from datetime import datetime, timezone
 
 def utcnow() -> datetime:
     return datetime.now(tz=timezone.utc)
+
+
+def as_utc(value: datetime) -> datetime:
+    """``value`` as an aware UTC datetime; naive values are taken to be UTC, as Mongo stores them."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
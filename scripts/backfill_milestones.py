@@ -0,0 +1,42 @@
+"""Build the ``milestones`` index collection from every existing release.
+
+Releases written before the index was introduced have no entries and are missing from
+``GET /milestones``. Writes are version-guarded, so this is safe to re-run and to run while
+the API is serving writes: entries a newer release write already synced are left alone.
+
+    python scripts/backfill_milestones.py [batch_size]
+"""
+import asyncio
+import sys
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core.config import settings
+from app.repositories.milestone_repo import MilestoneRepository
+
+_PROJECTION = {"release_id": 1, "release_name": 1, "version": 1, "products": 1}
+
+
+async def main():
+    batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    client = AsyncIOMotorClient(settings.MONGO_URI)
+    db = client[settings.MONGO_DB_NAME]
+    repo = MilestoneRepository(db)
+
+    scanned = 0
+    batch = []
+    async for doc in db.releases.find({}, _PROJECTION):
+        scanned += 1
+        batch.append((doc, None, None))
+        if len(batch) >= batch_size:
+            await repo.sync_many(batch)
+            batch = []
+    if batch:
+        await repo.sync_many(batch)
+    client.close()
+
+    print(f"Synced milestones: releases={scanned}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
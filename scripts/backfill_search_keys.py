@@ -0,0 +1,46 @@
+"""Populate the lowercased search keys (``release_id_lc``, ``file_name_lc``, ...) on existing documents.
+
+Documents written before prefix search was introduced have none and are invisible to ``?q=``.
+Safe to re-run; only documents missing a key are touched.
+
+    python scripts/backfill_search_keys.py [batch_size]
+"""
+import asyncio
+import sys
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+from app.core.config import settings
+from app.core.search import search_keys
+from app.repositories import attachment_repo, release_repo
+
+
+async def backfill(collection, keys, batch_size):
+    missing = {"$or": [{key: {"$exists": False}} for key in keys.values()]}
+    scanned = modified = 0
+    batch = []
+    async for doc in collection.find(missing, {src: 1 for src in keys}):
+        scanned += 1
+        batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": search_keys(doc, keys)}))
+        if len(batch) >= batch_size:
+            modified += (await collection.bulk_write(batch, ordered=False)).modified_count
+            batch = []
+    if batch:
+        modified += (await collection.bulk_write(batch, ordered=False)).modified_count
+    return scanned, modified
+
+
+async def main():
+    batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    client = AsyncIOMotorClient(settings.MONGO_URI)
+    db = client[settings.MONGO_DB_NAME]
+
+    for name, keys in (("releases", release_repo.SEARCH_KEYS), ("attachments", attachment_repo.SEARCH_KEYS)):
+        scanned, modified = await backfill(db[name], keys, batch_size)
+        print(f"{name}: scanned={scanned} modified={modified}")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
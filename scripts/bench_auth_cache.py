@@ -0,0 +1,61 @@
+"""Microbenchmark: get_current_user throughput with and without the decoded-JWT cache.
+
+Runs fully in-process against a stub repository, so the numbers isolate token
+decoding and principal resolution from Mongo latency.
+
+    python scripts/bench_auth_cache.py [iterations]
+"""
+import asyncio
+import sys
+import time
+
+from app.core import security
+from app.core.cache import principal_cache, token_cache
+from app.models.rbac import Role, User
+from app.utils.time import utcnow
+
+USER = User(_id="bench-user", username="bench", email="bench@example.com", password_hash="x", role_ids=["r1"], created_at=utcnow())
+ROLES = [Role(_id="r1", role_name="Release Manager", can_create_release=True, created_at=utcnow())]
+
+
+class _StubRepo:
+    def __init__(self, db):  # noqa: ARG002
+        pass
+
+    async def find_user_by_id(self, user_id):  # noqa: ARG002
+        return USER
+
+    async def get_roles_by_ids(self, role_ids):  # noqa: ARG002
+        return ROLES
+
+
+async def run(iterations: int, header: str) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await security.get_current_user(header)
+    return iterations / (time.perf_counter() - start)
+
+
+async def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    security.RbacRepository = _StubRepo  # type: ignore[assignment,misc]
+    security.get_db = lambda: None  # type: ignore[assignment]
+    header = f"Bearer {security.create_access_token('bench-user')}"
+
+    saved = token_cache.maxsize
+    token_cache.maxsize = 0
+    uncached = await run(iterations, header)
+    token_cache.maxsize = saved
+    token_cache.clear()
+    principal_cache.clear()
+    cached = await run(iterations, header)
+
+    print(f"iterations:        {iterations}")
+    print(f"uncached decode:   {uncached:,.0f} req/s")
+    print(f"cached decode:     {cached:,.0f} req/s")
+    print(f"speedup:           {cached / uncached:.1f}x")
+    print(f"token cache stats: {token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
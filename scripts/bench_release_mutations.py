@@ -0,0 +1,87 @@
+"""Benchmark: release mutation as update_one + find_one vs a single find_one_and_update.
+
+Needs a reachable MongoDB (MONGO_URI). Works on a scratch collection that is
+dropped afterwards, and counts wire commands with a pymongo CommandListener so
+the round-trip reduction is measured rather than assumed.
+
+    python scripts/bench_release_mutations.py [iterations]
+"""
+import asyncio
+import sys
+import time
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, monitoring
+
+from app.core.config import settings
+
+COLLECTION = "bench_release_mutations"
+
+
+class _Counter(monitoring.CommandListener):
+    def __init__(self):
+        self.commands = 0
+
+    def started(self, event):
+        if event.command_name in ("update", "find", "findAndModify"):
+            self.commands += 1
+
+    def succeeded(self, event):  # noqa: ARG002
+        pass
+
+    def failed(self, event):  # noqa: ARG002
+        pass
+
+
+def _release(oid):
+    gates = [{"gate_name": f"G{g}", "gate_status": "NOT_STARTED", "milestones": [{"milestone_key": f"M{g}-{m}", "status": "NOT_STARTED"} for m in range(5)]} for g in range(4)]
+    return {"_id": oid, "release_id": f"BENCH-{oid}", "release_name": "bench", "products": [{"product_id": f"p{p}", "quality_gates": gates} for p in range(5)]}
+
+
+async def two_step(col, oid, i):
+    await col.update_one({"_id": oid}, {"$set": {"products.$[p].quality_gates.$[g].gate_status": f"S{i}"}}, array_filters=[{"p.product_id": "p1"}, {"g.gate_name": "G2"}])
+    return await col.find_one({"_id": oid})
+
+
+async def one_step(col, oid, i):
+    return await col.find_one_and_update(
+        {"_id": oid},
+        {"$set": {"products.$[p].quality_gates.$[g].gate_status": f"S{i}"}},
+        array_filters=[{"p.product_id": "p1"}, {"g.gate_name": "G2"}],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def measure(col, counter, fn, iterations):
+    oid = ObjectId()
+    await col.insert_one(_release(oid))
+    counter.commands = 0
+    start = time.perf_counter()
+    for i in range(iterations):
+        await fn(col, oid, i)
+    elapsed = time.perf_counter() - start
+    return elapsed / iterations * 1000, counter.commands / iterations
+
+
+async def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    counter = _Counter()
+    client = AsyncIOMotorClient(settings.MONGO_URI, event_listeners=[counter])
+    col = client[settings.MONGO_DB_NAME][COLLECTION]
+    try:
+        await col.drop()
+        two_ms, two_rt = await measure(col, counter, two_step, iterations)
+        one_ms, one_rt = await measure(col, counter, one_step, iterations)
+    finally:
+        await col.drop()
+        client.close()
+
+    print(f"iterations:                   {iterations}")
+    print(f"update_one + find_one:        {two_ms:.3f} ms/op, {two_rt:.1f} round trips/op")
+    print(f"find_one_and_update (AFTER):  {one_ms:.3f} ms/op, {one_rt:.1f} round trips/op")
+    print(f"latency reduction:            {(1 - one_ms / two_ms) * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+"""Benchmark: rendering a large release response, validate + response_model vs model_response.
+
+No database needed. Builds a synthetic release document of about 2 MB, shaped the
+way Motor returns it (ObjectId _id, datetimes, internal keys such as version and
+release_id_lc), and checks both paths produce the same JSON before timing them.
+
+    python scripts/bench_release_response.py [iterations]
+"""
+import sys
+import time
+from datetime import datetime
+
+import orjson
+from bson import ObjectId
+from pydantic import TypeAdapter
+
+from app.core.responses import model_response
+from app.models.release import Release
+
+TARGET_BYTES = 2 * 1024 * 1024
+
+
+def _release():
+    when = datetime(2025, 9, 9, 10, 0)
+    milestone = lambda p, g, m: {  # noqa: E731
+        "milestone_key": f"M{p}-{g}-{m}", "milestone_name": f"Milestone {m} of gate {g}", "environment": "UAT",
+        "start_date": when, "end_date": when, "status": "NOT_STARTED", "owner_id": "u-1", "attachment_refs": [],
+        "approval": {"required": True, "status": "PENDING"},
+    }
+    gate = lambda p, g: {  # noqa: E731
+        "gate_name": f"G{g}", "description": "Quality gate " * 8, "order": g, "required": True, "gate_status": "NOT_STARTED",
+        "owner_id": "u-2", "attachment_refs": [], "milestones": [milestone(p, g, m) for m in range(10)],
+    }
+    doc = {
+        "_id": ObjectId(), "release_id": "BENCH-1", "release_id_lc": "bench-1", "release_name": "bench", "release_name_lc": "bench",
+        "release_date": when, "release_type": "MAJOR", "created_at": when, "version": 7, "summary": {"milestones_total": 0},
+        "products": [],
+    }
+    while len(orjson.dumps(doc, default=str)) < TARGET_BYTES:
+        p = len(doc["products"])
+        doc["products"].append({
+            "application_id": "app-1", "product_id": f"p{p}", "product_name": f"Product {p}", "fixed_version": None,
+            "version_boards": [], "quality_gates": [gate(p, g) for g in range(10)], "attachment_refs": [], "participating_squad_ids": [],
+        })
+    return doc
+
+
+def legacy(doc, adapter):
+    # Handler: str(_id) + Release.model_validate; FastAPI: validate against response_model, then dump
+    model = Release.model_validate({**doc, "_id": str(doc["_id"])})
+    return adapter.dump_json(adapter.validate_python(model), by_alias=True)
+
+
+def fast(doc, adapter):  # noqa: ARG001
+    return model_response(Release, doc).body
+
+
+def measure(fn, doc, adapter, iterations):
+    fn(doc, adapter)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(doc, adapter)
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    doc = _release()
+    adapter = TypeAdapter(Release)
+    body = fast(doc, adapter)
+    assert orjson.loads(body) == orjson.loads(legacy(doc, adapter)), "fast path output differs"
+
+    legacy_ms = measure(legacy, doc, adapter, iterations)
+    fast_ms = measure(fast, doc, adapter, iterations)
+    print(f"iterations:                      {iterations}")
+    print(f"response size:                   {len(body) / 1024 / 1024:.2f} MB ({len(doc['products'])} products)")
+    print(f"model_validate + response_model: {legacy_ms:.2f} ms/op")
+    print(f"model_response (orjson):         {fast_ms:.2f} ms/op")
+    print(f"speedup:                         {legacy_ms / fast_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
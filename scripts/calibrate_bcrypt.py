@@ -0,0 +1,25 @@
+"""Measure bcrypt latency on this host and suggest BCRYPT_ROUNDS for a target login cost.
+
+    python scripts/calibrate_bcrypt.py [target_ms]    (default 150)
+
+Set the printed BCRYPT_ROUNDS in the environment/.env; existing users are
+rehashed to the new cost on their next successful login.
+"""
+import sys
+
+from app.core.config import settings
+from app.core.hashing import calibrate_bcrypt_rounds
+
+
+def main():
+    target_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 150.0
+    rounds, timings = calibrate_bcrypt_rounds(target_ms)
+    for r, ms in timings.items():
+        marker = "  <- selected" if r == rounds else ""
+        print(f"rounds={r:2d}  median={ms:8.1f} ms{marker}")
+    print(f"current BCRYPT_ROUNDS={settings.BCRYPT_ROUNDS}")
+    print(f"BCRYPT_ROUNDS={rounds}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Import releases from an NDJSON file (one Release per line) straight into MongoDB.
+
+Uses the same streaming validation and unordered batching as POST /releases/import.
+
+    python scripts/import_releases.py releases.ndjson [batch_size]
+"""
+import asyncio
+import sys
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core.config import settings
+from app.services.release_service import ReleaseService
+from app.utils.ndjson import iter_ndjson
+
+
+async def read_chunks(path, size=64 * 1024):
+    with open(path, "rb") as f:
+        while chunk := f.read(size):
+            yield chunk
+
+
+async def main():
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    path = sys.argv[1]
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    client = AsyncIOMotorClient(settings.MONGO_URI)
+    db = client[settings.MONGO_DB_NAME]
+    try:
+        report = await ReleaseService(db).import_releases(iter_ndjson(read_chunks(path)), batch_size=batch_size)
+    finally:
+        client.close()
+
+    print(f"received: {report.received}  inserted: {report.inserted}  failed: {report.failed}")
+    for err in report.errors:
+        print(f"  line {err.line}: {err.error}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,36 @@
+"""Move runbooks embedded in release documents into the ``runbooks`` / ``runbook_tasks`` collections.
+
+Each release goes through ``RunbookRepository.migrate_inline``, the same step a runbook write
+takes on a release not migrated yet: insert-only upserts keyed like the unique indexes, tasks
+before their headers, then the embedded ``runbooks`` array is removed. A release being migrated
+never shows a runbook twice or without its tasks, and re-running after a partial failure (or
+alongside live writes) is safe. Run ``create_indexes`` (app startup) first so the unique keys exist.
+
+    python scripts/migrate_runbooks.py
+"""
+import asyncio
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core.config import settings
+from app.repositories.runbook_repo import RunbookRepository
+
+
+async def main():
+    client = AsyncIOMotorClient(settings.MONGO_URI)
+    db = client[settings.MONGO_DB_NAME]
+    repo = RunbookRepository(db)
+
+    releases = runbooks = tasks = 0
+    async for doc in db.releases.find({"runbooks.0": {"$exists": True}}, {"runbooks": 1}):
+        await repo.migrate_inline(doc["_id"], doc["runbooks"])
+        releases += 1
+        runbooks += len(doc["runbooks"])
+        tasks += sum(len(rb.get("tasks") or []) for rb in doc["runbooks"])
+    client.close()
+
+    print(f"Migrated runbooks: releases={releases} runbooks={runbooks} tasks={tasks}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
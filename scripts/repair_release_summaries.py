@@ -0,0 +1,40 @@
+"""Recompute the stored ``summary`` of every release from its products.
+
+Run after deploying summaries (releases written earlier have none) or whenever the
+counters are suspected to have drifted. Writes go out as unordered bulk_write batches.
+
+    python scripts/repair_release_summaries.py [batch_size]
+"""
+import asyncio
+import sys
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+from app.core.config import settings
+from app.repositories.release_repo import with_version_bump
+from app.services.release_summary import compute_summary
+
+
+async def main():
+    batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    client = AsyncIOMotorClient(settings.MONGO_URI)
+    db = client[settings.MONGO_DB_NAME]
+
+    scanned = modified = 0
+    batch = []
+    async for doc in db.releases.find({}, {"products": 1}):
+        scanned += 1
+        batch.append(UpdateOne({"_id": doc["_id"]}, with_version_bump({"$set": {"summary": compute_summary(doc)}})))
+        if len(batch) >= batch_size:
+            modified += (await db.releases.bulk_write(batch, ordered=False)).modified_count
+            batch = []
+    if batch:
+        modified += (await db.releases.bulk_write(batch, ordered=False)).modified_count
+    client.close()
+
+    print(f"Recomputed summaries: scanned={scanned} modified={modified}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
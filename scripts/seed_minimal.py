@@ -3,6 +3,8 @@ from motor.motor_asyncio import AsyncIOMotorClient
 
 from app.core.config import settings
 from app.core.security import hash_password
+from app.models.rbac import permissions_to_mask
+from app.repositories.release_repo import with_search_keys
 from app.utils.time import utcnow
 
 
@@ -29,6 +31,7 @@ async def main():
         "can_view_all": True,
         "created_at": utcnow(),
     }
+    role["permission_mask"] = permissions_to_mask(role)
     r = await db.roles.insert_one(role)
 
     user = {
@@ -62,7 +65,7 @@ async def main():
         "attachment_refs": [],
         "created_at": utcnow(),
     }
-    await db.releases.insert_one(release)
+    await db.releases.insert_one(with_search_keys(release))
 
     print("Seeded minimal data.")
 
@@ -5,3 +5,23 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _reset_process_caches():
+    # Process-local caches must not leak principals between tests
+    from app.core.cache import portfolio_cache, principal_cache, token_cache
+    from app.core.rate_limit import login_limiter
+    from app.core.revocation import revocation_list
+
+    principal_cache.clear()
+    principal_cache.reset_stats()
+    token_cache.clear()
+    token_cache.reset_stats()
+    portfolio_cache.clear()
+    login_limiter.reset()
+    yield
+    principal_cache.clear()
+    revocation_list.clear()
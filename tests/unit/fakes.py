@@ -0,0 +1,87 @@
+"""In-memory collection fakes shared by the release router and service tests."""
+
+
+class RunbookCol:
+    """In-memory stand-in for the runbooks / runbook_tasks collections.
+
+    Enforces the (release_oid, runbook_id, task_name) unique keys.
+    """
+    def __init__(self):
+        self.docs = []
+    @staticmethod
+    def _match(doc, q):
+        for k, v in q.items():
+            if isinstance(v, dict) and "$in" in v:
+                if doc.get(k) not in v["$in"]:
+                    return False
+            elif doc.get(k) != v:
+                return False
+        return True
+    def find(self, q, projection=None, session=None):  # noqa: ARG002
+        docs = [d for d in self.docs if self._match(d, q)]
+        class _C:
+            def sort(self, *_):
+                return self
+            def __aiter__(self):
+                async def _gen():
+                    for d in docs:
+                        yield d
+                return _gen()
+        return _C()
+    async def find_one(self, q, projection=None, session=None):  # noqa: ARG002
+        return next((d for d in self.docs if self._match(d, q)), None)
+    async def insert_one(self, doc):
+        from bson import ObjectId
+        from pymongo.errors import DuplicateKeyError
+
+        key = lambda d: (d.get("release_oid"), d.get("runbook_id"), d.get("task_name"))  # noqa: E731
+        if any(key(d) == key(doc) for d in self.docs):
+            raise DuplicateKeyError("duplicate key")
+        self.docs.append({**doc, "_id": ObjectId()})
+    async def insert_many(self, docs):
+        for d in docs:
+            await self.insert_one(d)
+    async def update_one(self, q, update, upsert=False):
+        hit = next((d for d in self.docs if self._match(d, q)), None)
+        if hit:
+            hit.update(update.get("$set", {}))
+        elif upsert:
+            await self.insert_one({**q, **update.get("$setOnInsert", {})})
+        return type("R", (), {"matched_count": int(hit is not None)})()
+    async def delete_one(self, q):
+        hit = next((d for d in self.docs if self._match(d, q)), None)
+        if hit:
+            self.docs.remove(hit)
+        return type("R", (), {"deleted_count": int(hit is not None)})()
+    async def delete_many(self, q):
+        kept = [d for d in self.docs if not self._match(d, q)]
+        deleted, self.docs = len(self.docs) - len(kept), kept
+        return type("R", (), {"deleted_count": deleted})()
+    async def bulk_write(self, requests, ordered=True, session=None):  # noqa: ARG002
+        matched = deleted = 0
+        for r in requests:
+            name = type(r).__name__
+            if name == "InsertOne":
+                await self.insert_one(r._doc)
+            elif name == "UpdateOne":
+                matched += (await self.update_one(r._filter, r._doc, upsert=r._upsert)).matched_count
+            elif name == "DeleteOne":
+                deleted += (await self.delete_one(r._filter)).deleted_count
+            else:
+                deleted += (await self.delete_many(r._filter)).deleted_count
+        return type("R", (), {"matched_count": matched, "deleted_count": deleted})()
+    def aggregate(self, pipeline):
+        docs = [d for d in self.docs if self._match(d, pipeline[0]["$match"])]
+        rows = [{"_id": None, "n": len(docs), "rev": sum(d["rev"] for d in docs)}] if docs else []
+        class _A:
+            async def to_list(self, length):  # noqa: ARG002
+                return rows
+        return _A()
+
+
+class MilestoneCol:
+    """Records bulk writes to the milestones index collection."""
+    def __init__(self):
+        self.requests = []
+    async def bulk_write(self, requests, ordered=True):  # noqa: ARG002
+        self.requests.extend(requests)
@@ -107,3 +107,40 @@ async def test_register_user_hashes_and_calls_repo(monkeypatch):
     assert created_holder["user"].assigned_squad_ids == []
     # created_at set
     assert created_holder["user"].created_at is not None
+
+
+@pytest.mark.asyncio
+async def test_authenticate_rehashes_when_cost_differs(monkeypatch):
+    from passlib.hash import bcrypt
+
+    from app.services import rbac_service as rs
+
+    stored = bcrypt.using(rounds=4).hash("correct")
+    u = User(
+        _id="64f9b8c1f1e4a9fd1a2b3c4d",
+        username="jdoe",
+        email="jdoe@example.com",
+        password_hash=stored,
+        created_at=utcnow(),
+    )
+    saved = {}
+
+    class _Repo(_FakeRepoUser):
+        async def update_password_hash(self, user_id, password_hash):
+            saved[user_id] = password_hash
+            return True
+
+    svc = AuthService()
+    monkeypatch.setattr(svc, "_repo", lambda: _Repo(u))
+    monkeypatch.setattr(rs, "hash_password", lambda p: "REHASHED")
+
+    result = await svc.authenticate("jdoe", "correct")
+    assert result is not None
+    assert saved == {"64f9b8c1f1e4a9fd1a2b3c4d": "REHASHED"}
+
+
+def test_calibrate_bcrypt_rounds_picks_highest_within_target():
+    from app.core.hashing import calibrate_bcrypt_rounds
+
+    rounds, timings = calibrate_bcrypt_rounds(target_ms=10_000, min_rounds=4, max_rounds=5, samples=1)
+    assert rounds == 5 and set(timings) == {4, 5}
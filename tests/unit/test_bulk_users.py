@@ -0,0 +1,126 @@
+import json
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from pymongo.errors import BulkWriteError
+
+from app.main import app
+
+
+class _Users:
+    """Unordered insert_many honouring unique username/email like the real indexes."""
+
+    def __init__(self, existing):
+        self.docs = list(existing)
+
+    async def insert_many(self, docs, ordered=True):
+        assert ordered is False
+        errors = []
+        for i, d in enumerate(docs):
+            clash = next((k for k in ("username", "email") if any(x[k] == d[k] for x in self.docs)), None)
+            if clash:
+                errors.append({"index": i, "code": 11000, "keyValue": {clash: d[clash]}, "errmsg": "E11000"})
+                continue
+            d["_id"] = f"id{len(self.docs)}"
+            self.docs.append(d)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(docs) - len(errors)})
+
+
+class _DB:
+    def __init__(self, existing=()):
+        self.users = _Users(existing)
+
+
+def _row(name, **kw):
+    return {"username": name, "full_name": name.title(), "email": f"{name}@x.io", "password": "pw", "role_ids": [], **kw}
+
+
+@pytest.mark.asyncio
+async def test_bulk_users_json_array_reports_per_row(monkeypatch):
+    from app.core import security as sec
+    from app.services import rbac_service as svc_mod
+
+    class _P:
+        permissions = {"can_manage_roles": True}
+
+    db = _DB(existing=[{"username": "admin", "email": "admin@x.io"}])
+    hashed = []
+    monkeypatch.setattr(svc_mod, "get_db", lambda: db)
+    monkeypatch.setattr(svc_mod, "hash_password", lambda p: hashed.append(p) or f"h:{p}")
+    app.dependency_overrides[sec.get_current_user] = lambda: _P()
+
+    rows = [_row("alice"), _row("admin"), {"username": "broken"}, _row("bob"), _row("bob2", email="bob@x.io")]
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.post("/rbac/users/bulk", json=rows)
+    app.dependency_overrides.pop(sec.get_current_user, None)
+
+    assert r.status_code == 200
+    body = r.json()
+    assert (body["created"], body["failed"]) == (2, 3)
+    statuses = [(x["index"], x["status"]) for x in body["results"]]
+    assert statuses == [(0, "created"), (1, "conflict"), (2, "invalid"), (3, "created"), (4, "conflict")]
+    assert body["results"][1]["error"] == "duplicate username: admin"
+    assert body["results"][4]["error"] == "duplicate email: bob@x.io"
+    # invalid rows are never hashed
+    assert len(hashed) == 4
+    assert db.users.docs[1]["password_hash"] == "h:pw"
+
+
+@pytest.mark.asyncio
+async def test_bulk_users_accepts_ndjson(monkeypatch):
+    from app.core import security as sec
+    from app.services import rbac_service as svc_mod
+
+    class _P:
+        permissions = {"can_manage_roles": True}
+
+    db = _DB()
+    monkeypatch.setattr(svc_mod, "get_db", lambda: db)
+    monkeypatch.setattr(svc_mod, "hash_password", lambda p: "h")
+    app.dependency_overrides[sec.get_current_user] = lambda: _P()
+
+    body = "\n".join(json.dumps(_row(n)) for n in ("a", "b", "c")) + "\n"
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.post("/rbac/users/bulk", content=body, headers={"content-type": "application/x-ndjson"})
+        bad = await ac.post("/rbac/users/bulk", content="{not json", headers={"content-type": "application/x-ndjson"})
+    app.dependency_overrides.pop(sec.get_current_user, None)
+
+    assert r.status_code == 200
+    assert r.json()["created"] == 3
+    assert len(db.users.docs) == 3
+    assert bad.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_bulk_users_reports_saturated_hashing_per_row(monkeypatch):
+    from fastapi import HTTPException
+
+    from app.core import security as sec
+    from app.services import rbac_service as svc_mod
+
+    class _P:
+        permissions = {"can_manage_roles": True}
+
+    def _hash(p):
+        if p == "busy":
+            raise HTTPException(status_code=503, detail="Password hashing capacity exhausted, retry shortly")
+        return f"h:{p}"
+
+    db = _DB()
+    monkeypatch.setattr(svc_mod, "get_db", lambda: db)
+    monkeypatch.setattr(svc_mod, "hash_password", _hash)
+    app.dependency_overrides[sec.get_current_user] = lambda: _P()
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.post("/rbac/users/bulk", json=[_row("a"), _row("b", password="busy"), _row("c")])
+    app.dependency_overrides.pop(sec.get_current_user, None)
+
+    assert r.status_code == 200
+    body = r.json()
+    assert [(x["index"], x["status"]) for x in body["results"]] == [(0, "created"), (1, "error"), (2, "created")]
+    assert "capacity" in body["results"][1]["error"]
+    assert [d["username"] for d in db.users.docs] == ["a", "c"]
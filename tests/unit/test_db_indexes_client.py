@@ -18,10 +18,10 @@ async def test_get_db_assert_message(monkeypatch):
 async def test_create_indexes_uses_db(monkeypatch):
     created = []
     class _C:
-        async def create_index(self, name, unique=False):  # noqa: ARG002
+        async def create_index(self, name, unique=False, **kwargs):  # noqa: ARG002
             created.append(name)
     class _DB:
-        roles = _C(); users = _C(); applications = _C(); squads = _C(); jiraboards = _C(); releases = _C(); attachments = _C()
+        roles = _C(); users = _C(); applications = _C(); squads = _C(); jiraboards = _C(); releases = _C(); attachments = _C(); revoked_tokens = _C(); rate_limits = _C(); runbooks = _C(); runbook_tasks = _C(); milestones = _C()
     import app.db.indexes as indexes_mod
     monkeypatch.setattr(indexes_mod, "get_db", lambda: _DB())
 
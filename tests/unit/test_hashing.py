@@ -0,0 +1,40 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.hashing import PasswordHasher
+from app.core.security import hash_password, verify_password
+
+
+@pytest.mark.asyncio
+async def test_hasher_runs_off_loop_and_records_latency():
+    hasher = PasswordHasher(pool_size=2, max_queue=0)
+    main_thread = threading.get_ident()
+    worker_thread = await hasher.run(threading.get_ident)
+    assert worker_thread != main_thread
+
+    h = await hasher.run(hash_password, "s3cret!")
+    assert await hasher.run(verify_password, "s3cret!", h)
+    stats = hasher.stats()
+    assert stats["completed"] == 3 and stats["in_flight"] == 0
+    assert stats["latency_ms"]["max"] > 0
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hasher_rejects_with_503_when_saturated():
+    hasher = PasswordHasher(pool_size=1, max_queue=0)
+    release = threading.Event()
+    blocked = asyncio.ensure_future(hasher.run(release.wait, 5))
+    await asyncio.sleep(0)
+    assert hasher.in_flight == 1
+
+    with pytest.raises(Exception) as ei:
+        await hasher.run(lambda: None)
+    assert getattr(ei.value, "status_code", None) == 503
+    assert hasher.stats()["rejected"] == 1
+
+    release.set()
+    assert await blocked is True
+    hasher.shutdown()
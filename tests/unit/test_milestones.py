@@ -0,0 +1,146 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+from httpx import ASGITransport, AsyncClient
+from pymongo.errors import BulkWriteError
+
+from app.core.pagination import try_decode_keyset
+from app.main import app
+from app.repositories.milestone_repo import (
+    MilestoneRepository,
+    milestone_entries,
+    milestone_entry_id,
+)
+
+WHEN = datetime(2025, 3, 3, tzinfo=timezone.utc)
+
+
+def _release():
+    ms = lambda k, **kw: {"milestone_key": k, "milestone_name": k, **kw}  # noqa: E731
+    return {
+        "_id": ObjectId(),
+        "release_id": "REL-1",
+        "release_name": "One",
+        "products": [
+            {"product_id": "p1", "quality_gates": [
+                {"gate_name": "QA", "milestones": [ms("M1", environment="UAT", start_date=WHEN, approval={"status": "APPROVED"})]},
+                {"gate_name": "PERF", "milestones": [ms("M2", owner_id="u1")]},
+            ]},
+            {"product_id": "p2", "quality_gates": [{"gate_name": "QA", "milestones": [ms("M3")]}]},
+        ],
+    }
+
+
+def test_entries_are_flat_and_scoped():
+    rel = _release()
+    entries = milestone_entries(rel)
+    assert [(e["product_id"], e["gate_name"], e["milestone_key"]) for e in entries] == [("p1", "QA", "M1"), ("p1", "PERF", "M2"), ("p2", "QA", "M3")]
+    first = entries[0]
+    assert first["_id"] == milestone_entry_id(rel["_id"], "p1", "QA", "M1")
+    assert (first["release_id"], first["environment"], first["start_date"], first["approval_status"]) == ("REL-1", "UAT", WHEN, "APPROVED")
+    assert [e["milestone_key"] for e in milestone_entries(rel, "p1")] == ["M1", "M2"]
+    assert [e["milestone_key"] for e in milestone_entries(rel, "p1", "PERF")] == ["M2"]
+
+
+@pytest.mark.asyncio
+async def test_sync_is_version_guarded_and_tombstones_removed_entries():
+    rel = {**_release(), "version": 3}
+    seen = []
+
+    class _Col:
+        async def bulk_write(self, requests, ordered=True):  # noqa: ARG002
+            seen.extend(requests)
+
+    class _DB:
+        milestones = _Col()
+
+    await MilestoneRepository(_DB()).sync(rel, "p1", "QA")
+    tombstone, *replaces = seen
+    kept = milestone_entry_id(rel["_id"], "p1", "QA", "M1")
+    assert tombstone._filter == {
+        "release_oid": rel["_id"], "product_id": "p1", "gate_name": "QA", "_id": {"$nin": [kept]},
+        "version": {"$not": {"$gte": 3}}, "removed_at": {"$exists": False},
+    }
+    assert tombstone._doc["$set"]["version"] == 3 and "environment" in tombstone._doc["$unset"]
+    assert [(r._filter, r._doc["version"], r._upsert) for r in replaces] == [({"_id": kept, "version": {"$not": {"$gte": 3}}}, 3, True)]
+
+
+@pytest.mark.asyncio
+async def test_sync_ignores_entries_a_newer_write_already_replaced():
+    errors = []
+
+    class _Col:
+        async def bulk_write(self, requests, ordered=True):  # noqa: ARG002
+            raise BulkWriteError({"writeErrors": errors, "writeConcernErrors": []})
+
+    class _DB:
+        milestones = _Col()
+
+    errors[:] = [{"index": 1, "code": 11000}]
+    await MilestoneRepository(_DB()).sync(_release())  # the newer snapshot stays
+
+    errors[:] = [{"index": 1, "code": 11000}, {"index": 2, "code": 2}]
+    with pytest.raises(BulkWriteError):
+        await MilestoneRepository(_DB()).sync(_release())
+
+
+@pytest.mark.asyncio
+async def test_list_milestones_filters_and_pages(monkeypatch):
+    rel = _release()
+    docs = milestone_entries(rel)
+    calls = []
+
+    class _Cursor:
+        def __init__(self, docs):
+            self._docs = docs
+        def sort(self, *_):
+            return self
+        def limit(self, n):
+            self._docs = self._docs[:n]
+            return self
+        def __aiter__(self):
+            async def _gen():
+                for d in self._docs:
+                    yield d
+            return _gen()
+
+    class _Milestones:
+        def find(self, filters):
+            calls.append(filters)
+            return _Cursor(docs)
+
+    class _DB:
+        milestones = _Milestones()
+
+    from app.routers import milestones as mod
+    monkeypatch.setattr(mod, "get_db", lambda: _DB())
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.get("/milestones", params={"environment": "UAT", "status": "OPEN", "start_from": "2025-03-01T00:00:00Z", "limit": 1})
+        assert r.status_code == 200
+        body = r.json()
+        assert body["items"][0]["release_oid"] == str(rel["_id"])
+        assert body["items"][0]["milestone_key"] == "M1"
+        assert calls[-1] == {
+            "environment": "UAT", "status": "OPEN", "start_date": {"$gte": datetime(2025, 3, 1, tzinfo=timezone.utc)},
+            "removed_at": {"$exists": False},
+        }
+
+        when, last_id = try_decode_keyset(body["next_cursor"], 2)
+        await ac.get("/milestones", params={"owner_id": "u1", "cursor": body["next_cursor"]})
+        assert calls[-1] == {"$and": [
+            {"owner_id": "u1", "removed_at": {"$exists": False}},
+            {"$or": [{"start_date": {"$gt": when}}, {"start_date": when, "_id": {"$gt": last_id}}]},
+        ]}
+
+        bad = await ac.get("/milestones", params={"start_from": "2025-03-02T00:00:00Z", "start_to": "2025-03-01T00:00:00Z"})
+        assert bad.status_code == 422
+
+        # naive and offset-qualified bounds mix; naive ones are UTC
+        mixed = await ac.get("/milestones", params={"start_from": "2025-03-01T00:00:00", "start_to": "2025-03-02T02:00:00+02:00"})
+        assert mixed.status_code == 200
+        assert calls[-1]["start_date"] == {"$gte": WHEN - timedelta(days=2), "$lt": WHEN - timedelta(days=1)}
+        mixed_bad = await ac.get("/milestones", params={"start_from": "2025-03-02T00:00:00", "start_to": "2025-03-01T00:00:00Z"})
+        assert mixed_bad.status_code == 422
@@ -8,3 +8,30 @@ def test_cursor_roundtrip():
     c = encode_cursor(oid)
     out = try_decode_cursor(c)
     assert out == oid
+
+
+def test_keyset_roundtrip_and_after_predicate():
+    from datetime import datetime, timezone
+
+    from app.core.pagination import encode_keyset, keyset_after, try_decode_keyset
+
+    d = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    oid = ObjectId()
+    values = try_decode_keyset(encode_keyset(d, oid), 2)
+    assert values[0].replace(tzinfo=timezone.utc) == d and values[1] == oid
+    assert try_decode_keyset(encode_keyset(d, oid), 3) is None
+    assert try_decode_keyset(encode_cursor(oid), 2) is None
+
+    assert keyset_after([("release_date", -1), ("_id", -1)], (d, oid)) == {
+        "$or": [{"release_date": {"$lt": d}}, {"release_date": d, "_id": {"$lt": oid}}]
+    }
+    assert keyset_after([("_id", 1)], (oid,)) == {"_id": {"$gt": oid}}
+
+
+def test_keyset_after_null_sort_value():
+    from app.core.pagination import keyset_after
+
+    oid = ObjectId()
+    assert keyset_after([("start_date", 1), ("_id", 1)], (None, oid)) == {
+        "$or": [{"start_date": {"$ne": None}}, {"start_date": None, "_id": {"$gt": oid}}]
+    }
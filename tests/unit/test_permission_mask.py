@@ -0,0 +1,81 @@
+import pytest
+from bson import ObjectId
+
+from app.core.config import settings
+from app.core.security import CurrentPrincipal, require_permissions
+from app.models.rbac import ALL_PERMISSIONS_MASK, PERMISSION_BITS, Role, RoleUpdate
+from app.repositories.rbac_repo import RbacRepository
+from app.utils.time import utcnow
+
+
+def test_role_derives_permission_mask_from_flags():
+    r = Role(role_name="Ops", can_manage_runbooks=True, can_view_all=True, permission_mask=ALL_PERMISSIONS_MASK, created_at=utcnow())
+    assert r.permission_mask == PERMISSION_BITS["can_manage_runbooks"] | PERMISSION_BITS["can_view_all"]
+    assert r.model_dump()["permission_mask"] == r.permission_mask
+
+
+@pytest.mark.asyncio
+async def test_update_role_recomputes_mask_in_pipeline():
+    rid = ObjectId()
+    captured = {}
+
+    class _Roles:
+        async def update_one(self, q, update):
+            captured["update"] = update
+
+            class _Res:
+                matched_count = 1
+                modified_count = 1
+            return _Res()
+
+        async def find_one(self, q):
+            return {"_id": rid, "role_name": "Ops", "can_manage_roles": True, "created_at": utcnow()}
+
+    class _Meta:
+        async def update_one(self, *a, **k):
+            pass
+
+    class _DB:
+        roles = _Roles()
+        meta = _Meta()
+
+    out = await RbacRepository(_DB()).update_role(str(rid), RoleUpdate(can_manage_roles=True, description="$notafield"))
+    stages = captured["update"]
+    assert isinstance(stages, list)
+    assert stages[0]["$set"]["description"] == {"$literal": "$notafield"}
+    assert "permission_mask" in stages[1]["$set"]
+    assert out.permission_mask == PERMISSION_BITS["can_manage_roles"]
+
+
+@pytest.mark.asyncio
+async def test_require_permissions_checks_mask(monkeypatch):
+    monkeypatch.setattr(settings, "RBAC_ENFORCEMENT_ENABLED", True)
+    principal = CurrentPrincipal(user=None, role_names=[], permission_mask=PERMISSION_BITS["can_create_release"])
+    assert principal.permissions["can_create_release"] is True
+
+    ok = require_permissions("can_create_release")
+    assert await ok(principal=principal) is principal  # type: ignore[arg-type]
+
+    denied = require_permissions("can_create_release", "can_manage_roles")
+    with pytest.raises(Exception) as ei:
+        await denied(principal=principal)  # type: ignore[arg-type]
+    assert getattr(ei.value, "status_code", None) == 403
+
+
+@pytest.mark.asyncio
+async def test_permissions_matrix_keeps_flat_shape_and_serves_bits_separately():
+    from httpx import ASGITransport, AsyncClient
+
+    from app.core import security as sec
+    from app.main import app
+    from app.models.rbac import PERMISSION_DESCRIPTORS
+
+    app.dependency_overrides[sec.get_current_user] = lambda: CurrentPrincipal(user=None, role_names=[], permission_mask=ALL_PERMISSIONS_MASK)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        flat = await ac.get("/rbac/permissions-matrix")
+        bits = await ac.get("/rbac/permissions-matrix/bits")
+    app.dependency_overrides.pop(sec.get_current_user, None)
+
+    assert flat.status_code == 200 and flat.json() == PERMISSION_DESCRIPTORS
+    assert bits.json() == {"descriptors": PERMISSION_DESCRIPTORS, "bits": PERMISSION_BITS, "all_mask": ALL_PERMISSIONS_MASK}
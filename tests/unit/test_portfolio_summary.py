@@ -0,0 +1,105 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from httpx import ASGITransport, AsyncClient
+
+from app.core.config import settings
+from app.main import app
+from app.services.release_summary import compute_summary, portfolio_pipeline, summary_flags
+
+
+class _AggCursor:
+    def __init__(self, docs):
+        self._docs = docs
+    async def to_list(self, length=None):  # noqa: ARG002
+        return self._docs
+
+
+class _Releases:
+    def __init__(self):
+        self.pipelines = []
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        item = {
+            "_id": ObjectId(),
+            "release_id": "REL-1",
+            "release_name": "R1",
+            "release_date": datetime(2025, 3, 1),
+            "release_type": "MAJOR",
+            "gate_status_counts": {"PASSED": 2},
+            "flags": {"all_required_gates_passed": True, "has_blockers": False, "is_ready_for_approval": True},
+        }
+        return _AggCursor([{"items": [item], "totals": [{"_id": None, "releases": 1, "ready_for_approval": 1, "with_blockers": 0}]}])
+
+
+@pytest.mark.asyncio
+async def test_portfolio_summary_single_aggregation_and_cache(monkeypatch):
+    col = _Releases()
+
+    class _DB:
+        releases = col
+
+    from app.routers import release as mod
+    monkeypatch.setattr(mod, "get_db", lambda: _DB())
+
+    params = {"from": "2025-01-01T00:00:00", "to": "2025-07-01T00:00:00", "release_type": "MAJOR"}
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r1 = await ac.get("/releases/summary", params=params)
+        r2 = await ac.get("/releases/summary", params=params)
+        r3 = await ac.get("/releases/summary", params={"release_type": "MINOR"})
+
+    assert r1.status_code == 200
+    body = r1.json()
+    assert body["totals"] == {"releases": 1, "ready_for_approval": 1, "with_blockers": 0}
+    assert body["items"][0]["flags"]["is_ready_for_approval"] is True
+    assert r2.json() == body
+    assert r3.status_code == 200
+    # second identical request served from cache
+    assert len(col.pipelines) == 2
+
+    match = col.pipelines[0][0]["$match"]
+    assert match["release_type"] == "MAJOR"
+    assert set(match["release_date"]) == {"$gte", "$lt"}
+    stages = [next(iter(s)) for s in col.pipelines[0]]
+    assert stages.count("$unwind") == 2 and "$group" in stages and stages[-1] == "$facet"
+
+
+async def _portfolio_row(doc):
+    # Runs the real pipeline over ``doc`` in a scratch database; skips without a server
+    motor = pytest.importorskip("motor.motor_asyncio")
+    client = motor.AsyncIOMotorClient(settings.MONGO_URI, serverSelectionTimeoutMS=500)
+    try:
+        await client.admin.command("ping")
+    except Exception:
+        client.close()
+        pytest.skip("MongoDB not reachable")
+
+    db = client[f"{settings.MONGO_DB_NAME}_portfolio_keys"]
+    try:
+        await db.releases.insert_one(doc)
+        rows = await db.releases.aggregate(portfolio_pipeline({"_id": doc["_id"]}, 10)).to_list(length=1)
+        return rows[0]["items"][0]
+    finally:
+        await client.drop_database(db.name)
+        client.close()
+
+
+@pytest.mark.asyncio
+async def test_portfolio_status_keys_match_stored_summary():
+    gates = [{"gate_name": f"G{i}", "gate_status": s} for i, s in enumerate(["in.progress", "$odd", None, "", "passed"])]
+    doc = {"release_id": "REL-1", "release_date": datetime(2025, 3, 1), "products": [{"product_id": "p1", "quality_gates": gates}]}
+    row = await _portfolio_row(doc)
+    assert row["gate_status_counts"] == compute_summary(doc)["gate_status_counts"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("required", [None, False, True, "missing"])
+async def test_portfolio_required_rule_matches_stored_summary(required):
+    gate = {"gate_name": "QA", "gate_status": "IN_PROGRESS"}
+    if required != "missing":
+        gate["required"] = required
+    doc = {"release_id": "REL-1", "release_date": datetime(2025, 3, 1), "products": [{"product_id": "p1", "quality_gates": [gate]}]}
+    row = await _portfolio_row(doc)
+    assert row["flags"] == summary_flags(compute_summary(doc))
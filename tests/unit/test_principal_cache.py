@@ -0,0 +1,74 @@
+import pytest
+
+from app.core.cache import (
+    TTLCache,
+    invalidate_principal,
+    invalidate_principals_with_role,
+    principal_cache,
+)
+from app.core.security import create_access_token, get_current_user
+from app.models.rbac import Role, User
+from app.utils.time import utcnow
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expiry_lru_and_counters():
+    clock = _Clock()
+    c = TTLCache(maxsize=2, ttl_seconds=10, clock=clock)
+    c.set("a", 1)
+    c.set("b", 2)
+    assert c.get("a") == 1
+    c.set("c", 3)  # evicts "b" (least recently used)
+    assert c.get("b") is None
+    clock.now = 11
+    assert c.get("a") is None
+    stats = c.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2 and stats["evictions"] == 2
+
+
+def test_ttl_cache_disabled_when_ttl_zero():
+    c = TTLCache(maxsize=10, ttl_seconds=0)
+    c.set("a", 1)
+    assert c.get("a") is None and len(c) == 0
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_hits_cache_and_invalidates(monkeypatch):
+    u = User(_id="u1", username="u", email="u@example.com", password_hash="h", role_ids=["r1"], created_at=utcnow())
+    calls = {"user": 0, "roles": 0}
+
+    class _FakeRepo:
+        async def find_user_by_id(self, uid: str):
+            calls["user"] += 1
+            return u
+
+        async def get_roles_by_ids(self, role_ids):
+            calls["roles"] += 1
+            return [Role(_id="r1", role_name="A", created_at=utcnow())]
+
+    from app.core import security as sec
+
+    monkeypatch.setattr(sec, "RbacRepository", lambda db: _FakeRepo())
+    monkeypatch.setattr(sec, "get_db", lambda: object())
+
+    header = f"Bearer {create_access_token('u1')}"
+    p1 = await get_current_user(header)  # type: ignore[arg-type]
+    p2 = await get_current_user(header)  # type: ignore[arg-type]
+    assert p1 is p2
+    assert calls == {"user": 1, "roles": 1}
+    assert principal_cache.stats()["hits"] == 1
+
+    invalidate_principals_with_role("r1")
+    await get_current_user(header)  # type: ignore[arg-type]
+    assert calls["user"] == 2
+
+    invalidate_principal("u1")
+    await get_current_user(header)  # type: ignore[arg-type]
+    assert calls["user"] == 3
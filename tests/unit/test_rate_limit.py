@@ -0,0 +1,78 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core.config import settings
+from app.core.rate_limit import LoginRateLimiter, MemoryBucketStore, MongoBucketStore
+from app.main import app
+from app.routers import auth as auth_router
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_refills_over_time(monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_USER_BURST", 2)
+    monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_USER_PER_MINUTE", 60)
+    clock = _Clock()
+    limiter = LoginRateLimiter(MemoryBucketStore(), clock=clock)
+
+    await limiter.check("Alice", None)
+    await limiter.check("alice", None)
+    with pytest.raises(Exception) as ei:
+        await limiter.check("ALICE", None)
+    assert ei.value.status_code == 429
+    assert ei.value.headers["Retry-After"] == "1"
+
+    clock.now += 1.0
+    await limiter.check("alice", None)
+    assert limiter.stats()["allowed"] == 3 and limiter.stats()["rejected_username"] == 1
+
+
+@pytest.mark.asyncio
+async def test_login_rejected_before_hashing(monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_USER_BURST", 1)
+    calls = []
+
+    class _Svc:
+        async def authenticate(self, username, password):
+            calls.append(username)
+            return None
+
+    app.dependency_overrides[auth_router.get_auth_service] = lambda: _Svc()
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            r1 = await ac.post("/auth/login", json={"username": "bob", "password": "x"})
+            r2 = await ac.post("/auth/login", json={"username": "bob", "password": "x"})
+        assert r1.status_code == 401
+        assert r2.status_code == 429
+        assert r2.json()["error"]["code"] == "RATE_LIMITED"
+        assert calls == ["bob"]
+    finally:
+        app.dependency_overrides.pop(auth_router.get_auth_service, None)
+
+
+@pytest.mark.asyncio
+async def test_mongo_bucket_store_uses_single_atomic_update():
+    captured = {}
+
+    class _Col:
+        async def find_one_and_update(self, q, pipeline, upsert, return_document):  # noqa: ARG002
+            captured["q"] = q
+            captured["pipeline"] = pipeline
+            captured["upsert"] = upsert
+            return {"_id": q["_id"], "tokens": 0.5, "allowed": False}
+
+    class _DB:
+        rate_limits = _Col()
+
+    allowed, tokens = await MongoBucketStore(lambda: _DB()).take("login:user:x", 5, 1.0, 1000.0)
+    assert (allowed, tokens) == (False, 0.5)
+    assert captured["q"] == {"_id": "login:user:x"} and captured["upsert"] is True
+    assert [next(iter(stage["$set"])) for stage in captured["pipeline"]] == ["tokens", "allowed", "tokens"]
@@ -0,0 +1,102 @@
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+from fakes import RunbookCol
+from httpx import ASGITransport, AsyncClient
+
+from app.core.etag import etag_matches, make_etag
+from app.main import app
+
+
+class _Releases:
+    def __init__(self, doc):
+        self.doc = doc
+        self.projections = []
+    async def find_one(self, q, projection=None):
+        self.projections.append(projection)
+        if q.get("_id") != self.doc["_id"] and q.get("release_id") != self.doc["release_id"]:
+            return None
+        if projection == {"version": 1, "runbooks_rev": 1}:
+            return {"_id": self.doc["_id"], **{k: self.doc[k] for k in projection if k in self.doc}}
+        return dict(self.doc)
+    async def find_one_and_update(self, q, update, array_filters=None, return_document=None):  # noqa: ARG002
+        if q["_id"] != self.doc["_id"]:
+            return None
+        self.doc.update(update.get("$set", {}))
+        for k, v in update.get("$inc", {}).items():
+            self.doc[k] = self.doc.get(k, 0) + v
+        return dict(self.doc)
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_returns_304_until_a_mutation_bumps_version(monkeypatch):
+    from app.core import security as sec
+
+    class _P:
+        permissions = {"can_edit_release_description": True, "can_manage_runbooks": True}
+
+    now = datetime.now(timezone.utc)
+    col = _Releases({"_id": ObjectId(), "release_id": "REL-1", "release_name": "R1", "release_date": now, "created_at": now, "version": 3})
+
+    class _DB:
+        releases = col
+        runbooks = RunbookCol()
+        runbook_tasks = RunbookCol()
+
+    from app.routers import release as mod
+    monkeypatch.setattr(mod, "get_db", lambda: _DB())
+    app.dependency_overrides[sec.get_current_user] = lambda: _P()
+
+    rid = str(col.doc["_id"])
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        first = await ac.get(f"/releases/{rid}")
+        etag = first.headers["etag"]
+        assert first.status_code == 200 and etag == make_etag(rid, 3, ["runbooks-0"])
+
+        cached = await ac.get(f"/releases/{rid}", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.headers["etag"] == etag
+        # one projected lookup, whether or not the representation includes runbooks
+        assert col.projections[-1] == {"version": 1, "runbooks_rev": 1}
+
+        # a sparse fieldset is a different representation of the same version
+        sparse = await ac.get(f"/releases/{rid}", params={"fields": "release_name"}, headers={"If-None-Match": etag})
+        assert sparse.status_code == 200
+        assert sparse.headers["etag"] != etag
+
+        s1 = await ac.get(f"/releases/{rid}/summary")
+        s2 = await ac.get(f"/releases/{rid}/summary", headers={"If-None-Match": s1.headers["etag"]})
+        assert s2.status_code == 304
+
+        upd = await ac.patch(f"/releases/{rid}/description", json={"description": "changed"})
+        assert upd.json()["version"] == 4
+
+        fresh = await ac.get(f"/releases/{rid}", headers={"If-None-Match": etag})
+        assert fresh.status_code == 200
+        assert fresh.json()["description"] == "changed"
+        assert fresh.headers["etag"] == make_etag(rid, 4, ["runbooks-0"])
+
+        # runbook writes leave the release version alone but still change the representation
+        tag = fresh.headers["etag"]
+        await ac.post(f"/releases/{rid}/runbooks", json={"runbook_id": "rb1", "runbook_name": "RB", "tasks": [{"task_name": "t1"}]})
+        after_add = await ac.get(f"/releases/{rid}", headers={"If-None-Match": tag})
+        assert after_add.status_code == 200 and after_add.json()["version"] == 4
+        tag = after_add.headers["etag"]
+        assert (await ac.get(f"/releases/{rid}", headers={"If-None-Match": tag})).status_code == 304
+        await ac.patch(f"/releases/{rid}/runbooks/rb1/tasks/t1", json={"status": "DONE"})
+        after_task = await ac.get(f"/releases/{rid}", headers={"If-None-Match": tag})
+        assert after_task.status_code == 200
+        assert after_task.json()["runbooks"][0]["tasks"][0]["status"] == "DONE"
+        assert after_task.headers["etag"] == make_etag(rid, 4, ["runbooks-2"])
+
+    app.dependency_overrides.pop(sec.get_current_user, None)
+
+
+def test_etag_matches_lists_and_wildcard():
+    tag = make_etag("r", 1)
+    assert etag_matches(f'"other", {tag}', tag)
+    assert etag_matches("*", tag)
+    assert not etag_matches(None, tag)
+    assert not etag_matches(make_etag("r", 2), tag)
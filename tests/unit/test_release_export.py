@@ -0,0 +1,114 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app
+from app.services.release_export import CSV_COLUMNS, EXPORT_PROJECTION, gzip_chunks, ndjson_chunks
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self._docs = docs
+    def sort(self, *_):
+        return self
+    def __aiter__(self):
+        async def _gen():
+            for d in self._docs:
+                yield dict(d)
+        return _gen()
+
+
+class _Releases:
+    def __init__(self, docs):
+        self._docs = docs
+        self.calls = []
+    def find(self, filters, projection=None, batch_size=None):
+        self.calls.append((filters, projection, batch_size))
+        return _Cursor(self._docs)
+
+
+def _docs():
+    when = datetime(2024, 6, 1, tzinfo=timezone.utc)
+    ms = lambda k: {"milestone_key": k, "milestone_name": k.upper(), "environment": "UAT", "start_date": when, "status": "OPEN"}  # noqa: E731
+    return [
+        {
+            "_id": ObjectId(),
+            "release_id": "REL-1",
+            "release_name": "One",
+            "release_date": when,
+            "products": [
+                {"application_id": "a1", "product_id": "p1", "quality_gates": [{"gate_name": "QA", "required": True, "milestones": [ms("m1"), ms("m2")]}]},
+                {"application_id": "a1", "product_id": "p2", "quality_gates": []},
+            ],
+        },
+        {"_id": ObjectId(), "release_id": "REL-2", "release_name": "Two", "release_date": when, "products": []},
+    ]
+
+
+@pytest.fixture
+def releases(monkeypatch):
+    col = _Releases(_docs())
+
+    class _DB:
+        releases = col
+
+    from app.routers import release as mod
+    monkeypatch.setattr(mod, "get_db", lambda: _DB())
+    return col
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson_streams_projected_docs(releases):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.get("/releases/export", params={"release_type": "MAJOR"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [d["release_id"] for d in lines] == ["REL-1", "REL-2"]
+    assert lines[0]["release_date"] == "2024-06-01T00:00:00+00:00"
+    filters, projection, batch_size = releases.calls[-1]
+    assert filters == {"release_type": "MAJOR"}
+    assert projection == EXPORT_PROJECTION and "runbooks" not in projection
+    assert batch_size and batch_size > 0
+
+
+@pytest.mark.asyncio
+async def test_export_csv_one_row_per_milestone_and_gzip(releases):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.get("/releases/export", params={"format": "csv", "gzip": "true"})
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(r.text)))
+    assert list(rows[0].keys()) == CSV_COLUMNS
+    assert [(x["release_id"], x["product_id"], x["milestone_key"]) for x in rows] == [
+        ("REL-1", "p1", "m1"),
+        ("REL-1", "p1", "m2"),
+        ("REL-1", "p2", ""),
+        ("REL-2", "", ""),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_chunks_are_bounded_and_gzip_roundtrips():
+    async def _many():
+        for i in range(500):
+            yield {"_id": ObjectId(), "release_id": f"REL-{i}"}
+
+    chunks = [c async for c in ndjson_chunks(_many(), chunk_bytes=1024)]
+    assert len(chunks) > 1 and all(len(c) < 2048 for c in chunks)
+
+    async def _raw():
+        for c in chunks:
+            yield c
+
+    compressed = b"".join([c async for c in gzip_chunks(_raw())])
+    assert gzip.decompress(compressed) == b"".join(chunks)
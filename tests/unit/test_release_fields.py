@@ -0,0 +1,174 @@
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+from fakes import RunbookCol
+from httpx import ASGITransport, AsyncClient
+
+from app.core.projection import partial_model, sparse_fields
+from app.main import app
+from app.models.release import Release
+
+
+def _apply(doc, projection):
+    if not projection:
+        return dict(doc)
+    if any(projection.values()):
+        return {k: v for k, v in doc.items() if k in projection or k == "_id"}
+    return {k: v for k, v in doc.items() if k not in projection}
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self._docs = list(docs)
+    def sort(self, *_):
+        return self
+    def limit(self, *_):
+        return self
+    def __aiter__(self):
+        async def _gen():
+            for d in self._docs:
+                yield d
+        return _gen()
+
+
+class _Releases:
+    def __init__(self, docs):
+        self._store = {d["_id"]: d for d in docs}
+        self.projections = []
+    async def find_one(self, q, projection=None):
+        self.projections.append(projection)
+        doc = self._store.get(q.get("_id"))
+        return _apply(doc, projection) if doc else None
+    def find(self, filters, projection=None):  # noqa: ARG002
+        self.projections.append(projection)
+        return _Cursor(_apply(d, projection) for d in self._store.values())
+
+
+def _doc():
+    now = datetime.now(timezone.utc)
+    return {
+        "_id": ObjectId(),
+        "release_id": "REL-1",
+        "release_name": "R1",
+        "release_date": now,
+        "created_at": now,
+        "products": [{"application_id": "a1", "product_id": "p1"}],
+        "runbooks": [{"runbook_id": "rb1", "runbook_name": "RB", "tasks": [{"task_name": "t", "commands": ["x" * 1000]}]}],
+    }
+
+
+@pytest.mark.asyncio
+async def test_fields_and_exclude_project_and_shape_response(monkeypatch):
+    doc = _doc()
+    col = _Releases([doc])
+
+    class _DB:
+        releases = col
+        runbooks = RunbookCol()
+        runbook_tasks = RunbookCol()
+
+    from app.routers import release as mod
+    monkeypatch.setattr(mod, "get_db", lambda: _DB())
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.get(f"/releases/{doc['_id']}", params={"fields": "release_id,release_name"})
+        assert r.status_code == 200
+        assert r.json() == {"_id": str(doc["_id"]), "release_id": "REL-1", "release_name": "R1"}
+        assert col.projections[-1] == {"release_id": 1, "release_name": 1, "_id": 1, "version": 1}
+
+        r = await ac.get("/releases", params={"exclude": "runbooks,products"})
+        assert r.status_code == 200
+        item = r.json()["items"][0]
+        assert "runbooks" not in item and "products" not in item
+        assert item["release_id"] == "REL-1"
+        assert r.json()["next_cursor"]
+        assert col.projections[-1] == {"runbooks": 0, "products": 0}
+
+        full = await ac.get(f"/releases/{doc['_id']}")
+        assert full.json()["runbooks"][0]["runbook_id"] == "rb1"
+        assert col.projections[-1] is None
+
+        assert (await ac.get("/releases", params={"fields": "nope"})).status_code == 422
+        assert (await ac.get("/releases", params={"fields": "release_id", "exclude": "runbooks"})).status_code == 422
+
+
+def test_partial_model_is_cached_per_field_set():
+    dep = sparse_fields(Release)
+    a = dep(fields="release_name,release_id", exclude=None)
+    b = dep(fields="release_id,release_name", exclude=None)
+    assert a.model is b.model
+    assert a.model is partial_model(Release, frozenset({"id", "release_id", "release_name"}))
+    assert set(a.model.model_fields) == {"id", "release_id", "release_name"}
+
+
+@pytest.mark.asyncio
+async def test_list_cursor_is_release_date_keyset(monkeypatch):
+    from app.core.pagination import try_decode_keyset
+
+    doc = _doc()
+    col = _Releases([doc])
+    seen = []
+    find = col.find
+    col.find = lambda filters, projection=None: (seen.append(filters), find(filters, projection))[1]
+
+    class _DB:
+        releases = col
+        runbooks = RunbookCol()
+        runbook_tasks = RunbookCol()
+
+    from app.routers import release as mod
+    monkeypatch.setattr(mod, "get_db", lambda: _DB())
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.get("/releases", params={"fields": "release_id"})
+        assert r.json()["items"] == [{"_id": str(doc["_id"]), "release_id": "REL-1"}]
+        # sort keys are fetched for the cursor even when not selected
+        assert col.projections[-1] == {"release_id": 1, "_id": 1, "release_date": 1}
+        cursor = r.json()["next_cursor"]
+        when, oid = try_decode_keyset(cursor, 2)
+        assert oid == doc["_id"]
+
+        await ac.get("/releases", params={"cursor": cursor})
+        assert seen[-1] == {"$or": [{"release_date": {"$lt": when}}, {"release_date": when, "_id": {"$lt": oid}}]}
+
+
+@pytest.mark.asyncio
+async def test_list_defaults_to_projected_list_items(monkeypatch):
+    from app.routers.release import LIST_ITEM_PROJECTION
+
+    doc = _doc()
+    doc["summary"] = {"required_gates": 2, "required_gates_passed": 2, "blocked_gates": 0, "blocked_milestones": 1}
+    col = _Releases([doc])
+    find = col.find
+    # Mongo evaluates $size and the dotted summary paths server-side; the fake supplies the result
+    col.find = lambda filters, projection=None: _Cursor(
+        [{**d, "product_count": len(doc["products"]), "summary": doc["summary"]} for d in find(filters, projection)._docs] if projection is LIST_ITEM_PROJECTION else find(filters, projection)._docs
+    )
+
+    class _DB:
+        releases = col
+        runbooks = None  # list items never read runbooks
+        runbook_tasks = None
+
+    from app.routers import release as mod
+    monkeypatch.setattr(mod, "get_db", lambda: _DB())
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.get("/releases")
+        assert r.status_code == 200
+        assert col.projections[-1] is LIST_ITEM_PROJECTION
+        assert "products" not in LIST_ITEM_PROJECTION and "summary.pending" not in LIST_ITEM_PROJECTION
+        item = r.json()["items"][0]
+        assert set(item) == {"_id", "release_id", "release_name", "release_date", "release_type", "product_count", "flags"}
+        assert item["product_count"] == 1
+        assert item["flags"] == {"all_required_gates_passed": True, "has_blockers": True, "is_ready_for_approval": False}
+
+        _DB.runbooks = _DB.runbook_tasks = RunbookCol()
+        full = await ac.get("/releases", params={"expand": "full"})
+        assert col.projections[-1] is None
+        assert full.json()["items"][0]["runbooks"][0]["runbook_id"] == "rb1"
+        assert (await ac.get("/releases", params={"expand": "everything"})).status_code == 422
@@ -0,0 +1,87 @@
+from datetime import datetime, timezone
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app
+
+
+class _Cursor:
+    def sort(self, *_):
+        return self
+    def limit(self, *_):
+        return self
+    def __aiter__(self):
+        async def _gen():
+            return
+            yield
+        return _gen()
+
+
+class _Releases:
+    def __init__(self):
+        self.filters = []
+        self.pipelines = []
+    def find(self, filters, projection=None):  # noqa: ARG002
+        self.filters.append(filters)
+        return _Cursor()
+    def aggregate(self, pipeline, **kwargs):  # noqa: ARG002
+        self.pipelines.append(pipeline)
+        class _Agg:
+            async def to_list(self, length):  # noqa: ARG002
+                return []
+        return _Agg()
+
+
+@pytest.mark.asyncio
+async def test_list_filters_translate_to_query(monkeypatch):
+    col = _Releases()
+
+    class _DB:
+        releases = col
+
+    from app.routers import release as mod
+    monkeypatch.setattr(mod, "get_db", lambda: _DB())
+
+    params = {
+        "release_type": "MAJOR",
+        "from": "2024-01-01T00:00:00Z",
+        "to": "2024-04-01T00:00:00Z",
+        "application_id": "APP1",
+        "squad_id": "SQ1",
+        "product_id": "p1",
+    }
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.get("/releases", params=params)
+        assert r.status_code == 200
+        assert col.filters[-1] == {
+            "release_date": {
+                "$gte": datetime(2024, 1, 1, tzinfo=timezone.utc),
+                "$lt": datetime(2024, 4, 1, tzinfo=timezone.utc),
+            },
+            "release_type": "MAJOR",
+            "scope_application_ids": "APP1",
+            "squad_ids": "SQ1",
+            "products.product_id": "p1",
+        }
+
+        # filters also narrow search mode
+        r = await ac.get("/releases", params={"q": "rel", "product_id": "p1"})
+        assert r.status_code == 200
+        assert col.pipelines[-1][0]["$match"]["products.product_id"] == "p1"
+
+        bad = await ac.get("/releases", params={"from": "2024-04-01T00:00:00Z", "to": "2024-01-01T00:00:00Z"})
+        assert bad.status_code == 422
+        assert (await ac.get("/releases", params={"release_type": ""})).status_code == 422
+        assert (await ac.get("/releases", params={"from": "not-a-date"})).status_code == 422
+
+        # a naive bound is read as UTC, so it compares with an offset-qualified one
+        mixed = await ac.get("/releases", params={"from": "2025-01-01", "to": "2025-02-01T01:00:00+01:00"})
+        assert mixed.status_code == 200
+        assert col.filters[-1]["release_date"] == {
+            "$gte": datetime(2025, 1, 1, tzinfo=timezone.utc),
+            "$lt": datetime(2025, 2, 1, tzinfo=timezone.utc),
+        }
+        assert (await ac.get("/releases", params={"from": "2025-02-01T00:00:00", "to": "2025-01-01T00:00:00Z"})).status_code == 422
+        assert (await ac.get("/releases/summary", params={"from": "2025-01-01", "to": "2025-02-01T00:00:00Z"})).status_code == 200
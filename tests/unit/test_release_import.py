@@ -0,0 +1,83 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+from fakes import MilestoneCol
+from httpx import ASGITransport, AsyncClient
+from pymongo.errors import BulkWriteError
+
+from app.main import app
+from app.utils.ndjson import iter_ndjson
+
+
+class _Releases:
+    def __init__(self, existing_ids):
+        self.release_ids = set(existing_ids)
+        self.batches = []
+    async def insert_many(self, docs, ordered=True):
+        assert ordered is False
+        self.batches.append(len(docs))
+        errors = []
+        for i, d in enumerate(docs):
+            d.setdefault("_id", ObjectId())  # like pymongo, ids are assigned client-side
+            if d["release_id"] in self.release_ids:
+                errors.append({"index": i, "code": 11000, "errmsg": "E11000"})
+            else:
+                self.release_ids.add(d["release_id"])
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+
+def _row(rid):
+    now = datetime.now(timezone.utc).isoformat()
+    return json.dumps({"release_id": rid, "release_name": rid, "release_date": now, "created_at": now})
+
+
+@pytest.mark.asyncio
+async def test_import_streams_batches_and_reports_rows(monkeypatch):
+    from app.core import security as sec
+    from app.routers import release as mod
+    from app.services import release_service as svc_mod
+
+    class _P:
+        permissions = {"can_create_release": True}
+
+    col = _Releases({"REL-OLD"})
+    index = MilestoneCol()
+
+    class _DB:
+        releases = col
+        milestones = index
+
+    monkeypatch.setattr(mod, "get_db", lambda: _DB())
+    monkeypatch.setattr(svc_mod, "IMPORT_BATCH_SIZE", 2)
+    app.dependency_overrides[sec.get_current_user] = lambda: _P()
+
+    lines = [_row("REL-1"), _row("REL-OLD"), '{"release_id": "REL-BAD"}', "", _row("REL-2"), _row("REL-1")]
+    body = "\n".join(lines) + "\n"
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.post("/releases/import", content=body, headers={"content-type": "application/x-ndjson"})
+    app.dependency_overrides.pop(sec.get_current_user, None)
+
+    assert r.status_code == 200
+    report = r.json()
+    assert (report["received"], report["inserted"], report["failed"]) == (5, 2, 3)
+    by_line = {e["line"]: e for e in report["errors"]}
+    assert by_line[2]["error"] == "duplicate release_id: REL-OLD"
+    assert "release_name" in by_line[3]["error"]
+    assert by_line[6]["release_id"] == "REL-1"
+    assert col.batches == [2, 2]
+    # only the inserted releases get their (empty) milestone index scope synced
+    assert len(index.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_iter_ndjson_handles_split_and_oversized_lines():
+    async def chunks():
+        for c in (b'{"a":1}\n{"b', b'":2}\n' + b"x" * 20, b"yy\n", b'{"c":3}'):
+            yield c
+
+    out = [x async for x in iter_ndjson(chunks(), max_line_bytes=16)]
+    assert out == [(1, b'{"a":1}'), (2, b'{"b":2}'), (3, None), (4, b'{"c":3}')]
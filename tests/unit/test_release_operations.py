@@ -0,0 +1,220 @@
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+from fakes import MilestoneCol, RunbookCol
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app
+
+
+class _Releases:
+    """Single-document store that honours the version guard on find_one_and_update."""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.writes = []
+    async def find_one(self, q, projection=None):  # noqa: ARG002
+        return dict(self.doc) if q.get("_id") == self.doc["_id"] else None
+    async def find_one_and_update(self, q, update, array_filters=None, return_document=None):  # noqa: ARG002
+        self.writes.append((q, update))
+        want = q.get("version")
+        have = self.doc.get("version")
+        if isinstance(want, dict):
+            ok = have in want["$in"]
+        else:
+            ok = want is None or want == have
+        if q["_id"] != self.doc["_id"] or not ok:
+            return None
+        self.doc.update(update.get("$set", {}))
+        for k, v in update.get("$inc", {}).items():
+            self.doc[k] = (self.doc.get(k) or 0) + v
+        return dict(self.doc)
+    async def update_one(self, q, update):
+        if q["_id"] == self.doc["_id"]:
+            for k in update.get("$unset", {}):
+                self.doc.pop(k, None)
+
+
+def _setup(monkeypatch, doc):
+    from app.core import security as sec
+    from app.routers import release as mod
+
+    class _P:
+        permissions = {"can_manage_quality_gates": True, "can_manage_runbooks": True}
+
+    col = _Releases(doc)
+
+    class _DB:
+        releases = col
+        runbooks = RunbookCol()
+        runbook_tasks = RunbookCol()
+        milestones = MilestoneCol()
+
+    monkeypatch.setattr(mod, "get_db", lambda: _DB())
+    app.dependency_overrides[sec.get_current_user] = lambda: _P()
+    return col
+
+
+def _doc():
+    now = datetime.now(timezone.utc)
+    return {"_id": ObjectId(), "release_id": "REL-1", "release_name": "R1", "release_date": now, "created_at": now, "products": []}
+
+
+@pytest.mark.asyncio
+async def test_operations_build_release_in_one_write(monkeypatch):
+    from app.core import security as sec
+
+    col = _setup(monkeypatch, _doc())
+    ops = [
+        {"op": "add_product", "product": {"application_id": "a1", "product_id": "p1"}},
+        {"op": "add_gate", "product_id": "p1", "gate": {"gate_name": "QA"}},
+        {"op": "add_milestone", "product_id": "p1", "gate_name": "QA", "milestone": {"milestone_key": "M1", "milestone_name": "UAT"}},
+        {"op": "add_milestone", "product_id": "p1", "gate_name": "QA", "milestone": {"milestone_key": "M2", "milestone_name": "Perf"}},
+        {"op": "update_milestone", "product_id": "p1", "gate_name": "QA", "milestone_key": "M1", "patch": {"status": "DONE"}},
+        {"op": "delete_milestone", "product_id": "p1", "gate_name": "QA", "milestone_key": "M2"},
+        {"op": "update_gate", "product_id": "p1", "gate_name": "QA", "patch": {"gate_status": "IN_PROGRESS"}},
+        {"op": "add_runbook", "runbook": {"runbook_id": "rb1", "runbook_name": "Deploy"}},
+        {"op": "add_task", "runbook_id": "rb1", "task": {"task_name": "t1"}},
+    ]
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.post(f"/releases/{col.doc['_id']}/operations", json={"operations": ops})
+    app.dependency_overrides.pop(sec.get_current_user, None)
+
+    assert r.status_code == 200
+    body = r.json()
+    gate = body["products"][0]["quality_gates"][0]
+    assert gate["gate_status"] == "IN_PROGRESS"
+    assert [m["milestone_key"] for m in gate["milestones"]] == ["M1"]
+    assert gate["milestones"][0]["status"] == "DONE"
+    assert body["runbooks"][0]["tasks"][0]["task_name"] == "t1"
+    assert body["version"] == 1
+    # products and summary go out in one write; the runbook writes then bump the ETag counter
+    assert [u for _, u in col.writes[1:]] == [{"$inc": {"runbooks_rev": 1}}]
+    q, update = col.writes[0]
+    # runbooks are written to their own collections, not into the release document
+    assert set(update["$set"]) == {"products", "summary"}
+    assert update["$set"]["summary"]["gate_status_counts"] == {"IN_PROGRESS": 1}
+    assert q["version"] == {"$in": [0, None]}
+
+
+@pytest.mark.asyncio
+async def test_operations_fail_as_a_unit(monkeypatch):
+    from app.core import security as sec
+
+    doc = _doc()
+    doc["version"] = 2
+    col = _setup(monkeypatch, doc)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        bad = await ac.post(f"/releases/{doc['_id']}/operations", json={"operations": [
+            {"op": "add_product", "product": {"application_id": "a1", "product_id": "p1"}},
+            {"op": "add_gate", "product_id": "missing", "gate": {"gate_name": "QA"}},
+        ]})
+        stale = await ac.post(f"/releases/{doc['_id']}/operations", json={
+            "expected_version": 1,
+            "operations": [{"op": "add_product", "product": {"application_id": "a1", "product_id": "p1"}}],
+        })
+        unknown = await ac.post(f"/releases/{doc['_id']}/operations", json={"operations": [{"op": "explode"}]})
+    app.dependency_overrides.pop(sec.get_current_user, None)
+
+    assert bad.status_code == 422
+    assert "operations[1]" in bad.json()["error"]["message"]
+    assert stale.status_code == 409
+    assert unknown.status_code == 422
+    assert col.writes == []
+    assert col.doc["products"] == []
+
+
+@pytest.mark.asyncio
+async def test_runbook_operations_migrate_embedded_runbooks_first(monkeypatch):
+    from app.core import security as sec
+
+    doc = _doc()
+    doc["runbooks"] = [
+        {"runbook_id": "rb1", "runbook_name": "Deploy", "tasks": [{"task_name": "t1"}, {"task_name": "t2"}]},
+        {"runbook_id": "rb2", "runbook_name": "Rollback"},
+    ]
+    col = _setup(monkeypatch, doc)
+    ops = [
+        {"op": "update_task", "runbook_id": "rb1", "task_name": "t1", "patch": {"status": "DONE"}},
+        {"op": "delete_task", "runbook_id": "rb1", "task_name": "t2"},
+        {"op": "delete_runbook", "runbook_id": "rb2"},
+    ]
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.post(f"/releases/{doc['_id']}/operations", json={"operations": ops})
+    app.dependency_overrides.pop(sec.get_current_user, None)
+
+    assert r.status_code == 200
+    assert [(rb["runbook_id"], [t["task_name"] for t in rb["tasks"]]) for rb in r.json()["runbooks"]] == [("rb1", ["t1"])]
+    assert r.json()["runbooks"][0]["tasks"][0]["status"] == "DONE"
+    assert "runbooks" not in col.doc
+
+
+@pytest.mark.asyncio
+async def test_runbook_written_after_load_rejects_batch_before_release_write(monkeypatch):
+    from app.core import security as sec
+    from app.repositories.runbook_repo import RunbookRepository
+    from app.routers import release as mod
+
+    doc = _doc()
+    col = _setup(monkeypatch, doc)
+    db = mod.get_db()
+    await RunbookRepository(db).add(doc["_id"], {"runbook_id": "rb1", "runbook_name": "Deploy", "tasks": [{"task_name": "t1"}]})
+    real = RunbookRepository.snapshot
+
+    async def racing(self, oid):
+        loaded = await real(self, oid)
+        await RunbookRepository(db).update_task(oid, "rb1", "t1", {"owner_id": "someone-else"})
+        return loaded
+
+    monkeypatch.setattr(RunbookRepository, "snapshot", racing)
+    ops = [
+        {"op": "add_product", "product": {"application_id": "a1", "product_id": "p1"}},
+        {"op": "update_task", "runbook_id": "rb1", "task_name": "t1", "patch": {"status": "DONE"}},
+    ]
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        raced = await ac.post(f"/releases/{doc['_id']}/operations", json={"operations": ops})
+        monkeypatch.setattr(RunbookRepository, "snapshot", real)
+        ok = await ac.post(f"/releases/{doc['_id']}/operations", json={"operations": ops[1:]})
+    app.dependency_overrides.pop(sec.get_current_user, None)
+
+    assert raced.status_code == 409
+    assert col.doc["products"] == []
+    assert [u for _, u in col.writes] == [{"$inc": {"runbooks_rev": 1}}]  # only from the retry
+    task = db.runbook_tasks.docs[0]
+    assert ok.status_code == 200
+    assert (task["owner_id"], task["status"]) == ("someone-else", "DONE")
+
+
+@pytest.mark.asyncio
+async def test_guarded_runbook_writes_raise_on_a_missed_rev():
+    from app.models.release import ReleaseOperationsRequest
+    from app.repositories.runbook_repo import RunbookConflict, RunbookRepository
+
+    class _DB:
+        runbooks = RunbookCol()
+        runbook_tasks = RunbookCol()
+
+    oid = ObjectId()
+    repo = RunbookRepository(_DB())
+    await repo.add(oid, {"runbook_id": "rb1", "runbook_name": "Deploy", "tasks": [{"task_name": "t1"}, {"task_name": "t2"}]})
+    ops = ReleaseOperationsRequest.model_validate({"operations": [
+        {"op": "delete_task", "runbook_id": "rb1", "task_name": "t1"},
+        {"op": "update_task", "runbook_id": "rb1", "task_name": "t2", "patch": {"status": "DONE"}},
+    ]}).operations
+
+    _, revs = await repo.snapshot(oid)
+    assert await repo.claim(oid, revs, ops)
+    assert not await repo.claim(oid, {**revs, ("rb1",): -1}, ops)  # header moved since the load
+    assert not await repo.claim(oid, {}, ops)  # added since the load
+    header_rev = _DB.runbooks.docs[0]["rev"]
+    assert await repo.update_task(oid, "rb1", "t1", {"status": "SKIPPED"})
+    assert _DB.runbooks.docs[0]["rev"] == header_rev  # task writes leave the header alone
+    assert not await repo.claim(oid, dict(revs), ops)  # t1 written since the load
+    _DB.runbook_tasks.docs[1]["rev"] += 1  # t2 written by someone else
+    with pytest.raises(RunbookConflict):
+        await repo.apply(oid, ops, revs)
@@ -1,7 +1,9 @@
-import pytest
-from httpx import AsyncClient, ASGITransport
 from datetime import datetime, timezone
+
+import pytest
 from bson import ObjectId
+from fakes import MilestoneCol, RunbookCol
+from httpx import ASGITransport, AsyncClient
 
 from app.main import app
 
@@ -9,7 +11,7 @@ from app.main import app
 class _Cursor:
     def __init__(self, docs):
         self._docs = list(docs)
-    def sort(self, field, direction):
+    def sort(self, field, direction=None):
         reverse = direction == -1
         try:
             self._docs.sort(key=lambda d: d.get(field), reverse=reverse)
@@ -29,13 +31,14 @@ class _Cursor:
 class _Releases:
     def __init__(self):
         self._store = {}
-    async def find_one(self, q):
+    async def find_one(self, q, projection=None):  # noqa: ARG002
         if "_id" in q:
-            return self._store.get(q["_id"]) or None
+            doc = self._store.get(q["_id"])
+            return dict(doc) if doc else None
         if "release_id" in q:
             for v in self._store.values():
                 if v.get("release_id") == q["release_id"]:
-                    return v
+                    return dict(v)
         return None
     async def insert_one(self, data):
         oid = ObjectId()
@@ -44,8 +47,11 @@ class _Releases:
         class _Res:
             inserted_id = oid
         return _Res()
-    def find(self, filters):  # noqa: ARG002
-        return _Cursor(list(self._store.values()))
+    def find(self, filters, projection=None):  # noqa: ARG002
+        return _Cursor([dict(d) for d in self._store.values()])
+    async def find_one_and_update(self, q, update, array_filters=None, return_document=None):  # noqa: ARG002
+        res = await self.update_one(q, update, array_filters=array_filters)
+        return await self.find_one({"_id": q["_id"]}) if res.matched_count else None
     async def update_one(self, q, update, array_filters=None):  # noqa: ARG002
         _id = q.get("_id")
         doc = self._store.get(_id)
@@ -100,12 +106,17 @@ class _Releases:
             for k, v in update["$set"].items():
                 doc[k] = v
             _Res.modified_count = 1
+        for k in update.get("$unset", {}):
+            doc.pop(k, None)
         return _Res()
 
 
 class _DB:
     def __init__(self):
         self.releases = _Releases()
+        self.runbooks = RunbookCol()
+        self.runbook_tasks = RunbookCol()
+        self.milestones = MilestoneCol()
 
 
 @pytest.mark.asyncio
@@ -155,6 +166,7 @@ async def test_release_router_happy_path(monkeypatch):
         body = l.json()
         assert len(body["items"]) >= 1
         assert body["next_cursor"] is not None
+        assert "products" not in body["items"][0]
 
         # get by id
         g = await ac.get(f"/releases/{rid}")
@@ -203,13 +215,19 @@ async def test_release_router_happy_path(monkeypatch):
         assert len(a.json().get("attachment_refs", [])) == 1
 
         # add runbook
-        rb = await ac.post(f"/releases/{rid}/runbooks", json={"runbook_id": "rb1", "runbook_name": "RB"})
+        rb = await ac.post(f"/releases/{rid}/runbooks", json={"runbook_id": "rb1", "runbook_name": "RB", "tasks": [{"task_name": "T1"}]})
         assert rb.status_code == 200
         assert len(rb.json().get("runbooks", [])) == 1
+        dup = await ac.post(f"/releases/{rid}/runbooks", json={"runbook_id": "rb1", "runbook_name": "RB"})
+        assert dup.status_code == 409
 
-        # update runbook task
+        # update runbook task (stored outside the release document)
         urt = await ac.patch(f"/releases/{rid}/runbooks/rb1/tasks/T1", json={"status": "DONE"})
         assert urt.status_code == 200
+        assert urt.json()["runbooks"][0]["tasks"][0]["status"] == "DONE"
+        assert "runbooks" not in _db.releases._store[ObjectId(rid)]
+        missing = await ac.patch(f"/releases/{rid}/runbooks/rb1/tasks/T9", json={"status": "DONE"})
+        assert missing.status_code == 404
 
         # summary
         s = await ac.get(f"/releases/{rid}/summary")
@@ -218,3 +236,52 @@ async def test_release_router_happy_path(monkeypatch):
         assert "gate_status_counts" in sj and "flags" in sj
 
     app.dependency_overrides.pop(sec.get_current_user, None)
+
+
+@pytest.mark.asyncio
+async def test_runbook_writes_migrate_embedded_runbooks_first(monkeypatch):
+    from app.core import security as sec
+    from app.routers import release as mod
+
+    class _P:
+        permissions = {"can_manage_runbooks": True}
+        user = type("U", (), {"id": "u1"})()
+    app.dependency_overrides[sec.get_current_user] = lambda: _P()
+    _db = _DB()
+    monkeypatch.setattr(mod, "get_db", lambda: _db)
+
+    def _embedded():
+        # A release written before runbooks moved to their own collections
+        oid = ObjectId()
+        _db.releases._store[oid] = {
+            "_id": oid, "release_id": f"REL-{oid}", "release_name": "R", "release_date": datetime.now(timezone.utc),
+            "runbooks": [
+                {"runbook_id": "rb1", "runbook_name": "Deploy", "tasks": [{"task_name": "T1"}, {"task_name": "T2"}]},
+                {"runbook_id": "rb2", "runbook_name": "Rollback", "tasks": [{"task_name": "T1"}]},
+            ],
+        }
+        return oid
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        updated = _embedded()
+        u = await ac.patch(f"/releases/{updated}/runbooks/rb2/tasks/T1", json={"status": "DONE"})
+        added = _embedded()
+        dup = await ac.post(f"/releases/{added}/runbooks", json={"runbook_id": "rb1", "runbook_name": "Again"})
+        a = await ac.post(f"/releases/{added}/runbooks", json={"runbook_id": "rb3", "runbook_name": "Verify"})
+        deleted = _embedded()
+        d = await ac.delete(f"/releases/{deleted}/runbooks/rb1")
+        d_again = await ac.delete(f"/releases/{deleted}/runbooks/rb1")
+    app.dependency_overrides.pop(sec.get_current_user, None)
+
+    assert u.status_code == 200
+    assert [[t.get("status") for t in rb["tasks"]] for rb in u.json()["runbooks"]] == [[None, None], ["DONE"]]
+    assert dup.status_code == 409
+    assert a.status_code == 200
+    assert [rb["runbook_id"] for rb in a.json()["runbooks"]] == ["rb1", "rb2", "rb3"]
+    assert d.status_code == 200
+    assert [rb["runbook_id"] for rb in d.json()["runbooks"]] == ["rb2"]
+    assert d_again.status_code == 404
+    for oid in (updated, added, deleted):
+        assert "runbooks" not in _db.releases._store[oid]
+    assert len([t for t in _db.runbook_tasks.docs if t["release_oid"] == updated]) == 3
@@ -1,7 +1,9 @@
-import pytest
-from httpx import AsyncClient, ASGITransport
 from datetime import datetime, timezone
+
+import pytest
 from bson import ObjectId
+from fakes import MilestoneCol, RunbookCol
+from httpx import ASGITransport, AsyncClient
 
 from app.main import app
 
@@ -26,7 +28,7 @@ async def test_release_delete_and_extras(monkeypatch):
     # minimal in-memory db
     class _Releases:
         def __init__(self): self._store = {}
-        async def find_one(self, q):
+        async def find_one(self, q, projection=None):  # noqa: ARG002
             if "_id" in q: return self._store.get(q["_id"]) or None
             if "release_id" in q:
                 for d in self._store.values():
@@ -38,7 +40,7 @@ async def test_release_delete_and_extras(monkeypatch):
             self._store[oid] = doc
             class _R: inserted_id = oid
             return _R()
-        def find(self, filters):  # noqa: ARG002
+        def find(self, filters, projection=None):  # noqa: ARG002
             class _Cursor:
                 def __init__(self, docs): self._docs = list(docs)
                 def sort(self, *_): return self
@@ -48,6 +50,9 @@ async def test_release_delete_and_extras(monkeypatch):
                         for d in self._docs: yield d
                     return _gen()
             return _Cursor(self._store.values())
+        async def find_one_and_update(self, q, update, array_filters=None, return_document=None):  # noqa: ARG002
+            res = await self.update_one(q, update, array_filters=array_filters)
+            return await self.find_one({"_id": q["_id"]}) if res.matched_count else None
         async def update_one(self, q, update, array_filters=None):  # noqa: ARG002
             oid = q.get("_id")
             doc = self._store.get(oid)
@@ -75,7 +80,11 @@ async def test_release_delete_and_extras(monkeypatch):
                         doc["attachment_refs"] = [a for a in doc.get("attachment_refs", []) if a.get("sha256") != v.get("sha256")]
             return _Res()
 
-    class _DB: releases = _Releases()
+    class _DB:
+        releases = _Releases()
+        runbooks = RunbookCol()
+        runbook_tasks = RunbookCol()
+        milestones = MilestoneCol()
 
     from app.routers import release as mod
     monkeypatch.setattr(mod, "get_db", lambda: _DB())
@@ -1,7 +1,9 @@
-import pytest
-from httpx import AsyncClient, ASGITransport
 from datetime import datetime, timezone
+
+import pytest
 from bson import ObjectId
+from fakes import MilestoneCol, RunbookCol
+from httpx import ASGITransport, AsyncClient
 
 from app.main import app
 
@@ -9,7 +11,7 @@ from app.main import app
 class _Cursor:
     def __init__(self, docs):
         self._docs = list(docs)
-    def sort(self, field, direction):  # noqa: ARG002
+    def sort(self, field, direction=None):  # noqa: ARG002
         return self
     def limit(self, n):  # noqa: ARG002
         return self
@@ -23,7 +25,7 @@ class _Cursor:
 class _Releases:
     def __init__(self):
         self._store = {}
-    async def find_one(self, q):
+    async def find_one(self, q, projection=None):  # noqa: ARG002
         if "_id" in q:
             return self._store.get(q["_id"]) or None
         if "release_id" in q:
@@ -38,8 +40,17 @@ class _Releases:
         class _Res:
             inserted_id = oid
         return _Res()
-    def find(self, filters):  # noqa: ARG002
+    def find(self, filters, projection=None):  # noqa: ARG002
         return _Cursor(list(self._store.values()))
+    def aggregate(self, pipeline, **kwargs):  # noqa: ARG002
+        docs = [{**d, "_rank": 0} for d in self._store.values()]
+        class _Agg:
+            async def to_list(self, length):  # noqa: ARG002
+                return docs
+        return _Agg()
+    async def find_one_and_update(self, q, update, array_filters=None, return_document=None):  # noqa: ARG002
+        res = await self.update_one(q, update, array_filters=array_filters)
+        return await self.find_one({"_id": q["_id"]}) if res.matched_count else None
     async def update_one(self, q, update, array_filters=None):  # noqa: ARG002
         _id = q.get("_id")
         doc = self._store.get(_id)
@@ -58,6 +69,9 @@ class _Releases:
 class _DB:
     def __init__(self):
         self.releases = _Releases()
+        self.runbooks = RunbookCol()
+        self.runbook_tasks = RunbookCol()
+        self.milestones = MilestoneCol()
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,109 @@
+import pytest
+from bson import ObjectId
+from fakes import RunbookCol
+from httpx import ASGITransport, AsyncClient
+
+from app.core.config import settings
+from app.core.search import (
+    encode_search_cursor,
+    prefix_match,
+    search_keys,
+    search_pipeline,
+    try_decode_search_cursor,
+)
+from app.main import app
+from app.repositories.release_repo import SEARCH_KEYS, with_search_keys
+
+
+def test_prefix_match_is_anchored_and_escaped():
+    f = prefix_match("rel.1+(x", ["release_id_lc", "release_name_lc"])
+    assert f == {"$or": [
+        {"release_id_lc": {"$regex": r"^rel\.1\+\(x"}},
+        {"release_name_lc": {"$regex": r"^rel\.1\+\(x"}},
+    ]}
+
+
+def test_search_keys_lowercase_copies():
+    doc = with_search_keys({"release_id": "REL-01", "release_name": " Big Bang "})
+    assert doc["release_id_lc"] == "rel-01"
+    assert doc["release_name_lc"] == "big bang"
+    assert search_keys({"release_id": "X"}, SEARCH_KEYS) == {"release_id_lc": "x"}
+
+
+def test_search_pipeline_keyset_and_projection():
+    oid = ObjectId()
+    p = search_pipeline("rel", ["a", "b"], 10, after=(1, oid), projection={"release_id": 1, "_id": 0})
+    # projected before the sort, keeping the sort keys
+    assert p[2] == {"$project": {"release_id": 1, "_id": 1, "_rank": 1}}
+    assert p[3] == {"$match": {"$or": [{"_rank": {"$gt": 1}}, {"_rank": 1, "_id": {"$lt": oid}}]}}
+    assert p[4] == {"$sort": {"_rank": 1, "_id": -1}}
+    assert p[-1] == {"$limit": 10}
+    # exclusion projections must not mix in an inclusion
+    assert search_pipeline("rel", ["a"], 10, projection={"products": 0})[2] == {"$project": {"products": 0}}
+
+
+def test_search_cursor_roundtrip_and_bad_input():
+    oid = ObjectId()
+    assert try_decode_search_cursor(encode_search_cursor({"_rank": 2, "_id": oid})) == (2, oid)
+    assert try_decode_search_cursor("not-a-cursor") is None
+    assert try_decode_search_cursor(encode_search_cursor({"_rank": "x", "_id": oid})) is None
+
+
+@pytest.mark.asyncio
+async def test_list_releases_search_mode(monkeypatch):
+    seen = {}
+    oid = ObjectId()
+
+    class _Agg:
+        async def to_list(self, length):  # noqa: ARG002
+            return [{"_id": oid, "_rank": 0, "release_id": "REL-1", "release_name": "One", "release_date": "2024-01-01T00:00:00Z", "created_at": "2024-01-01T00:00:00Z"}]
+
+    class _Releases:
+        def aggregate(self, pipeline, **kwargs):
+            seen["pipeline"], seen["options"] = pipeline, kwargs
+            return _Agg()
+
+    class _DB:
+        releases = _Releases()
+        runbooks = RunbookCol()
+        runbook_tasks = RunbookCol()
+
+    from app.routers import release as mod
+    monkeypatch.setattr(mod, "get_db", lambda: _DB())
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.get("/releases", params={"q": "  REL-1 ", "limit": 5})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["items"][0]["release_id"] == "REL-1"
+    assert try_decode_search_cursor(body["next_cursor"]) == (0, oid)
+    assert seen["pipeline"][0]["$match"]["$or"][0] == {"release_id_lc": {"$regex": r"^rel\-1"}}
+    assert seen["pipeline"][-1] == {"$limit": 5}
+    assert seen["options"] == {"allowDiskUse": True}
+    # search results are list items unless expand=full, projected before the sort
+    assert "product_count" in seen["pipeline"][2]["$project"]
+
+
+@pytest.mark.asyncio
+async def test_search_plan_is_index_scan():
+    motor = pytest.importorskip("motor.motor_asyncio")
+    client = motor.AsyncIOMotorClient(settings.MONGO_URI, serverSelectionTimeoutMS=500)
+    try:
+        await client.admin.command("ping")
+    except Exception:
+        client.close()
+        pytest.skip("MongoDB not reachable")
+
+    db = client[f"{settings.MONGO_DB_NAME}_search_explain"]
+    try:
+        await db.releases.create_index("release_id_lc")
+        await db.releases.create_index("release_name_lc")
+        await db.releases.insert_many([with_search_keys({"release_id": f"REL-{i:04d}", "release_name": f"Train {i}"}) for i in range(200)])
+        pipeline = search_pipeline("rel-00", list(SEARCH_KEYS.values()), 20)
+        plan = str(await db.command("aggregate", "releases", pipeline=pipeline, explain=True))
+        assert "IXSCAN" in plan
+        assert "COLLSCAN" not in plan
+    finally:
+        await client.drop_database(db.name)
+        client.close()
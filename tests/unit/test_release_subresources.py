@@ -0,0 +1,183 @@
+import pytest
+from bson import ObjectId
+from httpx import ASGITransport, AsyncClient
+
+from app.core.config import settings
+from app.main import app
+from app.repositories.release_repo import ReleaseRepository
+from app.repositories.runbook_repo import split_runbook
+
+
+class _Agg:
+    def __init__(self, docs):
+        self._docs = docs
+    async def to_list(self, length):  # noqa: ARG002
+        return self._docs
+
+
+class _Releases:
+    """Answers the window pipelines the way Mongo would for a single stored release."""
+    def __init__(self, doc):
+        self.doc = doc
+        self.pipelines = []
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        match = pipeline[0]["$match"]
+        if match["_id"] != self.doc["_id"]:
+            return _Agg([])
+        if "runbooks.runbook_id" in match:
+            runbook = next((r for r in self.doc.get("runbooks", []) if r["runbook_id"] == match["runbooks.runbook_id"]), None)
+            if runbook is None:
+                return _Agg([])
+            array = runbook.get("tasks") or []
+        else:
+            array = self.doc["products"]
+        if "products.product_id" in match:
+            product = next((p for p in array if p["product_id"] == match["products.product_id"]), None)
+            if product is None:
+                return _Agg([])
+            array = product["quality_gates"]
+        items, skip, limit = pipeline[-1]["$project"]["items"]["$slice"]
+        return _Agg([{"items": array[skip:skip + limit], "total": len(array)}])
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self._docs = docs
+    def sort(self, *_):
+        return self
+    def limit(self, n):
+        self._docs = self._docs[:n]
+        return self
+    def __aiter__(self):
+        async def _gen():
+            for d in self._docs:
+                yield d
+        return _gen()
+
+
+class _Col:
+    def __init__(self, docs):
+        self.docs = docs
+        self.queries = []
+    async def find_one(self, q, projection=None):  # noqa: ARG002
+        return next((d for d in self.docs if all(d.get(k) == v for k, v in q.items())), None)
+    def find(self, q):
+        self.queries.append(q)
+        after = q.get("_id", {}).get("$gt")
+        return _Cursor([d for d in self.docs if d["runbook_id"] == q["runbook_id"] and (after is None or d["_id"] > after)])
+
+
+def _release():
+    gates = [{"gate_name": f"G{g}", "milestones": []} for g in range(5)]
+    return {"_id": ObjectId(), "products": [{"application_id": "a", "product_id": f"p{p}", "quality_gates": gates} for p in range(3)]}
+
+
+@pytest.mark.asyncio
+async def test_products_and_gates_are_sliced_windows(monkeypatch):
+    doc = _release()
+    col = _Releases(doc)
+
+    class _DB:
+        releases = col
+
+    from app.routers import release as mod
+    monkeypatch.setattr(mod, "get_db", lambda: _DB())
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.get(f"/releases/{doc['_id']}/products", params={"limit": 2})
+        assert r.status_code == 200
+        assert [p["product_id"] for p in r.json()["items"]] == ["p0", "p1"]
+        assert col.pipelines[-1][-1]["$project"]["items"]["$slice"][1:] == [0, 2]
+        r = await ac.get(f"/releases/{doc['_id']}/products", params={"limit": 2, "cursor": r.json()["next_cursor"]})
+        assert [p["product_id"] for p in r.json()["items"]] == ["p2"]
+        assert r.json()["next_cursor"] is None
+
+        g = await ac.get(f"/releases/{doc['_id']}/products/p1/gates", params={"limit": 3})
+        assert [x["gate_name"] for x in g.json()["items"]] == ["G0", "G1", "G2"]
+        g = await ac.get(f"/releases/{doc['_id']}/products/p1/gates", params={"limit": 3, "cursor": g.json()["next_cursor"]})
+        assert [x["gate_name"] for x in g.json()["items"]] == ["G3", "G4"]
+        # a garbage cursor restarts from the first window
+        g = await ac.get(f"/releases/{doc['_id']}/products/p1/gates", params={"limit": 1, "cursor": "bogus"})
+        assert g.json()["items"][0]["gate_name"] == "G0"
+
+        assert (await ac.get(f"/releases/{doc['_id']}/products/nope/gates")).status_code == 404
+        assert (await ac.get(f"/releases/{ObjectId()}/products")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_runbook_tasks_page_by_id(monkeypatch):
+    oid = ObjectId()
+    header, tasks = split_runbook(oid, {"runbook_id": "rb1", "runbook_name": "RB", "tasks": [{"task_name": f"t{i}"} for i in range(3)]})
+    task_col = _Col([{**t, "_id": ObjectId()} for t in tasks])
+
+    class _DB:
+        releases = _Releases({"_id": oid, "products": []})
+        runbooks = _Col([{**header, "_id": ObjectId()}])
+        runbook_tasks = task_col
+
+    from app.routers import release as mod
+    monkeypatch.setattr(mod, "get_db", lambda: _DB())
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.get(f"/releases/{oid}/runbooks/rb1/tasks", params={"limit": 2})
+        assert r.status_code == 200
+        assert [t["task_name"] for t in r.json()["items"]] == ["t0", "t1"]
+        assert "rev" not in r.json()["items"][0] and "release_oid" not in r.json()["items"][0]
+        r = await ac.get(f"/releases/{oid}/runbooks/rb1/tasks", params={"limit": 2, "cursor": r.json()["next_cursor"]})
+        assert [t["task_name"] for t in r.json()["items"]] == ["t2"]
+        assert task_col.queries[-1]["_id"] == {"$gt": task_col.docs[1]["_id"]}
+        assert (await ac.get(f"/releases/{oid}/runbooks/missing/tasks")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_runbook_tasks_of_unmigrated_release_page_inline(monkeypatch):
+    doc = {"_id": ObjectId(), "products": [], "runbooks": [{"runbook_id": "rb1", "runbook_name": "RB", "tasks": [{"task_name": f"t{i}"} for i in range(3)]}]}
+
+    class _DB:
+        releases = _Releases(doc)
+        runbooks = _Col([])
+        runbook_tasks = _Col([])
+
+    from app.routers import release as mod
+    monkeypatch.setattr(mod, "get_db", lambda: _DB())
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.get(f"/releases/{doc['_id']}/runbooks/rb1/tasks", params={"limit": 2})
+        assert r.status_code == 200
+        assert [t["task_name"] for t in r.json()["items"]] == ["t0", "t1"]
+        r = await ac.get(f"/releases/{doc['_id']}/runbooks/rb1/tasks", params={"limit": 2, "cursor": r.json()["next_cursor"]})
+        assert [t["task_name"] for t in r.json()["items"]] == ["t2"] and r.json()["next_cursor"] is None
+        assert (await ac.get(f"/releases/{doc['_id']}/runbooks/missing/tasks")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_window_pipelines_against_mongo():
+    motor = pytest.importorskip("motor.motor_asyncio")
+    client = motor.AsyncIOMotorClient(settings.MONGO_URI, serverSelectionTimeoutMS=500)
+    try:
+        await client.admin.command("ping")
+    except Exception:
+        client.close()
+        pytest.skip("MongoDB not reachable")
+
+    db = client[f"{settings.MONGO_DB_NAME}_subresources"]
+    try:
+        doc = _release()
+        doc["products"][1]["product_id"] = "$weird"
+        await db.releases.insert_one(doc)
+        repo = ReleaseRepository(db)
+        assert await repo.products_page(doc["_id"], 2, 5) == {"items": doc["products"][2:], "total": 3}
+        window = await repo.gates_page(doc["_id"], "$weird", 1, 2)
+        assert [g["gate_name"] for g in window["items"]] == ["G1", "G2"] and window["total"] == 5
+        assert await repo.gates_page(doc["_id"], "nope", 0, 2) is None
+
+        await db.releases.update_one({"_id": doc["_id"]}, {"$set": {"runbooks": [{"runbook_id": "$rb", "tasks": [{"task_name": "a"}, {"task_name": "b"}]}]}})
+        assert await repo.inline_tasks_page(doc["_id"], "$rb", 1, 5) == {"items": [{"task_name": "b"}], "total": 2}
+        assert await repo.inline_tasks_page(doc["_id"], "nope", 0, 5) is None
+    finally:
+        await client.drop_database(db.name)
+        client.close()
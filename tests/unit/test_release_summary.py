@@ -0,0 +1,187 @@
+import copy
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from app.models.release import (
+    AddGateOp,
+    DeleteGateOp,
+    ReleaseProductQualityGate,
+    UpdateGateOp,
+    UpdateQualityGate,
+)
+from app.services.release_service import ReleaseService
+from app.services.release_summary import (
+    compute_summary,
+    pending_entries,
+    pending_update,
+    summary_view,
+)
+
+
+def _products():
+    return [
+        {
+            "product_id": "p1",
+            "quality_gates": [
+                {
+                    "gate_name": "QA",
+                    "gate_status": "BLOCKED",
+                    "milestones": [
+                        {"milestone_key": "M2", "status": "NOT_STARTED", "start_date": datetime(2025, 2, 1)},
+                        {"milestone_key": "M1", "status": "IN_PROGRESS", "start_date": datetime(2025, 1, 1)},
+                        {"milestone_key": "M0", "status": "DONE"},
+                        {"milestone_key": "MX", "status": "NOT_STARTED"},
+                    ],
+                },
+                {"gate_name": "Perf", "gate_status": "PASSED"},
+                {"gate_name": "Docs", "required": False},
+            ],
+        }
+    ]
+
+
+def _apply_inc(summary, inc):
+    out = copy.deepcopy(summary)
+    for path, delta in inc.items():
+        parts = path.split(".")[1:]
+        target = out
+        for p in parts[:-1]:
+            target = target.setdefault(p, {})
+        target[parts[-1]] = target.get(parts[-1], 0) + delta
+    return out
+
+
+class _Releases:
+    def __init__(self, doc):
+        self.doc = doc
+        self.calls = []
+    async def find_one(self, q, projection=None):  # noqa: ARG002
+        return copy.deepcopy(self.doc) if q["_id"] == self.doc["_id"] else None
+    async def find_one_and_update(self, q, update, **kwargs):
+        self.calls.append((q, update, kwargs))
+        if q.get("summary") == {"$exists": True} and "summary" not in self.doc:
+            return None
+        if kwargs.get("return_document") == ReturnDocument.BEFORE:
+            # projection {"products": {"$elemMatch": {"product_id": ...}}}
+            pid = kwargs["projection"]["products"]["$elemMatch"]["product_id"]
+            return {"_id": self.doc["_id"], "products": [copy.deepcopy(p) for p in self.doc["products"] if p["product_id"] == pid][:1]}
+        return dict(self.doc)
+
+
+class _DB:
+    def __init__(self, col):
+        self.releases = col
+
+
+def test_compute_summary_matches_view_contract():
+    view = summary_view(compute_summary({"products": _products()}))
+    assert view["gate_status_counts"] == {"BLOCKED": 1, "PASSED": 1, "NOT_STARTED": 1}
+    assert view["next_pending_milestone_keys"] == ["M1", "M2", "MX"]
+    assert view["flags"] == {"all_required_gates_passed": False, "has_blockers": True, "is_ready_for_approval": False}
+    assert summary_view(compute_summary({}))["flags"]["is_ready_for_approval"] is True
+
+
+@pytest.mark.asyncio
+async def test_addition_is_one_write_with_counter_inc():
+    doc = {"_id": ObjectId(), "products": _products(), "version": 1}
+    doc["summary"] = compute_summary(doc)
+    col = _Releases(doc)
+    gate = ReleaseProductQualityGate(gate_name="Sec", gate_status="FAILED", milestones=[{"milestone_key": "S1", "milestone_name": "Scan"}])
+    op = AddGateOp(op="add_gate", product_id="p1", gate=gate)
+
+    await ReleaseService(_DB(col)).apply_tracked(
+        str(doc["_id"]), op, {"$push": {"products.$[p].quality_gates": gate.model_dump()}},
+        array_filters=[{"p.product_id": "p1"}], addition_match={"products.product_id": "p1"},
+    )
+
+    assert len(col.calls) == 1
+    q, update, _ = col.calls[0]
+    assert q["products.product_id"] == "p1" and q["summary"] == {"$exists": True}
+    assert update["$inc"] == {
+        "summary.blocked_gates": 1,
+        "summary.gate_status_counts.FAILED": 1,
+        "summary.gates": 1,
+        "summary.milestones": 1,
+        "summary.required_gates": 1,
+        "version": 1,
+    }
+    assert update["$push"]["summary.pending"]["$each"][0]["milestone_key"] == "S1"
+
+
+@pytest.mark.asyncio
+async def test_update_moves_counters_by_the_targeted_product_only():
+    doc = {"_id": ObjectId(), "products": [*_products(), {"product_id": "p2", "quality_gates": [{"gate_name": "QA"}]}], "version": 4}
+    doc["summary"] = compute_summary(doc)
+    col = _Releases(doc)
+    patch = UpdateQualityGate(gate_status="PASSED")
+    op = UpdateGateOp(op="update_gate", product_id="p1", gate_name="QA", patch=patch)
+
+    await ReleaseService(_DB(col)).apply_tracked(
+        str(doc["_id"]), op, {"$set": {"products.$[p].quality_gates.$[g].gate_status": "PASSED"}},
+        array_filters=[{"p.product_id": "p1"}, {"g.gate_name": "QA"}],
+    )
+
+    # the write returns only the product it changes, as it was; no version guard, no retry
+    (q, write, kwargs), (_, tracked, _) = col.calls
+    assert "version" not in q and q["summary"] == {"$exists": True}
+    assert kwargs["return_document"] == ReturnDocument.BEFORE
+    assert kwargs["projection"] == {"products": {"$elemMatch": {"product_id": "p1"}}}
+    assert write["$set"] == {"products.$[p].quality_gates.$[g].gate_status": "PASSED"}
+    after = copy.deepcopy(doc)
+    after["products"][0]["quality_gates"][0]["gate_status"] = "PASSED"
+    inc = {k: v for k, v in tracked["$inc"].items() if k != "version"}
+    assert inc == {
+        "summary.blocked_gates": -1,
+        "summary.gate_status_counts.BLOCKED": -1,
+        "summary.gate_status_counts.PASSED": 1,
+        "summary.required_gates_passed": 1,
+    }
+    assert summary_view(_apply_inc(doc["summary"], inc)) == summary_view(compute_summary(after))
+
+
+def test_pending_update_pulls_pushes_or_redates_one_entry():
+    products = _products()
+    before = pending_entries(products)
+    gate = products[0]["quality_gates"][0]
+
+    gate["milestones"][1]["status"] = "DONE"
+    done = pending_entries(products)
+    update, filters = pending_update(before, done)
+    assert update == {"$pull": {"summary.pending": {"$or": [{"product_id": "p1", "gate_name": "QA", "milestone_key": "M1"}]}}}
+    assert filters == []
+
+    gate["milestones"][2]["status"] = "BLOCKED"
+    update, _ = pending_update(done, pending_entries(products))
+    pushed = update["$push"]["summary.pending"]["$each"]
+    assert [e["milestone_key"] for e in pushed] == ["M0"]
+
+    moved = pending_entries(_products())
+    moved[0]["sort_date"] = datetime(2025, 3, 1)
+    update, filters = pending_update(pending_entries(_products()), moved)
+    assert update == {"$set": {"summary.pending.$[pe0].sort_date": datetime(2025, 3, 1)}}
+    assert filters == [{"pe0.product_id": "p1", "pe0.gate_name": "QA", "pe0.milestone_key": "M1"}]
+    # readers sort, so the re-dated entry moves behind M2
+    summary = compute_summary({"products": _products()})
+    summary["pending"] = moved
+    assert summary_view(summary)["next_pending_milestone_keys"] == ["M2", "M1", "MX"]
+
+
+@pytest.mark.asyncio
+async def test_legacy_release_gets_full_summary_and_missing_target_is_none():
+    doc = {"_id": ObjectId(), "products": _products()}
+    col = _Releases(doc)
+    gate = ReleaseProductQualityGate(gate_name="New")
+    svc = ReleaseService(_DB(col))
+
+    await svc.apply_tracked(str(doc["_id"]), AddGateOp(op="add_gate", product_id="p1", gate=gate), {"$push": {}}, addition_match={})
+    # fast path refused (no summary yet), slow path sets the whole summary
+    assert len(col.calls) == 2
+    _, update, _ = col.calls[1]
+    assert update["$set"]["summary"]["gates"] == 4
+
+    missing = await svc.apply_tracked(str(doc["_id"]), DeleteGateOp(op="delete_gate", product_id="nope", gate_name="QA"), {"$pull": {}})
+    assert missing is None
+    assert len(col.calls) == 3
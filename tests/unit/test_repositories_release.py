@@ -21,3 +21,30 @@ async def test_release_repo_get_by_id_and_update(monkeypatch):
 
     n = await repo.update("64f9b8c1f1e4a9fd1a2b3c4d", {"$set": {"x": 1}})
     assert n == 1
+
+
+@pytest.mark.asyncio
+async def test_release_repo_update_and_fetch_single_call():
+    from pymongo import ReturnDocument
+
+    calls = []
+
+    class _Col:
+        async def find_one_and_update(self, q, update, **kwargs):
+            calls.append((q, update, kwargs))
+            return {"_id": q["_id"], "description": "d"}
+
+    class _DB:
+        releases = _Col()
+
+    repo = ReleaseRepository(_DB())
+    oid = "64f9b8c1f1e4a9fd1a2b3c4d"
+    doc = await repo.update_and_fetch(oid, {"$set": {"description": "d"}}, array_filters=[{"p.product_id": "p1"}])
+    assert doc["description"] == "d"
+    assert len(calls) == 1
+    _, _, kwargs = calls[0]
+    assert kwargs["return_document"] is ReturnDocument.AFTER
+    assert kwargs["array_filters"] == [{"p.product_id": "p1"}]
+
+    await repo.update_and_fetch(oid, {"$set": {"x": 1}})
+    assert "array_filters" not in calls[1][2]
@@ -0,0 +1,61 @@
+from datetime import datetime, timezone
+
+import orjson
+from bson import ObjectId
+
+from app.core.pagination import Paginated
+from app.core.responses import ORJSONResponse, dumps, model_response, model_shape
+from app.main import app
+from app.models.release import Release
+
+WHEN = datetime(2025, 9, 9, 10, 0, tzinfo=timezone.utc)
+
+
+def _doc():
+    return {
+        "_id": ObjectId(),
+        "release_id": "REL-1",
+        "release_id_lc": "rel-1",
+        "release_name": "One",
+        "release_date": WHEN,
+        "created_at": datetime(2025, 9, 1),
+        "version": 4,
+        "summary": {"milestones_total": 1},
+        "products": [{
+            "application_id": "a1",
+            "product_id": "p1",
+            "quality_gates": [{"gate_name": "QA", "milestones": [{"milestone_key": "M1", "milestone_name": "UAT", "start_date": WHEN, "approval": {"status": "PENDING"}}]}],
+        }],
+    }
+
+
+def test_dumps_objectid_and_datetimes():
+    oid = ObjectId()
+    assert orjson.loads(dumps({"id": oid, "at": WHEN, "naive": datetime(2025, 1, 1)})) == {
+        "id": str(oid), "at": "2025-09-09T10:00:00Z", "naive": "2025-01-01T00:00:00",
+    }
+
+
+def test_model_shape_matches_validated_output():
+    doc = _doc()
+    expected = Release.model_validate({**doc, "_id": str(doc["_id"])}).model_dump(mode="json", by_alias=True)
+    shaped = model_shape(Release)(doc)
+    assert "release_id_lc" not in shaped and "summary" not in shaped
+    assert orjson.loads(dumps(shaped)) == expected
+    # already-complete documents take the copy path; the input is never mutated
+    assert model_shape(Release)(expected) == expected
+    assert "release_id_lc" in doc
+
+
+def test_model_response_generic_page_and_headers():
+    doc = _doc()
+    r = model_response(Paginated[Release], {"items": [doc], "next_cursor": "c"}, headers={"ETag": 'W/"x"'})
+    body = orjson.loads(r.body)
+    assert r.headers["ETag"] == 'W/"x"' and r.media_type == "application/json"
+    assert body["next_cursor"] == "c"
+    assert body["items"][0]["_id"] == str(doc["_id"])
+    assert body["items"][0]["products"][0]["quality_gates"][0]["milestones"][0]["attachment_refs"] == []
+
+
+def test_app_default_response_class():
+    assert app.router.default_response_class.value is ORJSONResponse
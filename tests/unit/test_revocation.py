@@ -0,0 +1,120 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.revocation import BloomFilter, RevocationList
+from app.core.security import create_access_token, create_refresh_token, decode_token
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self._docs = list(docs)
+
+    def sort(self, field, direction):
+        self._docs.sort(key=lambda d: d[field], reverse=direction == -1)
+        return self
+
+    def __aiter__(self):
+        async def _gen():
+            for d in self._docs:
+                yield d
+        return _gen()
+
+
+class _Revoked:
+    def __init__(self):
+        self.docs = []
+
+    async def insert_one(self, doc):
+        self.docs.append(doc)
+
+    def find(self, crit, projection=None):  # noqa: ARG002
+        docs = self.docs
+        if "revoked_at" in crit:
+            docs = [d for d in docs if d["revoked_at"] >= crit["revoked_at"]["$gte"]]
+        return _Cursor(docs)
+
+
+class _DB:
+    def __init__(self):
+        self.revoked_tokens = _Revoked()
+
+
+def test_bloom_filter_membership():
+    bf = BloomFilter(1024, 4)
+    bf.add("abc")
+    assert "abc" in bf
+    assert sum(1 for i in range(200) if f"k{i}" in bf) < 20
+
+
+@pytest.mark.asyncio
+async def test_revocation_list_sync_is_incremental_and_prunes():
+    db = _DB()
+    rl = RevocationList(bloom_bits=4096, bloom_hashes=4)
+    now = datetime.now(timezone.utc)
+    db.revoked_tokens.docs.append({"jti": "a", "expires_at": now + timedelta(hours=1), "revoked_at": now})
+    assert await rl.sync(db) == 1
+    assert rl.is_revoked("a") and not rl.is_revoked("b")
+
+    db.revoked_tokens.docs.append({"jti": "b", "expires_at": now + timedelta(hours=1), "revoked_at": now + timedelta(seconds=1)})
+    assert await rl.sync(db) == 1  # only the new one
+    assert rl.is_revoked("b")
+
+    assert rl.prune(now=time.time() + 7200) == 2
+    assert not rl.is_revoked("a") and len(rl) == 0
+
+
+@pytest.mark.asyncio
+async def test_revocation_sync_catches_revocations_stamped_behind_the_watermark():
+    db = _DB()
+    rl = RevocationList(bloom_bits=4096, bloom_hashes=4, sync_overlap_seconds=30)
+    now = datetime.now(timezone.utc)
+    exp = now + timedelta(hours=1)
+    db.revoked_tokens.docs.append({"jti": "a", "expires_at": exp, "revoked_at": now})
+    assert await rl.sync(db) == 1
+
+    # another worker's clock runs a few seconds behind; an exact watermark would skip this one forever
+    db.revoked_tokens.docs.append({"jti": "late", "expires_at": exp, "revoked_at": now - timedelta(seconds=5)})
+    assert await rl.sync(db) == 1
+    assert rl.is_revoked("late")
+    assert await rl.sync(db) == 0  # re-read, but already known
+    assert rl.stats()["watermark"] == now.isoformat()
+
+
+@pytest.mark.asyncio
+async def test_decode_token_rejects_revoked_jti(monkeypatch):
+    from app.core import security as sec
+
+    rl = RevocationList(bloom_bits=4096, bloom_hashes=4)
+    monkeypatch.setattr(sec, "revocation_list", rl)
+
+    access = create_access_token("u1")
+    other = create_refresh_token("u1")
+    claims = decode_token(access)
+    assert claims and claims["jti"] and claims["jti"] != decode_token(other)["jti"]
+
+    await rl.revoke(_DB(), claims["jti"], claims["exp"], user_id="u1")
+    assert decode_token(access) is None
+    assert decode_token(other) is not None
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_access_and_refresh(monkeypatch):
+    from httpx import ASGITransport, AsyncClient
+
+    from app.main import app
+    from app.routers import auth as auth_router
+
+    db = _DB()
+    monkeypatch.setattr(auth_router, "get_db", lambda: db)
+    access = create_access_token("u1")
+    refresh = create_refresh_token("u1")
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.post("/auth/logout", json={"refresh_token": refresh}, headers={"Authorization": f"Bearer {access}"})
+        assert r.status_code == 200 and r.json()["revoked"] == 2
+        again = await ac.post("/auth/refresh", headers={"Authorization": f"Bearer {refresh}"})
+        assert again.status_code == 401
+    assert len(db.revoked_tokens.docs) == 2
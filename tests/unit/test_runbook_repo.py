@@ -0,0 +1,60 @@
+import pytest
+from bson import ObjectId
+
+from app.repositories.runbook_repo import (
+    RunbookRepository,
+    key_conflict,
+    merge_runbooks,
+    split_runbook,
+)
+
+
+def test_split_runbook_keys_tasks_by_release_and_runbook():
+    oid = ObjectId()
+    header, tasks = split_runbook(oid, {"runbook_id": "rb1", "runbook_name": "RB", "tasks": [{"task_name": "a"}, {"task_name": "b"}]})
+    assert "tasks" not in header and header["release_oid"] == oid and isinstance(header["rev"], int)
+    assert [(t["release_oid"], t["runbook_id"], t["task_name"]) for t in tasks] == [(oid, "rb1", "a"), (oid, "rb1", "b")]
+
+
+def test_key_conflict():
+    assert key_conflict([{"runbook_id": "a", "tasks": [{"task_name": "x"}]}, {"runbook_id": "b"}]) is None
+    assert key_conflict([{"runbook_id": "a"}, {"runbook_id": "a"}]) == "duplicate runbook_id: a"
+    assert "task_name" in key_conflict([{"runbook_id": "a", "tasks": [{"task_name": "x"}, {"task_name": "x"}]}])
+
+
+class _Col:
+    def __init__(self, docs):
+        self.docs = docs
+    def find(self, q):
+        docs = [d for d in self.docs if d["release_oid"] in q["release_oid"]["$in"]]
+        class _C:
+            def sort(self, *_):
+                return self
+            def __aiter__(self):
+                async def _gen():
+                    for d in docs:
+                        yield d
+                return _gen()
+        return _C()
+
+
+@pytest.mark.asyncio
+async def test_for_releases_composes_embedded_shape():
+    oid = ObjectId()
+    header, tasks = split_runbook(oid, {"runbook_id": "rb1", "runbook_name": "RB", "tasks": [{"task_name": "a"}]})
+
+    class _DB:
+        runbooks = _Col([{**header, "_id": ObjectId()}])
+        runbook_tasks = _Col([{**t, "_id": ObjectId()} for t in tasks])
+
+    by_release = await RunbookRepository(_DB()).for_releases([oid, ObjectId()])
+    assert by_release[oid] == [{"runbook_id": "rb1", "runbook_name": "RB", "tasks": [{"task_name": "a"}]}]
+    assert sorted(map(len, by_release.values())) == [0, 1]
+
+
+def test_merge_runbooks_prefers_stored_copy():
+    inline = [{"runbook_id": "rb1", "tasks": [{"task_name": "old"}]}, {"runbook_id": "rb2", "tasks": []}]
+    stored = [{"runbook_id": "rb1", "tasks": [{"task_name": "a"}]}]
+    assert merge_runbooks(inline, stored) == [inline[1], stored[0]]
+    assert merge_runbooks(None, stored) == stored
+    assert merge_runbooks(inline, []) == inline
@@ -0,0 +1,79 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core.config import settings
+from app.core.security import (
+    TokenUser,
+    create_access_token,
+    create_refresh_token,
+    decode_token,
+    get_current_user,
+)
+from app.main import app
+from app.models.rbac import PERMISSION_BITS, Role, User, mask_to_permissions, permissions_to_mask
+from app.utils.time import utcnow
+
+
+def test_permission_mask_roundtrip():
+    mask = permissions_to_mask({"can_manage_roles": True, "can_view_all": True, "is_approval_manager": False})
+    assert mask == PERMISSION_BITS["can_manage_roles"] | PERMISSION_BITS["can_view_all"]
+    perms = mask_to_permissions(mask)
+    assert perms["can_manage_roles"] and perms["can_view_all"] and not perms["is_approval_manager"]
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_authorizes_from_claims_without_db(monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_PERMISSIONS_IN_TOKEN", True)
+    monkeypatch.setattr(settings, "RBAC_ENFORCEMENT_ENABLED", True)
+
+    from app.core import security as sec
+
+    def _no_db():
+        raise AssertionError("stateless mode must not touch the database")
+
+    monkeypatch.setattr(sec, "get_db", _no_db)
+
+    token = create_access_token("u1", usr="jdoe", roles=["Ops"], pm=PERMISSION_BITS["can_manage_runbooks"], pv=3)
+    principal = await get_current_user(f"Bearer {token}")  # type: ignore[arg-type]
+    assert isinstance(principal.user, TokenUser) and principal.user.id == "u1"
+    assert principal.role_names == ["Ops"]
+    assert principal.permissions["can_manage_runbooks"] is True
+    assert principal.permissions["can_manage_roles"] is False
+
+
+@pytest.mark.asyncio
+async def test_refresh_reuses_claims_until_permissions_version_changes(monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_PERMISSIONS_IN_TOKEN", True)
+    state = {"version": 5, "user_loads": 0}
+    user = User(_id="u1", username="jdoe", email="j@example.com", password_hash="h", role_ids=["r1"], created_at=utcnow())
+
+    class _Repo:
+        async def get_permissions_version(self):
+            return state["version"]
+
+        async def find_user_by_id(self, uid):
+            state["user_loads"] += 1
+            return user
+
+        async def get_roles_by_ids(self, role_ids):
+            return [Role(_id="r1", role_name="Admin", can_manage_roles=True, created_at=utcnow())]
+
+    from app.routers import auth as auth_router
+
+    monkeypatch.setattr(auth_router, "repo", lambda: _Repo())
+    token = create_refresh_token("u1", usr="jdoe", roles=["Viewer"], pm=0, pv=5)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r1 = await ac.post("/auth/refresh", headers={"Authorization": f"Bearer {token}"})
+        assert r1.status_code == 200
+        assert state["user_loads"] == 0
+        assert decode_token(r1.json()["access_token"])["roles"] == ["Viewer"]
+
+        state["version"] = 6  # e.g. update_role / assign_role happened
+        r2 = await ac.post("/auth/refresh", headers={"Authorization": f"Bearer {token}"})
+        assert r2.status_code == 200
+        assert state["user_loads"] == 1
+        claims = decode_token(r2.json()["access_token"])
+        assert claims["roles"] == ["Admin"] and claims["pv"] == 6
+        assert claims["pm"] == PERMISSION_BITS["can_manage_roles"]
@@ -0,0 +1,44 @@
+import pytest
+
+from app.core.cache import token_cache
+from app.core.revocation import RevocationList
+from app.core.security import create_access_token, decode_token
+
+
+def test_decode_token_verifies_signature_once(monkeypatch):
+    from app.core import security as sec
+
+    calls = []
+    real_decode = sec.jwt.decode
+
+    def _counting_decode(*args, **kwargs):
+        calls.append(1)
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(sec.jwt, "decode", _counting_decode)
+    token = create_access_token("u1")
+    first = decode_token(token)
+    second = decode_token(token)
+    assert first == second and first["sub"] == "u1"
+    assert len(calls) == 1
+    assert token_cache.stats()["hits"] == 1
+
+
+def test_decode_token_does_not_cache_invalid_tokens():
+    assert decode_token("not-a-jwt") is None
+    assert len(token_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_revoked_token_is_evicted_from_cache(monkeypatch):
+    from app.core import security as sec
+
+    rl = RevocationList(bloom_bits=4096, bloom_hashes=4)
+    monkeypatch.setattr(sec, "revocation_list", rl)
+    token = create_access_token("u1")
+    claims = decode_token(token)
+    assert len(token_cache) == 1
+
+    rl.add(claims["jti"], claims["exp"])
+    assert decode_token(token) is None
+    assert len(token_cache) == 0